@@ -1,7 +1,9 @@
 """アプリケーション設定"""
-from pydantic_settings import BaseSettings
 import json
 import os
+from typing import Optional
+
+from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
@@ -15,14 +17,88 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # 認証済みユーザー（プリンシパル）キャッシュ設定
+    principal_cache_max_size: int = 10000  # キャッシュするユーザー数の上限
+    principal_cache_ttl_seconds: float = 60.0  # 他ワーカーでの変更が反映されるまでの最大秒数（0で無効）
+    token_cache_max_size: int = 10000  # 検証済みトークンのキャッシュ件数の上限（0で無効）
+    
+    # トークンブラックリスト設定（複数ワーカーで運用する場合は "sqlite" を使用）
+    token_blacklist_backend: str = "memory"  # "memory" または "sqlite"
+    token_blacklist_path: str = "./token_blacklist.db"  # sqliteバックエンドのファイル
+    token_blacklist_sync_interval_seconds: float = 1.0  # 他ワーカーのログアウトを反映する間隔（秒）
+    token_blacklist_rebuild_interval_seconds: float = 300.0  # 期限切れの削除と前段フィルターの再構築の間隔（秒、バックグラウンドで実行）
+    token_blacklist_max_size: int = 100000  # 有効期限内に保持する想定のトークン数（超えても削除せず警告する）
+    
+    # ログインのレート制限設定（トークンバケット。複数ワーカーで運用する場合は "sqlite" を使用）
+    login_rate_limit_enabled: bool = True  # ログインのレート制限を行うか
+    login_rate_limit_backend: str = "memory"  # "memory" または "sqlite"
+    login_rate_limit_path: str = "./rate_limit.db"  # sqliteバックエンドのファイル
+    login_rate_limit_busy_timeout_seconds: float = 0.25  # sqliteバックエンドで他ワーカーの書き込みを待つ秒数の上限（超えた試行は制限しない）
+    login_rate_limit_max_keys: int = 100000  # 保持するバケット（メールアドレス・IP）数の上限
+    login_rate_limit_email_burst: int = 10  # メールアドレスごとに連続で試行できる回数
+    login_rate_limit_email_per_minute: float = 5.0  # メールアドレスごとの試行回数の回復ペース（回/分）
+    login_rate_limit_ip_burst: int = 100  # クライアントIPごとに連続で失敗できる回数（成功した試行は数えない）
+    login_rate_limit_ip_per_minute: float = 60.0  # クライアントIPごとの失敗回数の回復ペース（回/分）
+    login_rate_limit_trust_forwarded_for: bool = False  # リバースプロキシの X-Forwarded-For をクライアントIPとして使うか
+    
     # データベース設定
     database_url: str = "sqlite:///./timecard_clone.db"
+    use_async_db: bool = False  # AsyncSession経路を使用するか（同期経路とのスループット比較用）
+    async_database_url: Optional[str] = None  # 未指定時はdatabase_urlから非同期ドライバーのURLを導出
+    
+    # コネクションプール設定（ワーカー数に合わせて調整）
+    db_pool_size: int = 5  # 常時保持する接続数
+    db_max_overflow: int = 10  # pool_sizeを超えて一時的に作成できる接続数
+    db_pool_timeout: float = 30.0  # 接続取得の待ち時間の上限（秒）
+    db_pool_recycle: int = 1800  # 接続を再作成するまでの秒数（-1で無効、SQLiteでは無効）
+    db_pool_pre_ping: bool = True  # チェックアウト時に接続の生存確認を行うか（SQLiteでは無効）
+    
+    # ページネーション設定（1ページの件数の上限）
+    history_page_max_size: int = 100  # 勤怠履歴
+    users_page_max_size: int = 500  # ユーザー一覧
+    
+    # 部署別勤怠ダッシュボード設定
+    dashboard_cache_max_size: int = 256  # キャッシュする集計結果（期間・部署の組み合わせ）の上限
+    dashboard_cache_ttl_seconds: float = 30.0  # 打刻が集計に反映されるまでの最大秒数（0で無効）
+    dashboard_max_days: int = 366  # 1回で集計できる期間の上限（日）
+    
+    # エクスポート設定
+    export_chunk_size: int = 2000  # サーバーサイドカーソルから1回に取得・変換する件数
+    
+    # 勤怠状態の変更イベント（Server-Sent Events）設定
+    events_queue_size: int = 256  # 購読者ごとに保持する未送信イベント数の上限（超えた分は古い順に破棄）
+    events_heartbeat_seconds: float = 15.0  # イベントがない間に接続維持のコメントを送る間隔（秒）
+    
+    # 打刻のグループコミット設定（出退勤の集中時に複数の打刻を1回のコミットにまとめる）
+    punch_group_commit: bool = False  # 打刻を書き込みキュー経由で実行するか
+    punch_batch_max_size: int = 64  # 1回のコミットにまとめる打刻数の上限
+    punch_batch_max_wait_ms: float = 2.0  # バッチに後続の打刻を待つ時間の上限（ミリ秒）
+    punch_queue_max_size: int = 10000  # キューに溜められる打刻数の上限（超えると空くまで待つ）
+    
+    # 在席状況インデックス設定
+    presence_rebuild_interval_seconds: float = 0.0  # 他ワーカーの打刻を取り込むため作り直す間隔（秒、0で起動時のみ）
+    
+    # 打刻の Idempotency-Key 設定（再送には最初のレスポンスを返す）
+    idempotency_cache_max_size: int = 100000  # 保存するレスポンス数の上限（超えた分は古い順に破棄）
+    idempotency_ttl_seconds: float = 86400.0  # レスポンスを保存する秒数
+    idempotency_key_max_length: int = 255  # Idempotency-Key の最大長
+    
+    # メトリクス設定
+    metrics_enabled: bool = True  # ルートごとの処理時間・件数を計測し /metrics で公開するか
+    
+    # リクエストごとのSQL計測設定（Server-Timing ヘッダー・/metrics・予算超過の警告ログ）
+    sql_timing_enabled: bool = True  # リクエストごとのSQL実行回数・時間を計測するか
+    sql_statement_budget: int = 20  # 1リクエストのSQL実行回数の上限（超えると警告ログ）
+    sql_time_budget_ms: float = 200.0  # 1リクエストのSQL実行時間の上限（ミリ秒、超えると警告ログ）
+    sql_route_budgets: dict[str, int] = {}  # ルートごとの実行回数の上限（例: {"POST /attendance/clock-in": 6}）
+    sql_repeated_statement_threshold: int = 5  # 同じ形のSQLがこの回数以上実行されたらN+1の可能性として警告
     
     # CORS設定
     allowed_origins: list[str] = ["http://localhost:3000"]
     
     # パスワード設定
     min_password_length: int = 8
+    password_hash_max_workers: int = 4  # bcryptのハッシュ化・検証の同時実行数の上限
     
     # ログイン制限設定
     enable_login_restriction: bool = True  # ログイン制限を有効にするか
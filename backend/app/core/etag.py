@@ -0,0 +1,59 @@
+"""ETagによる条件付きGET（If-None-Match → 304 Not Modified）のユーティリティ"""
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+from pydantic_core import to_json
+
+# ポーリングされるレスポンスはユーザーごとに異なるため共有キャッシュには保存させず、毎回検証させる
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(body: bytes) -> str:
+    """
+    レスポンス本文（シリアライズ済みのJSON）から強いETagを作成
+
+    本文から作るため、SQLiteで秒単位の updated_at が同じ秒の更新でも、返す内容が変われば値も変わる。
+    """
+    digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match のいずれかのETagが一致するか（弱い比較。"*" は常に一致）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """レスポンスにETagと再検証を求める Cache-Control を設定"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """本文なしの 304 Not Modified レスポンスを作成"""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_etag(response, etag)
+    return response
+
+
+def conditional_response(request: Request, content: Any) -> Response:
+    """
+    内容をJSONにしてETagを付けたレスポンスを作成（If-None-Match が一致すれば本文なしの304）
+
+    本文は1回だけシリアライズし、ETagの計算とレスポンスの両方に使う。
+    """
+    body = to_json(content)
+    etag = make_etag(body)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response = Response(content=body, media_type="application/json")
+    set_etag(response, etag)
+    return response
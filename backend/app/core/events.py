@@ -0,0 +1,142 @@
+"""勤怠状態の変更イベントのプロセス内配信（Server-Sent Events 用）"""
+import asyncio
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from pydantic_core import to_json
+
+from app.core.config import settings
+
+
+@dataclass(eq=False)
+class Subscription:
+    """購読者1件分のキューと絞り込み条件（user_id・department がNoneの場合は全件）"""
+    loop: asyncio.AbstractEventLoop
+    queue: "asyncio.Queue[Dict[str, Any]]"
+    user_id: Optional[int] = None
+    department: Optional[str] = None
+    dropped: int = 0  # キューがあふれて破棄したイベント数
+    closed: bool = field(default=False)
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        """イベントが絞り込み条件に一致するか"""
+        if self.user_id is not None and event["user_id"] != self.user_id:
+            return False
+        return self.department is None or event["department"] == self.department
+
+
+class EventBroker:
+    """
+    勤怠状態の変更イベントを購読者へ配信するスレッドセーフなブローカー
+
+    同期経路のサービスはスレッドプールで実行されるため、publish は任意のスレッドから呼び出せ、
+    購読者のイベントループへ call_soon_threadsafe で受け渡す。遅い購読者のキューが
+    あふれた場合は古いイベントから破棄し、打刻処理を待たせない。
+    配信はプロセス内のみのため、複数ワーカー構成では同じワーカーへの打刻だけが届く。
+    """
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def has_subscribers(self) -> bool:
+        """購読者がいるか（いなければイベントを作成する必要はない）"""
+        return bool(self._subscriptions)
+
+    def subscribe(self, user_id: Optional[int] = None, department: Optional[str] = None) -> Subscription:
+        """購読を開始（イベントループ上で呼び出す）"""
+        subscription = Subscription(
+            loop=asyncio.get_running_loop(),
+            queue=asyncio.Queue(maxsize=self.queue_size),
+            user_id=user_id,
+            department=department,
+        )
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """購読を終了"""
+        subscription.closed = True
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """条件に一致する購読者へイベントを配信（イベントには連番の id を付与する）"""
+        with self._lock:
+            targets = [subscription for subscription in self._subscriptions if subscription.matches(event)]
+            event = {"id": next(self._sequence), **event}
+            self.published += 1
+
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(self._deliver, subscription, event)
+            except RuntimeError:
+                # イベントループが終了している購読者は取り除く
+                self.unsubscribe(subscription)
+
+    def _deliver(self, subscription: Subscription, event: Dict[str, Any]) -> None:
+        """購読者のイベントループ上でキューに追加（あふれた場合は最も古いイベントを破棄）"""
+        if subscription.closed:
+            return
+        if subscription.queue.full():
+            subscription.queue.get_nowait()
+            subscription.dropped += 1
+            with self._lock:
+                self.dropped += 1
+        subscription.queue.put_nowait(event)
+        with self._lock:
+            self.delivered += 1
+
+    def stats(self) -> dict:
+        """購読者数と配信件数の統計を取得"""
+        with self._lock:
+            return {
+                "subscribers": len(self._subscriptions),
+                "published": self.published,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+            }
+
+
+def format_sse(event: Dict[str, Any]) -> bytes:
+    """イベントを Server-Sent Events の1メッセージ（id・event・data）に変換"""
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event["id"], event["type"].encode(), to_json(event))
+
+
+async def stream_events(
+    broker: EventBroker,
+    heartbeat_seconds: float,
+    user_id: Optional[int] = None,
+    department: Optional[str] = None,
+) -> AsyncIterator[bytes]:
+    """
+    イベントを購読し、Server-Sent Events として送り続ける
+
+    イベントがない間は heartbeat_seconds ごとにコメント行を送り、プロキシによる切断を防ぐ。
+    クライアントが切断するとジェネレーターが閉じられ、購読を終了する。
+    """
+    subscription = broker.subscribe(user_id=user_id, department=department)
+    try:
+        # 再接続までの待ち時間（ミリ秒）をクライアントに伝える
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+# 勤怠状態の変更イベント（打刻・休憩の開始／終了）
+attendance_events = EventBroker(settings.events_queue_size)
@@ -0,0 +1,69 @@
+"""CPUバウンドな処理をイベントループ外で実行するエグゼキューター"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """
+    同時実行数に上限を持つスレッドプール
+
+    上限を超えた呼び出しはキューで待機する。待機中の件数（キューの深さ）と
+    待ち時間を記録し、混雑具合を確認できるようにする。
+    """
+
+    def __init__(self, max_workers: int, name: str) -> None:
+        self.max_workers = max_workers
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.pending = 0  # 投入済みで未完了の件数（実行中＋待機中）
+        self.running = 0  # 実行中の件数
+        self.max_queue_depth = 0  # 観測した待機件数の最大値
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """関数をスレッドプールで実行し、結果を待つ"""
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self.pending += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.pending - self.running)
+
+        def task() -> T:
+            waited = time.perf_counter() - submitted_at
+            with self._lock:
+                self.running += 1
+                self.total_wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, task)
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """キューの深さ・待ち時間などの統計を取得"""
+        with self._lock:
+            average_wait = self.total_wait_seconds / self.completed if self.completed else 0.0
+            return {
+                "max_workers": self.max_workers,
+                "running": self.running,
+                "queue_depth": self.pending - self.running,
+                "max_queue_depth": self.max_queue_depth,
+                "completed": self.completed,
+                "average_wait_ms": round(average_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
@@ -0,0 +1,174 @@
+"""書き込み処理をまとめて1トランザクションでコミットするキュー（グループコミット）"""
+import asyncio
+import contextvars
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Generic,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+T = TypeVar("T")
+
+# バッチ内の操作ごとの結果（成功時は戻り値、失敗時は例外）
+BatchResult = Union[Any, BaseException]
+
+_STOP = object()
+
+
+class GroupCommitQueue(Generic[T]):
+    """
+    操作をキューに溜め、件数（max_batch_size）か待ち時間（max_wait_seconds）の上限で
+    バッチにまとめて execute_batch に渡すキュー
+
+    execute_batch は操作のリストを受け取り、同じ順序で操作ごとの結果（戻り値または例外）を返す。
+    呼び出し元には自分の操作の結果だけが返る（例外はそのまま送出される）。
+    バッチの実行中に届いた操作は次のバッチにまとめられるため、集中時ほどバッチが大きくなる。
+    """
+
+    def __init__(
+        self,
+        execute_batch: Callable[[List[T]], Awaitable[List[BatchResult]]],
+        max_batch_size: int,
+        max_wait_seconds: float,
+        max_queue_size: int = 0,
+    ) -> None:
+        self.execute_batch = execute_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.max_queue_size = max_queue_size
+        self._queue: Optional["asyncio.Queue[Any]"] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closed = False
+        # 統計
+        self.batches = 0
+        self.operations = 0
+        self.errors = 0
+        self.max_batch = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait = 0.0
+        self.total_execute_seconds = 0.0
+
+    def _start(self) -> None:
+        """初回の投入時に、実行中のイベントループ上でワーカーを開始"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        # 最初に投入したリクエストのコンテキスト（SQL計測など）を引き継がないよう、空のコンテキストで開始する
+        self._worker = contextvars.Context().run(self._loop.create_task, self._run())
+
+    async def submit(self, operation: T) -> Any:
+        """
+        操作をキューに追加し、バッチのコミット後に結果を返す
+
+        Raises:
+            RuntimeError: 停止後に投入された場合
+            Exception: 操作またはコミットで発生した例外
+        """
+        if self._closed:
+            raise RuntimeError("書き込みキューは停止しています")
+        if self._worker is None or self._loop is not asyncio.get_running_loop():
+            self._start()
+
+        future = asyncio.get_running_loop().create_future()
+        # キューが満杯の場合は空くまで待つ（バックプレッシャー）
+        await self._queue.put((operation, future, time.perf_counter()))
+        return await future
+
+    async def _run(self) -> None:
+        """キューから操作を取り出してバッチにまとめ、順に実行する"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.max_wait_seconds
+            while len(batch) < self.max_batch_size:
+                try:
+                    # 既に届いている操作は待たずに取り出す
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._execute(batch)
+
+    async def _execute(self, batch: List[Tuple[T, "asyncio.Future[Any]", float]]) -> None:
+        """バッチを実行し、操作ごとの結果を呼び出し元に返す"""
+        started = time.perf_counter()
+        waits = [started - enqueued_at for _, _, enqueued_at in batch]
+        try:
+            results = await self.execute_batch([operation for operation, _, _ in batch])
+        except Exception as e:
+            # コミットの失敗などバッチ全体の失敗は全員に返す
+            results = [e] * len(batch)
+
+        self.batches += 1
+        self.operations += len(batch)
+        self.max_batch = max(self.max_batch, len(batch))
+        self.total_wait_seconds += sum(waits)
+        self.max_wait = max(self.max_wait, *waits)
+        self.total_execute_seconds += time.perf_counter() - started
+
+        for (_, future, _), result in zip(batch, results, strict=True):
+            if future.done():
+                # 呼び出し元が切断などでキャンセル済み（操作自体はコミット済み）
+                continue
+            if isinstance(result, BaseException):
+                self.errors += 1
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def stop(self) -> None:
+        """新しい操作の受け付けを止め、キューに残った操作を実行してから終了"""
+        self._closed = True
+        if self._worker is None or self._loop is not asyncio.get_running_loop():
+            return
+        await self._queue.put(_STOP)
+        await self._worker
+        self._worker = None
+
+        # 停止の直前に満杯のキューで待っていた操作は実行せずに失敗させる
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP and not item[1].done():
+                item[1].set_exception(RuntimeError("書き込みキューは停止しています"))
+
+    def stats(self) -> dict:
+        """バッチ数・平均バッチサイズ・キューでの待ち時間などの統計を取得"""
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return {
+            "running": self._worker is not None,
+            "queued": queued,
+            "batches": self.batches,
+            "operations": self.operations,
+            "errors": self.errors,
+            "average_batch_size": round(self.operations / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch,
+            "average_wait_ms": (
+                round(self.total_wait_seconds / self.operations * 1000, 3) if self.operations else 0.0
+            ),
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "average_batch_ms": (
+                round(self.total_execute_seconds / self.batches * 1000, 3) if self.batches else 0.0
+            ),
+        }
@@ -0,0 +1,106 @@
+"""Idempotency-Key による再送リクエストの重複実行防止"""
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Hashable, Tuple
+
+from fastapi import Response, status
+from pydantic_core import to_json
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# 再送時に返したレスポンスであることを示すヘッダー
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """最初のリクエストのレスポンス（ステータスコードとJSON本文）"""
+    fingerprint: str  # リクエスト内容の指紋（同じキーで異なる内容が送られた場合の検出用）
+    status_code: int
+    body: bytes
+
+
+class IdempotencyStore:
+    """
+    (ユーザー, パス, Idempotency-Key) ごとに最初のレスポンスを保存し、再送に同じレスポンスを返すストア
+
+    保存件数の上限（LRU）と有効期限つきのプロセス内キャッシュに保存する。最初のリクエストの
+    処理中に届いた再送は、処理の完了を待ってから同じレスポンスを返す。5xxのレスポンスは
+    保存せず、再送時にもう一度処理する。
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self._responses: TTLCache[StoredResponse] = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self._in_flight: Dict[Hashable, "asyncio.Future[None]"] = {}
+        self.replays = 0
+        self.conflicts = 0
+
+    def _replay(self, stored: StoredResponse, fingerprint: str) -> Response:
+        """保存したレスポンスを返す（リクエスト内容が異なる場合は422）"""
+        if stored.fingerprint != fingerprint:
+            self.conflicts += 1
+            return Response(
+                content=to_json({"detail": "同じIdempotency-Keyが異なる内容のリクエストに使用されています"}),
+                # 定数名がStarletteのバージョンで異なる（旧: _ENTITY / 新: _CONTENT）ため数値で指定する
+                status_code=422,
+                media_type="application/json",
+            )
+        self.replays += 1
+        return Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            media_type="application/json",
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+    async def run(
+        self,
+        key: Hashable,
+        fingerprint: str,
+        handler: Callable[[], Awaitable[Tuple[int, bytes]]],
+    ) -> Response:
+        """
+        キーに対する最初のリクエストであれば handler を実行して保存し、再送であれば保存したレスポンスを返す
+
+        Args:
+            key: (ユーザーID, パス, Idempotency-Key) など、キーの衝突を防ぐ範囲を含めた値
+            fingerprint: リクエスト内容の指紋
+            handler: (ステータスコード, JSON本文) を返す処理
+        """
+        while True:
+            stored = self._responses.get(key)
+            if stored is not None:
+                return self._replay(stored, fingerprint)
+            pending = self._in_flight.get(key)
+            if pending is None:
+                break
+            # 最初のリクエストの完了を待つ（5xxで保存されなかった場合は自分で処理する）
+            await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            status_code, body = await handler()
+            if status_code < status.HTTP_500_INTERNAL_SERVER_ERROR:
+                self._responses.set(key, StoredResponse(fingerprint, status_code, body))
+        finally:
+            del self._in_flight[key]
+            future.set_result(None)
+        return Response(content=body, status_code=status_code, media_type="application/json")
+
+    def stats(self) -> dict:
+        """保存件数・ヒット率と再送・競合の件数を取得"""
+        return {
+            **self._responses.stats(),
+            "replays": self.replays,
+            "conflicts": self.conflicts,
+            "in_flight": len(self._in_flight),
+        }
+
+
+# 打刻APIのレスポンス（Idempotency-Key 指定時のみ保存）
+idempotency_store = IdempotencyStore(
+    max_size=settings.idempotency_cache_max_size,
+    ttl_seconds=settings.idempotency_ttl_seconds,
+)
@@ -0,0 +1,346 @@
+"""リクエストの計測とPrometheus形式のメトリクス"""
+import logging
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database.query_stats import QueryTracker, start_tracking, stop_tracking
+
+logger = logging.getLogger(__name__)
+
+# レイテンシのヒストグラムのバケット（秒）
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# ルートに一致しなかったリクエストのラベル（任意のパスでラベルが増え続けないようにする）
+UNMATCHED_ROUTE = "unmatched"
+
+
+def get_route_label(scope: Scope) -> str:
+    """ルーティング後の scope からルートのラベル（パスパラメーターを含まないテンプレート）を取得"""
+    return getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+
+
+class Histogram:
+    """固定バケットのヒストグラム（Prometheusの histogram 型）"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最後の要素は +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """値を記録"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, 累積件数) のリストを取得"""
+        result = []
+        total = 0
+        for bound, count in zip((*(repr(b) for b in self.buckets), "+Inf"), self.counts, strict=True):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class RequestMetrics:
+    """
+    ルート（パスのテンプレート）ごとのレイテンシ・ステータスコード別の件数と処理中のリクエスト数
+
+    記録はイベントループ上のミドルウェアからのみ行うためロックは取らない。
+    """
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.latencies: Dict[Tuple[str, str], Histogram] = {}
+        self.responses: Dict[Tuple[str, str, int], int] = {}
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float) -> None:
+        """完了したリクエストを記録"""
+        key = (method, route)
+        histogram = self.latencies.get(key)
+        if histogram is None:
+            histogram = self.latencies[key] = Histogram()
+        histogram.observe(seconds)
+        response_key = (method, route, status_code)
+        self.responses[response_key] = self.responses.get(response_key, 0) + 1
+
+
+class MetricsMiddleware:
+    """
+    リクエストの処理時間を計測するASGIミドルウェア
+
+    BaseHTTPMiddleware を使わずASGIのまま包むため、レスポンスのストリーミング（エクスポート・SSE）を妨げない。
+    ストリーミングのレスポンスは本文を送り終えるまでを処理時間とする。
+    """
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics = self.metrics
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            metrics.observe(scope["method"], get_route_label(scope), status_code, time.perf_counter() - started)
+
+
+class QueryRouteStats:
+    """ルートごとのSQL実行回数・時間と、予算超過・N+1の可能性を検出したリクエスト数"""
+
+    __slots__ = ("statements", "seconds", "budget_exceeded", "repeated")
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.seconds = 0.0
+        self.budget_exceeded = 0
+        self.repeated = 0
+
+
+class QueryTimingMiddleware:
+    """
+    リクエストごとにSQLの実行回数・合計時間を計測するASGIミドルウェア
+
+    結果は Server-Timing ヘッダー（db;dur=ミリ秒;desc="N queries"）で返し、ルートごとに集計する。
+    実行回数か実行時間が予算を超えたリクエスト、同じ形のSQLを繰り返し実行したリクエスト（N+1の可能性）は
+    SQLの指紋と回数を警告ログに出力する。
+    ヘッダーはレスポンスの開始時点までの値のため、ストリーミングの本文の読み出し中のSQLは集計とログのみに含まれる。
+    グループコミットの打刻はキューのワーカーで実行されるため、リクエストには含まれない。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        statement_budget: int,
+        time_budget_ms: float,
+        route_budgets: Mapping[str, int],
+        repeated_threshold: int,
+    ) -> None:
+        self.app = app
+        self.statement_budget = statement_budget
+        self.time_budget_ms = time_budget_ms
+        self.route_budgets = route_budgets
+        self.repeated_threshold = repeated_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tracker, token = start_tracking()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(
+                    "Server-Timing",
+                    f'db;dur={tracker.total_seconds * 1000:.1f};desc="{tracker.count} queries"',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stop_tracking(token)
+            self._finish(scope["method"], get_route_label(scope), tracker)
+
+    def _finish(self, method: str, route: str, tracker: QueryTracker) -> None:
+        """ルートごとに集計し、予算超過・繰り返し実行を警告"""
+        stats = query_metrics.get((method, route))
+        if stats is None:
+            stats = query_metrics[(method, route)] = QueryRouteStats()
+        stats.statements += tracker.count
+        stats.seconds += tracker.total_seconds
+
+        route_key = f"{method} {route}"
+        budget = self.route_budgets.get(route_key, self.statement_budget)
+        elapsed_ms = tracker.total_seconds * 1000
+        over_budget = tracker.count > budget or elapsed_ms > self.time_budget_ms
+        if not over_budget and tracker.count < self.repeated_threshold:
+            return
+
+        fingerprints = tracker.fingerprints()
+        repeated = [(fingerprint, count) for fingerprint, count in fingerprints if count >= self.repeated_threshold]
+        if repeated:
+            stats.repeated += 1
+            logger.warning(
+                f"Repeated SQL statements (possible N+1) in {route_key}:"
+                + "".join(f"\n  {count}x {fingerprint[:300]}" for fingerprint, count in repeated)
+            )
+        if over_budget:
+            stats.budget_exceeded += 1
+            logger.warning(
+                f"SQL budget exceeded in {route_key}: {tracker.count} statements, {elapsed_ms:.1f}ms "
+                f"(budget {budget} statements, {self.time_budget_ms:.1f}ms):"
+                + "".join(f"\n  {count}x {fingerprint[:300]}" for fingerprint, count in fingerprints[:10])
+            )
+
+
+request_metrics = RequestMetrics()
+
+# (method, route) ごとのSQL実行回数・時間
+query_metrics: Dict[Tuple[str, str], QueryRouteStats] = {}
+
+
+def _escape(value: Any) -> str:
+    """ラベルの値をエスケープ（バックスラッシュ・ダブルクォート・改行）"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Mapping[str, Any]) -> str:
+    """ラベルを {name="value",...} の形式に整形"""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class PrometheusWriter:
+    """Prometheusのテキスト形式（version 0.0.4）の出力"""
+
+    def __init__(self, namespace: str = "timecard") -> None:
+        self.namespace = namespace
+        self._lines: List[str] = []
+
+    def metric(
+        self,
+        name: str,
+        metric_type: str,
+        help_text: str,
+        samples: Iterable[Tuple[Mapping[str, Any], float]],
+    ) -> None:
+        """メトリクス1つ分（HELP・TYPEとサンプル）を追加"""
+        full_name = f"{self.namespace}_{name}"
+        self._lines.append(f"# HELP {full_name} {help_text}")
+        self._lines.append(f"# TYPE {full_name} {metric_type}")
+        for labels, value in samples:
+            self._lines.append(f"{full_name}{_labels(labels)} {value}")
+
+    def histogram(self, name: str, help_text: str, histograms: Mapping[Tuple[str, str], Histogram]) -> None:
+        """(method, route) ごとのヒストグラムを追加"""
+        full_name = f"{self.namespace}_{name}"
+        self._lines.append(f"# HELP {full_name} {help_text}")
+        self._lines.append(f"# TYPE {full_name} histogram")
+        for (method, route), histogram in sorted(histograms.items()):
+            labels = {"method": method, "route": route}
+            for bound, count in histogram.cumulative():
+                self._lines.append(f"{full_name}_bucket{_labels({**labels, 'le': bound})} {count}")
+            self._lines.append(f"{full_name}_sum{_labels(labels)} {histogram.sum}")
+            self._lines.append(f"{full_name}_count{_labels(labels)} {histogram.count}")
+
+    def render(self) -> str:
+        """出力全体を取得"""
+        return "\n".join(self._lines) + "\n"
+
+
+def write_request_metrics(writer: PrometheusWriter, metrics: RequestMetrics) -> None:
+    """リクエストのレイテンシ・件数・処理中の数を追加"""
+    writer.histogram(
+        "http_request_duration_seconds", "ルートごとのリクエストの処理時間（秒）", metrics.latencies
+    )
+    writer.metric(
+        "http_requests_total", "counter", "ルート・ステータスコードごとのリクエスト数",
+        (
+            ({"method": method, "route": route, "status": status_code}, count)
+            for (method, route, status_code), count in sorted(metrics.responses.items())
+        ),
+    )
+    writer.metric(
+        "http_requests_in_flight", "gauge", "処理中のリクエスト数", [({}, metrics.in_flight)]
+    )
+
+
+def write_query_metrics(writer: PrometheusWriter, routes: Mapping[Tuple[str, str], QueryRouteStats]) -> None:
+    """ルートごとのSQL実行回数・時間と予算超過・繰り返し実行の件数を追加"""
+    items = sorted(routes.items())
+    for attribute, name, help_text in (
+        ("statements", "db_statements_total", "ルートごとのSQL実行回数"),
+        ("seconds", "db_statement_seconds_total", "ルートごとのSQL実行時間の合計（秒）"),
+        ("budget_exceeded", "db_budget_exceeded_total", "SQLの実行回数・時間の予算を超えたリクエスト数"),
+        ("repeated", "db_repeated_statements_total", "同じ形のSQLを繰り返し実行したリクエスト数（N+1の可能性）"),
+    ):
+        writer.metric(name, "counter", help_text, (
+            ({"method": method, "route": route}, getattr(stats, attribute)) for (method, route), stats in items
+        ))
+
+
+def write_pool_metrics(writer: PrometheusWriter, pools: Mapping[str, Dict[str, Any]]) -> None:
+    """コネクションプールの使用状況（get_pool_statistics の結果）を追加"""
+    gauges = (
+        ("size", "db_pool_size", "プールに常時保持する接続数"),
+        ("checked_out", "db_pool_checked_out", "使用中の接続数"),
+        ("checked_in", "db_pool_checked_in", "プールで待機中の接続数"),
+        ("overflow", "db_pool_overflow", "pool_size を超えて作成された接続数"),
+    )
+    for key, name, help_text in gauges:
+        writer.metric(name, "gauge", help_text, (
+            ({"pool": pool}, stats[key]) for pool, stats in pools.items() if key in stats
+        ))
+    counters = (
+        ("checkouts", "db_pool_checkouts_total", "接続のチェックアウト数"),
+        ("timeouts", "db_pool_timeouts_total", "接続待ちのタイムアウト数"),
+    )
+    for key, name, help_text in counters:
+        writer.metric(name, "counter", help_text, (
+            ({"pool": pool}, stats[key]) for pool, stats in pools.items()
+        ))
+    writer.metric("db_pool_wait_seconds_total", "counter", "接続の取得を待った時間の合計（秒）", (
+        ({"pool": pool}, stats["total_wait_ms"] / 1000) for pool, stats in pools.items()
+    ))
+
+
+def write_cache_metrics(writer: PrometheusWriter, caches: Mapping[str, Dict[str, Any]]) -> None:
+    """プロセス内キャッシュ（TTLCache.stats の結果）のヒット・ミス・件数を追加"""
+    for key, name, metric_type, help_text in (
+        ("hits", "cache_hits_total", "counter", "キャッシュのヒット数"),
+        ("misses", "cache_misses_total", "counter", "キャッシュのミス数"),
+        ("evictions", "cache_evictions_total", "counter", "上限件数による追い出し数"),
+        ("size", "cache_entries", "gauge", "キャッシュの件数"),
+        ("hit_rate", "cache_hit_ratio", "gauge", "キャッシュのヒット率"),
+    ):
+        writer.metric(name, metric_type, help_text, (
+            ({"cache": cache}, stats[key]) for cache, stats in caches.items() if key in stats
+        ))
+
+
+def render_metrics(
+    metrics: RequestMetrics,
+    pools: Mapping[str, Dict[str, Any]],
+    caches: Mapping[str, Dict[str, Any]],
+    extra: Optional[Mapping[str, Tuple[str, str, float]]] = None,
+) -> str:
+    """
+    メトリクス全体をPrometheusのテキスト形式で出力
+
+    Args:
+        extra: 名前 → (型, 説明, 値) の単一の値のメトリクス（キューの深さなど）
+    """
+    writer = PrometheusWriter()
+    write_request_metrics(writer, metrics)
+    write_query_metrics(writer, query_metrics)
+    write_pool_metrics(writer, pools)
+    write_cache_metrics(writer, caches)
+    for name, (metric_type, help_text, value) in (extra or {}).items():
+        writer.metric(name, metric_type, help_text, [({}, value)])
+    return writer.render()
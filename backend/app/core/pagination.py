@@ -0,0 +1,38 @@
+"""キーセット（カーソル）ページネーションのユーティリティ"""
+import base64
+import json
+from typing import Any, List, Optional
+
+from fastapi import Request, Response
+
+
+def encode_cursor(*values: Any) -> str:
+    """最後の行のソートキーを不透明なカーソル文字列に変換"""
+    payload = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    カーソル文字列をソートキーの値に戻す
+
+    Raises:
+        ValueError: 形式が不正な場合
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("カーソルが不正です") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("カーソルが不正です")
+    return values
+
+
+def set_next_cursor(request: Request, response: Response, cursor: Optional[str]) -> None:
+    """次ページのカーソルを X-Next-Cursor と Link ヘッダーで返す（最終ページでは何もしない）"""
+    if cursor is None:
+        return
+    next_url = request.url.include_query_params(cursor=cursor)
+    response.headers["X-Next-Cursor"] = cursor
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
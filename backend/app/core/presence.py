@@ -0,0 +1,121 @@
+"""今日の在席状況（勤務中・休憩中・退勤済み）のプロセス内インデックス"""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+# 在席状況（未出勤のユーザーはインデックスに含めない）
+WORKING = "working"  # 勤務中
+ON_BREAK = "on_break"  # 休憩中
+CLOCKED_OUT = "clocked_out"  # 退勤済み
+STATES = (WORKING, ON_BREAK, CLOCKED_OUT)
+
+
+@dataclass
+class PresenceMember:
+    """在席状況の1ユーザー分"""
+    user_id: int
+    employee_id: Optional[str]
+    first_name: str
+    last_name: str
+    department: Optional[str]
+    state: str
+    since: Optional[datetime]  # 状態が変わった時刻（勤怠記録の updated_at）
+
+
+class PresenceIndex:
+    """
+    今日の在席状況を部署ごとに保持するスレッドセーフなインデックス
+
+    打刻・休憩の処理がコミット後に update で反映し、起動時に replace でデータベースから作り直す。
+    日付が変わると前日分は返さない（最初の打刻または作り直しで新しい日付に切り替わる）。
+    """
+
+    def __init__(self) -> None:
+        self._date: Optional[date] = None
+        self._members: Dict[int, PresenceMember] = {}
+        self._departments: Dict[Optional[str], Dict[int, PresenceMember]] = {}
+        self._lock = threading.Lock()
+        self.rebuilt_at: Optional[float] = None  # 最後に作り直した時刻（time.monotonic）
+        self.updates = 0
+
+    def _reset(self, day: date) -> None:
+        self._date = day
+        self._members = {}
+        self._departments = {}
+
+    def _put(self, member: PresenceMember) -> None:
+        previous = self._members.get(member.user_id)
+        if previous is not None:
+            members = self._departments[previous.department]
+            members.pop(member.user_id, None)
+            if not members:
+                del self._departments[previous.department]
+        self._members[member.user_id] = member
+        self._departments.setdefault(member.department, {})[member.user_id] = member
+
+    def update(self, day: date, member: PresenceMember) -> None:
+        """1ユーザーの在席状況を反映（部署の移動にも対応する）"""
+        with self._lock:
+            if self._date != day:
+                if self._date is not None and day < self._date:
+                    return
+                self._reset(day)
+            self._put(member)
+            self.updates += 1
+
+    def replace(self, day: date, members: Iterable[PresenceMember]) -> None:
+        """指定日の在席状況で全体を置き換え"""
+        with self._lock:
+            self._reset(day)
+            for member in members:
+                self._put(member)
+            self.rebuilt_at = time.monotonic()
+
+    def snapshot(self, department: Optional[str] = None, all_departments: bool = True) -> dict:
+        """
+        部署ごとの状態別人数とメンバー一覧を取得
+
+        Args:
+            department: 対象部署（all_departments=False の場合のみ使用。Noneは未所属）
+            all_departments: 全部署を返すか
+        """
+        today = date.today()
+        with self._lock:
+            if self._date != today:
+                departments = {}
+            elif all_departments:
+                departments = {key: list(members.values()) for key, members in self._departments.items()}
+            else:
+                departments = {department: list(self._departments.get(department, {}).values())}
+
+        result: List[dict] = []
+        for key, members in departments.items():
+            counts = dict.fromkeys(STATES, 0)
+            for member in members:
+                counts[member.state] += 1
+            result.append({
+                "department": key,
+                **counts,
+                "members": [member.__dict__ for member in members],
+            })
+        result.sort(key=lambda item: (item["department"] is None, item["department"] or ""))
+        return {"date": today, "departments": result}
+
+    def stats(self) -> dict:
+        """インデックスの件数と最後に作り直してからの経過秒数を取得"""
+        with self._lock:
+            return {
+                "date": self._date.isoformat() if self._date else None,
+                "members": len(self._members),
+                "departments": len(self._departments),
+                "updates": self.updates,
+                "seconds_since_rebuild": (
+                    round(time.monotonic() - self.rebuilt_at, 1) if self.rebuilt_at is not None else None
+                ),
+            }
+
+
+# 今日の在席状況（打刻・休憩の処理と起動時の作り直しで更新する）
+presence_index = PresenceIndex()
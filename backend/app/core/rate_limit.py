@@ -0,0 +1,267 @@
+"""ログインのレート制限（トークンバケット）"""
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryTokenBucketStore:
+    """
+    プロセス内のトークンバケット
+
+    キーごとに (残りトークン数, 最終更新時刻) を保持する。上限件数を超えた場合は
+    最も長く使われていないキーから削除する（削除されたキーは満タンのバケットとして扱う）。
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        """
+        トークンを1つ消費する
+
+        Returns:
+            消費できた場合は0、できなかった場合は次のトークンが貯まるまでの秒数
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                self._buckets.move_to_end(key)
+                while len(self._buckets) > self.max_size:
+                    self._buckets.popitem(last=False)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+        return (1 - tokens) / refill_per_second
+
+    def peek(self, key: str, capacity: float, refill_per_second: float) -> float:
+        """
+        トークンを消費せずに残りを確認する
+
+        Returns:
+            トークンが残っている場合は0、残っていない場合は次のトークンが貯まるまでの秒数
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+        if bucket is None:
+            return 0.0
+        tokens, updated_at = bucket
+        tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+        return 0.0 if tokens >= 1 else (1 - tokens) / refill_per_second
+
+    def stats(self) -> Dict[str, Any]:
+        """件数などの統計を取得"""
+        return {"backend": "memory", "size": len(self._buckets), "max_size": self.max_size}
+
+
+class SQLiteTokenBucketStore:
+    """
+    複数ワーカー（プロセス）で共有するSQLiteファイルのトークンバケット
+
+    1回の消費を BEGIN IMMEDIATE のトランザクション内で読み書きするため、
+    同じキーへの同時のログイン試行がワーカー間で競合しても二重に消費されない。
+    他ワーカーの書き込みを busy_timeout 秒待ってもロックを取れない場合は、ログインを止めないよう
+    制限せずに許可し、回数を記録する。
+    """
+
+    def __init__(self, path: str, max_size: int, busy_timeout: float = 0.25) -> None:
+        self.path = path
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=busy_timeout, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS login_rate_limit ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_login_rate_limit_updated_at ON login_rate_limit (updated_at)"
+        )
+        self._writes = 0
+        self.busy = 0  # ロックを取れずに制限せず許可した回数
+
+    def _purge(self) -> None:
+        """上限件数を超えた分を最終更新の古い順に削除"""
+        self._connection.execute(
+            "DELETE FROM login_rate_limit WHERE key IN ("
+            "SELECT key FROM login_rate_limit ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_size,),
+        )
+
+    def _busy(self, key: str, error: sqlite3.OperationalError) -> float:
+        """ロックを取れなかった試行を制限せずに許可する"""
+        self.busy += 1
+        logger.warning("Login rate limit store is busy; allowing %s without limiting: %s", key, error)
+        return 0.0
+
+    def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        """
+        トークンを1つ消費する
+
+        Returns:
+            消費できた場合は0、できなかった場合は次のトークンが貯まるまでの秒数
+        """
+        # ワーカー間で共有するため、単調時計ではなく壁時計を使う
+        now = time.time()
+        with self._lock:
+            try:
+                self._connection.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError as e:
+                return self._busy(key, e)
+            try:
+                row = self._connection.execute(
+                    "SELECT tokens, updated_at FROM login_rate_limit WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, updated_at = row if row is not None else (capacity, now)
+                tokens = min(capacity, tokens + max(0.0, now - updated_at) * refill_per_second)
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= 1
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO login_rate_limit (key, tokens, updated_at) VALUES (?, ?, ?)",
+                    (key, tokens, now),
+                )
+                self._writes += 1
+                if self._writes % 1000 == 0:
+                    self._purge()
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return 0.0 if allowed else (1 - tokens) / refill_per_second
+
+    def peek(self, key: str, capacity: float, refill_per_second: float) -> float:
+        """
+        トークンを消費せずに残りを確認する（書き込みは行わない）
+
+        Returns:
+            トークンが残っている場合は0、残っていない場合は次のトークンが貯まるまでの秒数
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._connection.execute(
+                    "SELECT tokens, updated_at FROM login_rate_limit WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.OperationalError as e:
+                return self._busy(key, e)
+        if row is None:
+            return 0.0
+        tokens, updated_at = row
+        tokens = min(capacity, tokens + max(0.0, now - updated_at) * refill_per_second)
+        return 0.0 if tokens >= 1 else (1 - tokens) / refill_per_second
+
+    def stats(self) -> Dict[str, Any]:
+        """件数などの統計を取得"""
+        with self._lock:
+            (size,) = self._connection.execute("SELECT COUNT(*) FROM login_rate_limit").fetchone()
+        return {"backend": "sqlite", "size": size, "max_size": self.max_size, "busy": self.busy}
+
+
+TokenBucketStore = Union[MemoryTokenBucketStore, SQLiteTokenBucketStore]
+
+
+class LoginRateLimiter:
+    """
+    メールアドレスごと・クライアントIPごとのログイン試行のレート制限
+
+    どちらのバケットも burst 回まで消費でき、その後は per_minute 回/分のペースで回復する。
+    メールアドレスのバケットは全ての試行で、クライアントIPのバケットは失敗した試行でのみ消費する。
+    NATやプロキシの背後で多数の従業員が同じIPから一斉にログインしても、成功する限りIPでは制限されない。
+    ユーザー検索やパスワード検証（bcrypt）の前に判定し、制限を超えた試行の件数を記録する。
+    """
+
+    def __init__(
+        self,
+        store: TokenBucketStore,
+        email_burst: int,
+        email_per_minute: float,
+        ip_burst: int,
+        ip_per_minute: float,
+    ) -> None:
+        self.store = store
+        self.email_burst = email_burst
+        self.email_refill = email_per_minute / 60
+        self.ip_burst = ip_burst
+        self.ip_refill = ip_per_minute / 60
+        self.allowed = 0
+        self.rejected_email = 0
+        self.rejected_ip = 0
+        self.failed = 0
+
+    def check(self, email: str, client_ip: Optional[str]) -> float:
+        """
+        ログイン試行を1回分消費する
+
+        IPの制限（失敗の回数）を先に判定し、IPで拒否した試行はメールアドレスのバケットを消費しない。
+
+        Returns:
+            試行できる場合は0、できない場合は再試行までの秒数
+        """
+        if client_ip is not None:
+            retry_after = self.store.peek(f"ip:{client_ip}", self.ip_burst, self.ip_refill)
+            if retry_after:
+                self.rejected_ip += 1
+                return retry_after
+
+        retry_after = self.store.take(f"email:{email.strip().lower()}", self.email_burst, self.email_refill)
+        if retry_after:
+            self.rejected_email += 1
+            return retry_after
+
+        self.allowed += 1
+        return 0.0
+
+    def record_failure(self, client_ip: Optional[str]) -> None:
+        """失敗したログイン試行をクライアントIPのバケットから消費する"""
+        self.failed += 1
+        if client_ip is not None:
+            self.store.take(f"ip:{client_ip}", self.ip_burst, self.ip_refill)
+
+    def stats(self) -> Dict[str, Any]:
+        """許可・拒否の件数とバケットの件数を取得"""
+        return {
+            **self.store.stats(),
+            "allowed": self.allowed,
+            "rejected_email": self.rejected_email,
+            "rejected_ip": self.rejected_ip,
+            "failed": self.failed,
+        }
+
+
+def create_login_rate_limiter() -> LoginRateLimiter:
+    """設定（login_rate_limit_backend）に応じたレート制限を作成"""
+    if settings.login_rate_limit_backend == "sqlite":
+        store: TokenBucketStore = SQLiteTokenBucketStore(
+            settings.login_rate_limit_path,
+            max_size=settings.login_rate_limit_max_keys,
+            busy_timeout=settings.login_rate_limit_busy_timeout_seconds,
+        )
+    elif settings.login_rate_limit_backend == "memory":
+        store = MemoryTokenBucketStore(max_size=settings.login_rate_limit_max_keys)
+    else:
+        raise ValueError(f"未対応のレート制限のバックエンドです: {settings.login_rate_limit_backend}")
+    return LoginRateLimiter(
+        store,
+        email_burst=settings.login_rate_limit_email_burst,
+        email_per_minute=settings.login_rate_limit_email_per_minute,
+        ip_burst=settings.login_rate_limit_ip_burst,
+        ip_per_minute=settings.login_rate_limit_ip_per_minute,
+    )
+
+
+login_rate_limiter = create_login_rate_limiter()
@@ -1,16 +1,29 @@
 """セキュリティ関連のユーティリティ"""
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Set
+from typing import Optional
+
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.executor import BoundedExecutor
+from app.core.token_blacklist import create_token_blacklist, get_token_digest
 from app.schemas.auth import TokenData
 
 # パスワードハッシュ化コンテキスト
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# トークンブラックリスト（実際の運用ではRedis等を使用）
-token_blacklist: Set[str] = set()
+# bcryptはCPUを数百ミリ秒使うため、イベントループ外の上限付きスレッドプールで実行する
+password_executor = BoundedExecutor(max_workers=settings.password_hash_max_workers, name="password-hash")
+
+# トークンブラックリスト（トークンのダイジェストを有効期限まで保持）
+token_blacklist = create_token_blacklist()
+
+# 検証済みトークンのキャッシュ（トークンのダイジェスト → クレーム）
+# 各エントリはトークンの有効期限（exp）で失効する
+token_cache: TTLCache[TokenData] = TTLCache(max_size=settings.token_cache_max_size, ttl_seconds=0)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -23,6 +36,16 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """パスワードをスレッドプールで検証"""
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """パスワードをスレッドプールでハッシュ化"""
+    return await password_executor.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """アクセストークンを作成"""
     to_encode = data.copy()
@@ -39,9 +62,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 def verify_token(token: str) -> Optional[TokenData]:
     """トークンを検証"""
     # ブラックリストチェック
-    if token in token_blacklist:
+    digest = get_token_digest(token)
+    if token_blacklist.contains(digest):
         return None
     
+    # 署名検証済みのトークンはキャッシュから返す
+    cached = token_cache.get(digest)
+    if cached is not None:
+        return cached
+    
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         email: str = payload.get("sub")
@@ -51,23 +80,41 @@ def verify_token(token: str) -> Optional[TokenData]:
         if email is None:
             return None
         
-        return TokenData(email=email, user_id=user_id, role=role)
+        token_data = TokenData(email=email, user_id=user_id, role=role)
+        expires_at = payload.get("exp")
+        if expires_at is not None:
+            token_cache.set(digest, token_data, ttl_seconds=expires_at - time.time())
+        return token_data
     except JWTError:
         return None
 
 
+def get_token_expiration(token: str) -> float:
+    """トークンの有効期限（UNIX時刻）を取得（読み取れない場合は発行時の有効期間で見積もる）"""
+    try:
+        expires_at = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        expires_at = None
+    if isinstance(expires_at, (int, float)):
+        return float(expires_at)
+    return time.time() + settings.access_token_expire_minutes * 60
+
+
 def add_to_blacklist(token: str) -> None:
     """トークンをブラックリストに追加"""
-    token_blacklist.add(token)
+    digest = get_token_digest(token)
+    expires_at = get_token_expiration(token)
+    # 期限切れのトークンは検証で拒否されるため保持しない
+    if expires_at > time.time():
+        token_blacklist.add(digest, expires_at)
+    token_cache.invalidate(digest)
 
 
 def is_token_blacklisted(token: str) -> bool:
     """トークンがブラックリストに含まれているかチェック"""
-    return token in token_blacklist
+    return token_blacklist.contains(get_token_digest(token))
 
 
 def clear_expired_tokens() -> None:
     """期限切れのトークンをブラックリストから削除"""
-    # 実際の運用では、トークンの有効期限をチェックして削除
-    # 現在の実装では、サーバー再起動時にクリアされる
-    pass 
\ No newline at end of file
+    token_blacklist.purge_expired() 
\ No newline at end of file
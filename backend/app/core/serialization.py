@@ -0,0 +1,61 @@
+"""一覧系レスポンスの高速なシリアライズ"""
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    get_args,
+    get_origin,
+)
+
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+class FastSerializer:
+    """
+    ORMオブジェクトをレスポンススキーマの形のJSONへ直接変換するシリアライザー
+
+    自前のデータベースから読み出した値を response_model で再検証せず、スキーマの
+    フィールド順に属性を読み出した辞書を pydantic_core の to_json（Rust実装）でJSONにする。
+    日時・列挙型などの表現は response_model を使った場合と同じになる。
+    """
+
+    def __init__(self, model: Type[BaseModel]) -> None:
+        self.model = model
+        # (フィールド名, ネストしたスキーマのシリアライザー) を事前に作成しておく
+        self._fields: List[Tuple[str, Optional["FastSerializer"]]] = [
+            (name, FastSerializer._nested_serializer(field.annotation))
+            for name, field in model.model_fields.items()
+        ]
+
+    @staticmethod
+    def _nested_serializer(annotation: Any) -> Optional["FastSerializer"]:
+        """List[スキーマ] のフィールドであれば要素のシリアライザーを作成"""
+        if get_origin(annotation) in (list, List):
+            (item_type,) = get_args(annotation)
+            if isinstance(item_type, type) and issubclass(item_type, BaseModel):
+                return FastSerializer(item_type)
+        return None
+
+    def to_dict(self, obj: Any) -> Dict[str, Any]:
+        """オブジェクトの属性をスキーマのフィールド順の辞書にする"""
+        row = {}
+        for name, nested in self._fields:
+            value = getattr(obj, name)
+            if nested is not None:
+                value = [nested.to_dict(item) for item in value]
+            row[name] = value
+        return row
+
+    def dumps(self, objs: Iterable[Any]) -> bytes:
+        """オブジェクトの一覧をJSONのバイト列にする"""
+        return to_json([self.to_dict(obj) for obj in objs])
+
+    def response(self, objs: Iterable[Any]) -> Response:
+        """オブジェクトの一覧をJSONレスポンスにする（FastAPIの response_model による検証は行われない）"""
+        return Response(content=self.dumps(objs), media_type="application/json")
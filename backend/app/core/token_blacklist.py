@@ -0,0 +1,295 @@
+"""トークンブラックリストのストア"""
+import hashlib
+import heapq
+import logging
+import math
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CapacityMonitor:
+    """
+    ブラックリストの件数が上限を超えたことの警告
+
+    有効期限内のトークンを削除するとログアウト済みのトークンが再び使えてしまうため、
+    どちらのバックエンドも上限を超えてもエントリを削除せず、超えた時点で1回だけ警告する。
+    上限はトークンの有効期限内に発生するログアウト数より大きく設定する。
+    """
+
+    def __init__(self, backend: str, max_size: int) -> None:
+        self.backend = backend
+        self.max_size = max_size
+        self.exceeded_count = 0  # 上限を超えた回数
+        self._exceeded = False
+
+    def check(self, size: int) -> None:
+        """件数を確認し、上限を超えた時点で警告する（上限を下回ると再び警告できる）"""
+        if size <= self.max_size:
+            self._exceeded = False
+            return
+        if not self._exceeded:
+            self._exceeded = True
+            self.exceeded_count += 1
+            logger.warning(
+                "Token blacklist (%s) holds %d unexpired tokens, above TOKEN_BLACKLIST_MAX_SIZE=%d; "
+                "entries are kept until they expire",
+                self.backend, size, self.max_size,
+            )
+
+
+class BloomFilter:
+    """
+    ブラックリストの所属判定用の省メモリな前段フィルター
+
+    偽陽性はあるが偽陰性はないため、「含まれない」と判定されたトークンは
+    共有ストアを参照せずに有効と判断できる。削除はできないため再構築で対応する。
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.001) -> None:
+        capacity = max(capacity, 1)
+        self.size_bits = max(8, int(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.size_bits + 7) // 8)
+
+    def _positions(self, digest: str) -> Iterable[int]:
+        # SHA-256のダイジェストを2つのハッシュ値に分けて k 個の位置を導出する（ダブルハッシング）
+        h1 = int(digest[:16], 16)
+        h2 = int(digest[16:32], 16) | 1
+        return ((h1 + i * h2) % self.size_bits for i in range(self.hash_count))
+
+    def add(self, digest: str) -> None:
+        """ダイジェストを追加"""
+        for position in self._positions(digest):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, digest: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+
+class MemoryTokenBlacklist:
+    """
+    プロセス内のブラックリスト
+
+    トークンの有効期限を保持し、期限切れのエントリは追加・参照時に自動で削除する。
+    有効期限内のエントリは上限件数を超えても削除しない（超えた場合は警告する）。
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._expirations: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self._capacity = CapacityMonitor("memory", max_size)
+
+    def _purge(self, now: float) -> None:
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, digest = heapq.heappop(self._heap)
+            if self._expirations.get(digest) == expires_at:
+                del self._expirations[digest]
+
+    def add(self, digest: str, expires_at: float) -> None:
+        """ダイジェストを有効期限付きで追加"""
+        with self._lock:
+            self._expirations[digest] = expires_at
+            heapq.heappush(self._heap, (expires_at, digest))
+            self._purge(time.time())
+            self._capacity.check(len(self._expirations))
+
+    def contains(self, digest: str) -> bool:
+        """ダイジェストが有効期限内でブラックリストに含まれているか"""
+        expires_at = self._expirations.get(digest)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            self.purge_expired()
+            return False
+        return True
+
+    def purge_expired(self) -> None:
+        """期限切れのエントリを削除"""
+        with self._lock:
+            self._purge(time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        """件数などの統計を取得"""
+        return {
+            "backend": "memory",
+            "size": len(self._expirations),
+            "max_size": self.max_size,
+            "max_size_exceeded": self._capacity.exceeded_count,
+        }
+
+
+class SQLiteTokenBlacklist:
+    """
+    複数ワーカー（プロセス）で共有するSQLiteファイルのブラックリスト
+
+    参照時はまずプロセス内のBloomFilterで判定し、含まれる可能性がある場合のみSQLiteを参照する。
+    他プロセスで追加されたトークンは sync_interval_seconds ごとに、前回以降に追加された行（id）だけを
+    フィルターに追加して反映する。期限切れの削除とフィルターの再構築（全件の読み込み）は
+    rebuild_interval_seconds ごとにバックグラウンドのスレッドで行い、参照（イベントループ）を止めない。
+    プロセス内のブラックリストと同様に、有効期限内のエントリは上限件数を超えても削除しない。
+    """
+
+    def __init__(
+        self, path: str, sync_interval_seconds: float, capacity: int, rebuild_interval_seconds: float = 0.0
+    ) -> None:
+        self.path = path
+        self.sync_interval_seconds = sync_interval_seconds
+        self.rebuild_interval_seconds = rebuild_interval_seconds
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._connection = self._connect()
+        self._create_table()
+        self.lookups = 0  # 前段フィルターを通過してSQLiteを参照した回数
+        self.filtered = 0  # 前段フィルターだけで判定できた回数
+        self.rebuilds = 0  # フィルターを再構築した回数
+        self._filter = BloomFilter(capacity)
+        self._last_id = 0  # フィルターに反映済みの最大のid
+        self._synced_at = 0.0
+        self._capacity = CapacityMonitor("sqlite", capacity)
+        self._rebuild()
+        if rebuild_interval_seconds > 0:
+            threading.Thread(target=self._rebuild_loop, name="token-blacklist-rebuild", daemon=True).start()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+
+    def _create_table(self) -> None:
+        """テーブルを作成（idのない旧形式のテーブルは移行する）"""
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(token_blacklist)")]
+        if columns and "id" not in columns:
+            self._connection.execute("ALTER TABLE token_blacklist RENAME TO token_blacklist_old")
+            self._connection.execute("DROP INDEX IF EXISTS ix_token_blacklist_expires_at")
+        # AUTOINCREMENT のidは再利用されないため、前回以降に追加された行だけを読み込める
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS token_blacklist ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, digest TEXT NOT NULL UNIQUE, expires_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_token_blacklist_expires_at ON token_blacklist (expires_at)"
+        )
+        if columns and "id" not in columns:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO token_blacklist (digest, expires_at) "
+                "SELECT digest, expires_at FROM token_blacklist_old"
+            )
+            self._connection.execute("DROP TABLE token_blacklist_old")
+
+    def _catch_up(self) -> None:
+        """前回以降に追加された行を前段フィルターに追加（呼び出し側で _lock を取得する）"""
+        rows = self._connection.execute(
+            "SELECT id, digest FROM token_blacklist WHERE id > ? ORDER BY id", (self._last_id,)
+        ).fetchall()
+        for row_id, digest in rows:
+            self._filter.add(digest)
+            self._last_id = row_id
+        self._synced_at = time.time()
+
+    def _rebuild(self) -> None:
+        """期限切れを削除し、共有ストアの内容から前段フィルターを再構築"""
+        now = time.time()
+        # 参照用のコネクションとロックを塞がないよう、別のコネクションで読み込む
+        connection = self._connect()
+        try:
+            connection.execute("DELETE FROM token_blacklist WHERE expires_at <= ?", (now,))
+            rows = connection.execute(
+                "SELECT id, digest FROM token_blacklist WHERE expires_at > ?", (now,)
+            ).fetchall()
+        finally:
+            connection.close()
+        bloom_filter = BloomFilter(max(self.capacity, len(rows) * 2))
+        last_id = 0
+        for row_id, digest in rows:
+            bloom_filter.add(digest)
+            last_id = max(last_id, row_id)
+
+        with self._lock:
+            self._filter = bloom_filter
+            # 読み込み後に追加された行（このプロセスの add を含む）を新しいフィルターに反映する
+            self._last_id = last_id
+            self._catch_up()
+            self.rebuilds += 1
+        self._capacity.check(len(rows))
+
+    def _rebuild_loop(self) -> None:
+        while True:
+            time.sleep(self.rebuild_interval_seconds)
+            try:
+                self._rebuild()
+            except Exception:
+                logger.exception("Failed to rebuild the token blacklist filter")
+
+    def add(self, digest: str, expires_at: float) -> None:
+        """ダイジェストを有効期限付きで追加"""
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT OR REPLACE INTO token_blacklist (digest, expires_at) VALUES (?, ?)",
+                (digest, expires_at),
+            )
+            self._filter.add(digest)
+            # 間に他プロセスの行がなければ、次の反映で自分の行を読み直さない
+            if cursor.lastrowid == self._last_id + 1:
+                self._last_id = cursor.lastrowid
+
+    def contains(self, digest: str) -> bool:
+        """ダイジェストが有効期限内でブラックリストに含まれているか"""
+        if time.time() - self._synced_at >= self.sync_interval_seconds:
+            with self._lock:
+                self._catch_up()
+
+        if digest not in self._filter:
+            self.filtered += 1
+            return False
+
+        self.lookups += 1
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT expires_at FROM token_blacklist WHERE digest = ?", (digest,)
+            ).fetchone()
+        return row is not None and row[0] > time.time()
+
+    def purge_expired(self) -> None:
+        """期限切れのエントリを削除"""
+        self._rebuild()
+
+    def stats(self) -> Dict[str, Any]:
+        """件数などの統計を取得"""
+        with self._lock:
+            (size,) = self._connection.execute("SELECT COUNT(*) FROM token_blacklist").fetchone()
+        return {
+            "backend": "sqlite",
+            "size": size,
+            "max_size": self.capacity,
+            "max_size_exceeded": self._capacity.exceeded_count,
+            "filtered": self.filtered,
+            "lookups": self.lookups,
+            "rebuilds": self.rebuilds,
+            "filter_bytes": (self._filter.size_bits + 7) // 8,
+        }
+
+
+def get_token_digest(token: str) -> str:
+    """トークンのダイジェストを取得（トークン自体は保持しない）"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def create_token_blacklist() -> Union[MemoryTokenBlacklist, SQLiteTokenBlacklist]:
+    """設定（token_blacklist_backend）に応じたブラックリストを作成"""
+    if settings.token_blacklist_backend == "sqlite":
+        return SQLiteTokenBlacklist(
+            settings.token_blacklist_path,
+            sync_interval_seconds=settings.token_blacklist_sync_interval_seconds,
+            capacity=settings.token_blacklist_max_size,
+            rebuild_interval_seconds=settings.token_blacklist_rebuild_interval_seconds,
+        )
+    if settings.token_blacklist_backend != "memory":
+        raise ValueError(f"未対応のブラックリストのバックエンドです: {settings.token_blacklist_backend}")
+    return MemoryTokenBlacklist(max_size=settings.token_blacklist_max_size)
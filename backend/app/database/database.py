@@ -1,18 +1,74 @@
 """データベース設定"""
+from typing import Any, AsyncIterator, Dict, Optional, Union
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
-# SQLiteデータベースURL（開発用）
-SQLALCHEMY_DATABASE_URL = "sqlite:///./timecard_clone.db"
+from app.core.config import settings
+from app.database.pool_stats import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    describe_pool,
+    instrument_engine,
+)
+from app.database.query_stats import instrument_queries
+
+# プール統計の識別名
+SYNC_POOL_NAME = "timecard-sync"
+ASYNC_POOL_NAME = "timecard-async"
+
+
+def get_engine_options(database_url: str, is_async: bool = False) -> Dict[str, Any]:
+    """データベースの種類に応じたエンジン設定を作成"""
+    url = make_url(database_url)
+    queue_pool = InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool
+
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            # インメモリDBは接続ごとに別のDBになるため、1接続を共有する
+            return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+        # ファイルDBはローカル接続のため生存確認・再作成は不要。書き込み競合時はtimeout秒まで待つ
+        return {
+            "poolclass": queue_pool,
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+            "connect_args": {"check_same_thread": False, "timeout": settings.db_pool_timeout},
+        }
+
+    return {
+        "poolclass": queue_pool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def create_db_engine() -> Engine:
+    """設定（database_url・プール設定）に従って同期エンジンを作成"""
+    db_engine = create_engine(
+        settings.database_url,
+        pool_logging_name=SYNC_POOL_NAME,
+        **get_engine_options(settings.database_url),
+    )
+    instrument_engine(db_engine, SYNC_POOL_NAME)
+    instrument_queries(db_engine)
+    return db_engine
+
 
 # SQLAlchemyエンジン作成
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},  # SQLite用
-    poolclass=StaticPool,  # 開発用の簡易プール
-)
+engine = create_db_engine()
 
 # セッション作成
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -20,6 +76,16 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # ベースクラス作成
 Base = declarative_base()
 
+# 同期ドライバーに対応する非同期ドライバー
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+# 非同期エンジンはドライバー（aiosqlite / asyncpg）が必要なため初回利用時に作成する
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
 
 def get_db():
     """データベースセッションを取得"""
@@ -27,4 +93,71 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+
+def get_async_database_url() -> str:
+    """非同期エンジン用のデータベースURLを取得"""
+    if settings.async_database_url:
+        return settings.async_database_url
+
+    url = make_url(settings.database_url)
+    backend_name = url.get_backend_name()
+    if backend_name not in ASYNC_DRIVERS:
+        raise ValueError(f"非同期ドライバーに対応していないデータベースです: {backend_name}")
+    return url.set(drivername=ASYNC_DRIVERS[backend_name]).render_as_string(hide_password=False)
+
+
+def get_async_engine() -> AsyncEngine:
+    """非同期エンジンを取得"""
+    global _async_engine
+    if _async_engine is None:
+        async_database_url = get_async_database_url()
+        _async_engine = create_async_engine(
+            async_database_url,
+            pool_logging_name=ASYNC_POOL_NAME,
+            **get_engine_options(async_database_url, is_async=True),
+        )
+        instrument_engine(_async_engine.sync_engine, ASYNC_POOL_NAME)
+        instrument_queries(_async_engine.sync_engine)
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    """非同期セッションファクトリーを取得"""
+    global _async_session_factory
+    if _async_session_factory is None:
+        # コミット後の属性アクセスで暗黙のI/Oが発生しないよう expire_on_commit=False とする
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_session_factory
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """非同期データベースセッションを取得"""
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+async def release_session(db: Union[Session, AsyncSession]) -> None:
+    """
+    リクエストのセッションを閉じてコネクションをプールへ返す
+
+    以降のデータベースアクセスを行わずに長く待つ処理（イベントの配信、書き込みキュー）の前に呼び出す。
+    読み込み済みのオブジェクトの属性はセッションを閉じた後も参照できる。
+    """
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        db.close()
+
+
+def get_pool_statistics() -> Dict[str, Any]:
+    """コネクションプールの状態と統計を取得"""
+    statistics = {"sync": describe_pool(engine, SYNC_POOL_NAME)}
+    if _async_engine is not None:
+        statistics["async"] = describe_pool(_async_engine.sync_engine, ASYNC_POOL_NAME)
+    return statistics
@@ -1,17 +1,127 @@
 """データベース初期化スクリプト"""
-from sqlalchemy.orm import Session
-from app.database.database import engine, SessionLocal
-from app.models.user import User, UserRole
+from sqlalchemy import inspect
+
 from app.core.security import get_password_hash
+from app.database.database import SessionLocal, engine
+from app.models.user import User, UserRole
+
+# 1ユーザー1日1件を保証する一意インデックス
+UNIQUE_RECORD_INDEX = "uq_attendance_records_user_id_date"
+
+
+def merge_records(records: list) -> None:
+    """
+    同じユーザー・同じ日の勤怠記録を最初の1件（IDが最小）にまとめる
+
+    出勤は最も早い時刻、退勤は最も遅い時刻とし、休憩記録は全て移して勤務時間とステータスを計算し直す。
+    残りの記録はセッションから削除する（コミットは呼び出し側で行う）。
+    """
+    from app.models.attendance import AttendanceStatus, BreakStatus
+    from app.services.attendance_service import AttendanceService
+
+    kept, *duplicates = sorted(records, key=lambda record: record.id)
+    clocked_out = [record for record in records if record.clock_out is not None]
+    clock_ins = [record.clock_in for record in records if record.clock_in is not None]
+    for duplicate in duplicates:
+        kept.break_records.extend(list(duplicate.break_records))
+
+    if clocked_out:
+        latest = max(clocked_out, key=lambda record: AttendanceService.to_utc(record.clock_out))
+        kept.clock_out = latest.clock_out
+        kept.break_minutes = latest.break_minutes
+    kept.clock_in = min(clock_ins, key=AttendanceService.to_utc) if clock_ins else None
+    notes = [record.notes for record in sorted(records, key=lambda record: record.id) if record.notes]
+    kept.notes = "\n".join(dict.fromkeys(notes)) or None
+
+    on_break = kept.clock_out is None and any(b.break_end is None for b in kept.break_records)
+    kept.break_status = BreakStatus.ON_BREAK if on_break else BreakStatus.WORKING
+    if kept.clock_in is not None:
+        late = AttendanceService.is_late(kept.clock_in)
+        kept.status = AttendanceStatus.LATE if late else AttendanceStatus.PRESENT
+        if kept.clock_out is not None:
+            kept.total_hours, kept.overtime_hours = AttendanceService.calculate_work_hours(
+                kept.clock_in, kept.clock_out, kept.break_minutes or 0
+            )
+            kept.status = AttendanceService.get_clock_out_status(kept.status, kept.clock_out)
+
+
+def merge_duplicate_records() -> int:
+    """
+    一意インデックスの作成前に、同じユーザー・同じ日の重複した勤怠記録をまとめる
+
+    一意インデックスがない状態では同時の出勤打刻で重複が作られることがあり、
+    そのままではインデックスの作成に失敗する。まとめた後に月次集計を作り直す。
+
+    Returns:
+        まとめた (ユーザー, 日付) の件数
+    """
+    from sqlalchemy import func, select, tuple_
+    from sqlalchemy.orm import selectinload
+
+    from app.models.attendance import AttendanceRecord
+    from app.services.rollup_service import RollupService
+
+    with SessionLocal() as db:
+        keys = db.execute(
+            select(AttendanceRecord.user_id, AttendanceRecord.date)
+            .group_by(AttendanceRecord.user_id, AttendanceRecord.date)
+            .having(func.count() > 1)
+        ).all()
+        if not keys:
+            return 0
+
+        groups: dict = {}
+        for offset in range(0, len(keys), 500):
+            chunk = [tuple(key) for key in keys[offset:offset + 500]]
+            records = db.scalars(
+                select(AttendanceRecord)
+                .options(selectinload(AttendanceRecord.break_records))
+                .where(tuple_(AttendanceRecord.user_id, AttendanceRecord.date).in_(chunk))
+            ).all()
+            for record in records:
+                groups.setdefault((record.user_id, record.date), []).append(record)
+
+        for (user_id, day), records in groups.items():
+            print(f"重複した勤怠記録をまとめます: user_id={user_id} date={day} ids={sorted(r.id for r in records)}")
+            merge_records(records)
+            for duplicate in sorted(records, key=lambda record: record.id)[1:]:
+                db.delete(duplicate)
+        db.commit()
+        RollupService.rebuild(db)
+        return len(groups)
+
+
+def ensure_indexes() -> None:
+    """既存テーブルに後から追加したインデックスを作成"""
+    from app.models.attendance import AttendanceRecord, BreakRecord
+    
+    # 重複した記録が残っていると一意インデックスを作成できないため、先にまとめる
+    existing = {index["name"] for index in inspect(engine).get_indexes(AttendanceRecord.__tablename__)}
+    if UNIQUE_RECORD_INDEX not in existing:
+        merged = merge_duplicate_records()
+        if merged:
+            print(f"重複した勤怠記録を{merged}件まとめました")
+
+    # create_allは既存テーブルのインデックスを追加しないため個別に作成する
+    for model in (AttendanceRecord, BreakRecord):
+        for index in model.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 
 def init_db() -> None:
     """データベースを初期化"""
     # テーブル作成
-    from app.models import user, attendance  # モデルをインポートしてテーブルを作成
     from app.database.database import Base
+    from app.models.attendance import MonthlyAttendanceRollup
+    from app.services.rollup_service import RollupService
     
+    # 月次集計テーブルを後から追加した既存データベースでは、作成後に勤怠記録から集計する
+    has_rollups = inspect(engine).has_table(MonthlyAttendanceRollup.__tablename__)
     Base.metadata.create_all(bind=engine)
+    ensure_indexes()
+    if not has_rollups:
+        with SessionLocal() as db:
+            RollupService.rebuild(db)
     
     # 初期データ作成
     db = SessionLocal()
@@ -0,0 +1,123 @@
+"""コネクションプールの利用統計"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """コネクションプールのチェックアウト・待ち時間の統計"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.connects = 0  # 新規接続数
+        self.checkouts = 0  # チェックアウト数
+        self.checkins = 0  # チェックイン数
+        self.invalidations = 0  # 無効化された接続数
+        self.timeouts = 0  # 接続待ちタイムアウト数
+        self.wait_count = 0  # 待ち時間を計測したチェックアウト数
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        """接続取得までの待ち時間を記録"""
+        with self._lock:
+            self.wait_count += 1
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def increment(self, counter: str) -> None:
+        """イベントカウンターを加算"""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """統計のスナップショットを取得"""
+        with self._lock:
+            average_wait = self.total_wait_seconds / self.wait_count if self.wait_count else 0.0
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "average_wait_ms": round(average_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+                "total_wait_ms": round(self.total_wait_seconds * 1000, 3),
+            }
+
+
+# プール名（pool_logging_name）ごとの統計
+POOL_STATS: Dict[str, PoolStats] = {}
+
+
+def get_pool_stats(name: Optional[str]) -> PoolStats:
+    """プール名に対応する統計を取得（存在しない場合は作成）"""
+    return POOL_STATS.setdefault(name or "default", PoolStats())
+
+
+class _WaitTimingMixin:
+    """接続取得（_do_get）にかかった時間を計測するプール用Mixin"""
+
+    logging_name: Optional[str]
+
+    def _do_get(self) -> Any:
+        stats = get_pool_stats(self.logging_name)
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()  # type: ignore[misc]
+        except PoolTimeoutError:
+            stats.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        stats.record_wait(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    """待ち時間を計測するQueuePool"""
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    """待ち時間を計測するAsyncAdaptedQueuePool"""
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """エンジンのプールイベントに統計の記録を登録"""
+    stats = get_pool_stats(name)
+
+    @event.listens_for(engine, "connect")
+    def on_connect(_dbapi_connection: Any, _connection_record: Any) -> None:
+        stats.increment("connects")
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(_dbapi_connection: Any, _connection_record: Any, _connection_proxy: Any) -> None:
+        stats.increment("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(_dbapi_connection: Any, _connection_record: Any) -> None:
+        stats.increment("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(_dbapi_connection: Any, _connection_record: Any, _exception: Any) -> None:
+        stats.increment("invalidations")
+
+
+def describe_pool(engine: Engine, name: str) -> Dict[str, Any]:
+    """プールの現在の状態と統計を取得"""
+    pool = engine.pool
+    description: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        description.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    description.update(get_pool_stats(name).snapshot())
+    return description
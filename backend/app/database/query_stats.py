@@ -0,0 +1,86 @@
+"""リクエストごとのSQL実行回数・実行時間の計測"""
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 指紋の作成時に置き換えるリテラル（数値・文字列）と連続するプレースホルダー（IN句など）
+_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST_PATTERN = re.compile(r"\(\s*(?:\?|%\(\w+\)s|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|\$\d+))+\s*\)")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def fingerprint_statement(statement: str) -> str:
+    """
+    SQL文の指紋を作成（空白の正規化、リテラルとIN句のプレースホルダー列の置き換え）
+
+    パラメーターだけが異なる同じ形のSQLは同じ指紋になる。
+    """
+    statement = _WHITESPACE_PATTERN.sub(" ", statement).strip()
+    statement = _LITERAL_PATTERN.sub("?", statement)
+    return _PLACEHOLDER_LIST_PATTERN.sub("(...)", statement)
+
+
+class QueryTracker:
+    """1リクエスト内で実行したSQLの回数・合計時間・指紋ごとの回数"""
+
+    __slots__ = ("count", "total_seconds", "statements")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: "Counter[str]" = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        """実行したSQLを記録"""
+        self.count += 1
+        self.total_seconds += seconds
+        self.statements[statement] += 1
+
+    def fingerprints(self) -> List[Tuple[str, int]]:
+        """(指紋, 回数) を回数の多い順に取得（同じ形のSQLをまとめる）"""
+        counts: "Counter[str]" = Counter()
+        for statement, count in self.statements.items():
+            counts[fingerprint_statement(statement)] += count
+        return counts.most_common()
+
+
+# 処理中のリクエストの記録先（スレッドプール・AsyncSessionのグリーンレットにも引き継がれる）
+_current_tracker: ContextVar[Optional[QueryTracker]] = ContextVar("query_tracker", default=None)
+
+
+def start_tracking() -> Tuple[QueryTracker, Any]:
+    """現在のコンテキストで計測を開始し、(記録先, 終了用のトークン) を返す"""
+    tracker = QueryTracker()
+    return tracker, _current_tracker.set(tracker)
+
+
+def stop_tracking(token: Any) -> None:
+    """計測を終了"""
+    _current_tracker.reset(token)
+
+
+def instrument_queries(engine: Engine) -> None:
+    """エンジンのSQL実行イベントに計測を登録（計測中のリクエストがない場合は何もしない）"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        _connection: Any, _cursor: Any, _statement: str, _parameters: Any, context: Any, _executemany: bool
+    ) -> None:
+        if context is not None and _current_tracker.get() is not None:
+            # 実行コンテキストはSQL1回ごとに作られるため、失敗して after が呼ばれなくても残らない
+            context._query_started_at = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(
+        _connection: Any, _cursor: Any, statement: str, _parameters: Any, context: Any, _executemany: bool
+    ) -> None:
+        tracker = _current_tracker.get()
+        started = getattr(context, "_query_started_at", None)
+        if tracker is None or started is None:
+            return
+        tracker.record(statement, time.perf_counter() - started)
@@ -1,19 +1,44 @@
 """認証の依存関係"""
-from fastapi import Depends, HTTPException, status, Request
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.database.database import get_db
-from app.models.user import User, UserRole
+from typing import Any, Dict
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.security import verify_token
-from app.schemas.auth import TokenData
+from app.dependencies.database import DBSession, get_auth_service, get_session
+from app.models.user import User, UserRole
 
 # HTTP Bearer認証スキーム
 security = HTTPBearer()
 
+# 認証済みユーザーのキャッシュ（ユーザーID → usersテーブルの列の値）
+# ユーザーの有効化・無効化・プロフィール更新・許可リスト変更時に無効化する
+principal_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    max_size=settings.principal_cache_max_size,
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+)
+
+
+def snapshot_user(user: User) -> Dict[str, Any]:
+    """キャッシュ用にユーザーの列の値を取り出す"""
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns}
 
-def get_current_user(
+
+def restore_user(values: Dict[str, Any], db: DBSession) -> User:
+    """キャッシュした列の値からユーザーを復元し、SELECTを発行せずにセッションへ関連付ける"""
+    user = User(**values)
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    auth_service: Any = Depends(get_auth_service)
 ) -> User:
     """現在のユーザーを取得"""
     token_data = verify_token(credentials.credentials)
@@ -24,7 +49,11 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.email == token_data.email).first()
+    cached = principal_cache.get(token_data.user_id) if token_data.user_id is not None else None
+    if cached is not None and cached["email"] == token_data.email:
+        return restore_user(cached, db)
+    
+    user = await auth_service.get_user_by_email(token_data.email, db)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -32,11 +61,17 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    principal_cache.set(user.id, snapshot_user(user))
     return user
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
-    """現在のアクティブユーザーを取得"""
+async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+    """
+    現在のアクティブユーザーを取得
+
+    I/Oを行わないためイベントループ上で実行する（同期関数の依存関係はスレッドプールで実行され、
+    コネクションを保持したリクエストがスレッドの空きを待つことになる）。
+    """
     if not current_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -45,7 +80,7 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
     return current_user
 
 
-def get_current_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
+async def get_current_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
     """現在の管理者ユーザーを取得"""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -0,0 +1,103 @@
+"""データベースセッションとサービスの依存関係"""
+from typing import Any, AsyncIterator, List, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.group_commit import BatchResult, GroupCommitQueue
+from app.database.database import SessionLocal, get_async_session_factory
+from app.services.async_attendance_service import AsyncAttendanceService
+from app.services.async_auth_service import AsyncAuthService
+from app.services.async_export_service import AsyncExportService
+from app.services.async_presence_service import AsyncPresenceService
+from app.services.async_punch_batch_service import AsyncPunchBatchService
+from app.services.async_user_service import AsyncUserService
+from app.services.attendance_service import AttendanceService
+from app.services.auth_service import AuthService
+from app.services.export_service import ExportService
+from app.services.presence_service import PresenceService
+from app.services.punch_batch_service import PunchBatchService, PunchOperation
+from app.services.queued_attendance_service import QueuedAttendanceService
+from app.services.threaded import ThreadedService
+from app.services.user_service import UserService
+
+# 設定に応じて同期Session／AsyncSessionのどちらかになる
+DBSession = Union[Session, AsyncSession]
+
+# 同期経路ではスレッドプールで実行してイベントループを塞がない
+_threaded_attendance_service = ThreadedService(AttendanceService)
+_threaded_auth_service = ThreadedService(AuthService)
+_threaded_user_service = ThreadedService(UserService)
+_threaded_presence_service = ThreadedService(PresenceService)
+
+
+async def execute_punch_batch(operations: List[PunchOperation]) -> List[BatchResult]:
+    """設定に応じて打刻のバッチを実行（同期経路ではスレッドプールで実行）"""
+    if settings.use_async_db:
+        return await AsyncPunchBatchService.execute(operations)
+    return await run_in_threadpool(PunchBatchService.execute, operations)
+
+
+# 打刻の書き込みキュー（punch_group_commit が有効な場合のみ使用）
+punch_queue: "GroupCommitQueue[PunchOperation]" = GroupCommitQueue(
+    execute_punch_batch,
+    max_batch_size=settings.punch_batch_max_size,
+    max_wait_seconds=settings.punch_batch_max_wait_ms / 1000,
+    max_queue_size=settings.punch_queue_max_size,
+)
+_queued_attendance_service = QueuedAttendanceService(_threaded_attendance_service, AttendanceService, punch_queue)
+_async_queued_attendance_service = QueuedAttendanceService(AsyncAttendanceService, AsyncAttendanceService, punch_queue)
+
+
+async def get_session() -> AsyncIterator[DBSession]:
+    """設定（use_async_db）に応じたデータベースセッションを取得"""
+    if settings.use_async_db:
+        async with get_async_session_factory()() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+
+async def get_attendance_service() -> Any:
+    """設定に応じた勤怠管理サービスを取得（punch_group_commit が有効な場合は打刻をキュー経由で実行）"""
+    if settings.use_async_db:
+        if settings.punch_group_commit:
+            return _async_queued_attendance_service
+        return AsyncAttendanceService
+    if settings.punch_group_commit:
+        return _queued_attendance_service
+    return _threaded_attendance_service
+
+
+async def get_export_service() -> Any:
+    """設定に応じたエクスポートサービスを取得（同期版のストリームはStreamingResponseがスレッドプールで読み出す）"""
+    if settings.use_async_db:
+        return AsyncExportService
+    return ExportService
+
+
+async def get_presence_service() -> Any:
+    """設定に応じた在席状況サービスを取得"""
+    if settings.use_async_db:
+        return AsyncPresenceService
+    return _threaded_presence_service
+
+
+async def get_auth_service() -> Any:
+    """設定に応じた認証サービスを取得"""
+    if settings.use_async_db:
+        return AsyncAuthService
+    return _threaded_auth_service
+
+
+async def get_user_service() -> Any:
+    """設定に応じたユーザー管理サービスを取得"""
+    if settings.use_async_db:
+        return AsyncUserService
+    return _threaded_user_service
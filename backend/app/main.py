@@ -1,15 +1,73 @@
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
 from app.core.config import settings
+from app.core.events import attendance_events
+from app.core.idempotency import idempotency_store
+from app.core.metrics import (
+    MetricsMiddleware,
+    QueryTimingMiddleware,
+    render_metrics,
+    request_metrics,
+)
+from app.core.presence import presence_index
+from app.core.rate_limit import login_rate_limiter
+from app.core.security import password_executor, token_blacklist, token_cache
+from app.database.database import (
+    SessionLocal,
+    get_async_session_factory,
+    get_pool_statistics,
+)
+from app.dependencies.auth import principal_cache
+from app.dependencies.database import punch_queue
+from app.routers.attendance import dashboard_cache
+from app.routers.attendance import router as attendance_router
 from app.routers.auth import router as auth_router
 from app.routers.user import router as users_router
-from app.routers.attendance import router as attendance_router
+from app.services.async_presence_service import AsyncPresenceService
+from app.services.presence_service import PresenceService
+
+logger = logging.getLogger(__name__)
+
+
+def rebuild_presence() -> int:
+    """今日の勤怠記録から在席状況を作り直す（同期Session版）"""
+    db = SessionLocal()
+    try:
+        return PresenceService.rebuild(db)
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """起動時に在席状況のインデックスを作り直し、終了時に打刻の書き込みキューを空にする"""
+    try:
+        if settings.use_async_db:
+            async with get_async_session_factory()() as db:
+                count = await AsyncPresenceService.rebuild(db)
+        else:
+            count = await run_in_threadpool(rebuild_presence)
+        logger.info(f"Presence index rebuilt: {count} members")
+    except Exception as e:
+        # テーブル未作成などで失敗しても起動は続け、以降の打刻で反映する
+        logger.error(f"Failed to rebuild presence index: {str(e)}")
+    yield
+    # キューに残った打刻をコミットしてから終了する
+    await punch_queue.stop()
+
 
 app = FastAPI(
     title=settings.app_name,
     description="タイムカードクローンアプリのバックエンドAPI",
     version=settings.app_version,
+    lifespan=lifespan,
 )
 
 # CORS設定
@@ -19,8 +77,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link", "ETag", "Idempotent-Replayed", "Retry-After", "Server-Timing"],  # ページネーションの次ページ・条件付きGET・再送の応答・レート制限・SQL計測
 )
 
+# リクエストごとのSQL実行回数・時間の計測（Server-Timing ヘッダー）
+if settings.sql_timing_enabled:
+    app.add_middleware(
+        QueryTimingMiddleware,
+        statement_budget=settings.sql_statement_budget,
+        time_budget_ms=settings.sql_time_budget_ms,
+        route_budgets=settings.sql_route_budgets,
+        repeated_threshold=settings.sql_repeated_statement_threshold,
+    )
+
+# ルートごとの処理時間・件数の計測（CORSより外側で包み、プリフライトも含めて計測する）
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, metrics=request_metrics)
+
 # ルーターを追加
 app.include_router(auth_router)
 app.include_router(users_router)
@@ -39,6 +112,74 @@ async def health_check() -> dict[str, str]:
     return {"status": "healthy"}
 
 
+@app.get("/health/database")
+async def database_health_check() -> dict:
+    """コネクションプールの状態と統計（チェックアウト数・待ち時間）を取得"""
+    return get_pool_statistics()
+
+
+@app.get("/health/cache")
+async def cache_health_check() -> dict:
+    """プロセス内キャッシュのヒット率などの統計を取得"""
+    return {
+        "principal": principal_cache.stats(),
+        "token": token_cache.stats(),
+        "token_blacklist": token_blacklist.stats(),
+        "dashboard": dashboard_cache.stats(),
+        "idempotency": idempotency_store.stats(),
+    }
+
+
+@app.get("/health/executors")
+async def executor_health_check() -> dict:
+    """イベントループ外で実行する処理の同時実行数・キューの深さを取得"""
+    return {"password_hash": password_executor.stats(), "punch_queue": punch_queue.stats()}
+
+
+@app.get("/health/events")
+async def events_health_check() -> dict:
+    """勤怠状態の変更イベントの購読者数と配信件数を取得"""
+    return attendance_events.stats()
+
+
+@app.get("/health/rate-limit")
+async def rate_limit_health_check() -> dict:
+    """ログインのレート制限で許可・拒否した試行の件数を取得"""
+    return login_rate_limiter.stats()
+
+
+@app.get("/health/presence")
+async def presence_health_check() -> dict:
+    """在席状況インデックスの件数と最後に作り直してからの経過秒数を取得"""
+    return presence_index.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """ルートごとのレイテンシ・ステータスコード・コネクションプール・キャッシュのメトリクス（Prometheus形式）"""
+    queue_stats = punch_queue.stats()
+    content = render_metrics(
+        request_metrics,
+        pools=get_pool_statistics(),
+        caches={
+            "principal": principal_cache.stats(),
+            "token": token_cache.stats(),
+            "dashboard": dashboard_cache.stats(),
+            "idempotency": idempotency_store.stats(),
+        },
+        extra={
+            "punch_queue_depth": ("gauge", "打刻の書き込みキューに溜まっている打刻数", queue_stats["queued"]),
+            "punch_batches_total": ("counter", "打刻のグループコミットの回数", queue_stats["batches"]),
+            "event_subscribers": ("gauge", "勤怠状態の変更イベントの購読者数", attendance_events.stats()["subscribers"]),
+            "login_rate_limited_total": (
+                "counter", "レート制限で拒否したログイン試行数",
+                login_rate_limiter.rejected_email + login_rate_limiter.rejected_ip,
+            ),
+        },
+    )
+    return PlainTextResponse(content, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -1,5 +1,5 @@
 """データモデルパッケージ"""
+from .attendance import AttendanceRecord, AttendanceStatus, MonthlyAttendanceRollup
 from .user import User
-from .attendance import AttendanceRecord, AttendanceStatus
 
-__all__ = ["User", "AttendanceRecord", "AttendanceStatus"] 
\ No newline at end of file
+__all__ = ["User", "AttendanceRecord", "AttendanceStatus", "MonthlyAttendanceRollup"] 
\ No newline at end of file
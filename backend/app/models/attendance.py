@@ -1,9 +1,21 @@
 """勤怠管理モデル"""
-from sqlalchemy import Column, Integer, String, DateTime, Date, Float, ForeignKey, Text, Enum
-from sqlalchemy.sql import func
+import enum
+
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Text,
+)
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
 from app.database.database import Base
-import enum
 
 
 class AttendanceStatus(str, enum.Enum):
@@ -24,6 +36,10 @@ class BreakStatus(str, enum.Enum):
 class AttendanceRecord(Base):
     """勤怠記録テーブル"""
     __tablename__ = "attendance_records"
+    __table_args__ = (
+        # 1ユーザー1日1件を保証し、打刻時の (user_id, date) 検索に使用する
+        Index("uq_attendance_records_user_id_date", "user_id", "date", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -74,7 +90,7 @@ class BreakRecord(Base):
     __tablename__ = "break_records"
 
     id = Column(Integer, primary_key=True, index=True)
-    attendance_record_id = Column(Integer, ForeignKey("attendance_records.id"), nullable=False)
+    attendance_record_id = Column(Integer, ForeignKey("attendance_records.id"), nullable=False, index=True)
     break_start = Column(DateTime(timezone=True), nullable=False)
     break_end = Column(DateTime(timezone=True), nullable=True)
     duration_minutes = Column(Integer, default=0)  # 休憩時間（分）
@@ -88,4 +104,19 @@ class BreakRecord(Base):
     @property
     def is_active(self) -> bool:
         """休憩中かどうか"""
-        return self.break_end is None 
\ No newline at end of file
+        return self.break_end is None 
+
+
+class MonthlyAttendanceRollup(Base):
+    """月次勤怠集計テーブル（打刻・修正時に差分で更新）"""
+    __tablename__ = "monthly_attendance_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    work_days = Column(Integer, default=0, nullable=False)  # 出勤日数
+    total_hours = Column(Float, default=0.0, nullable=False)  # 総勤務時間（時間）
+    overtime_hours = Column(Float, default=0.0, nullable=False)  # 残業時間（時間）
+    late_count = Column(Integer, default=0, nullable=False)  # 遅刻回数（半休を含む）
+    early_leave_count = Column(Integer, default=0, nullable=False)  # 早退回数（半休を含む）
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -1,151 +1,241 @@
 """勤怠管理APIルーター"""
 from datetime import date
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
-from sqlalchemy.orm import Session
-from app.database.database import get_db
-from app.models.user import User
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, Union
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.etag import conditional_response
+from app.core.events import attendance_events, stream_events
+from app.core.idempotency import idempotency_store
+from app.core.pagination import decode_cursor, encode_cursor, set_next_cursor
+from app.core.presence import presence_index
+from app.core.serialization import FastSerializer
+from app.database.database import release_session
+from app.dependencies.auth import get_current_active_user, get_current_admin_user
+from app.dependencies.database import (
+    DBSession,
+    get_attendance_service,
+    get_export_service,
+    get_presence_service,
+    get_session,
+)
+from app.models.user import User, UserRole
 from app.schemas.attendance import (
+    AttendanceRecordBriefResponse,
     AttendanceRecordResponse,
+    AttendanceSummary,
+    BreakEndRequest,
+    BreakStartRequest,
     ClockInRequest,
     ClockOutRequest,
-    BreakStartRequest,
-    BreakEndRequest,
-    AttendanceSummary,
-    MonthlyAttendanceSummary
+    DepartmentDashboard,
+    MonthlyAttendanceSummary,
+    PresenceBoard,
 )
 from app.services.attendance_service import AttendanceService
-from app.dependencies.auth import get_current_active_user
 
 router = APIRouter(prefix="/attendance", tags=["勤怠管理"])
 
+# 部署別ダッシュボードの集計結果（期間・部署ごと）。打刻はTTL経過後に反映される
+dashboard_cache: TTLCache[dict] = TTLCache(
+    max_size=settings.dashboard_cache_max_size,
+    ttl_seconds=settings.dashboard_cache_ttl_seconds,
+)
+
+# 勤怠履歴は件数が多いため response_model の再検証を通さずにシリアライズする
+record_serializer = FastSerializer(AttendanceRecordResponse)
+brief_record_serializer = FastSerializer(AttendanceRecordBriefResponse)
+
+# 打刻の再送（タイムアウト後のリトライなど）を重複実行しないためのキー
+IdempotencyKey = Header(
+    None,
+    alias="Idempotency-Key",
+    min_length=1,
+    max_length=settings.idempotency_key_max_length,
+    description="同じキーの再送には最初のレスポンスを返す（ユーザー・エンドポイントごと）"
+)
+
+
+async def run_punch(
+    endpoint: str,
+    current_user: User,
+    idempotency_key: Optional[str],
+    payload: Optional[BaseModel],
+    punch: Callable[[], Awaitable[Any]]
+) -> Any:
+    """
+    打刻を実行（Idempotency-Key が指定された場合は最初のレスポンスを保存し、再送には保存したレスポンスを返す）
+
+    再送時は勤怠テーブルに触れずに応答する。同じキーで内容の異なるリクエストは422を返す。
+    """
+    if idempotency_key is None:
+        try:
+            return await punch()
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            ) from e
+
+    async def handler() -> Tuple[int, bytes]:
+        try:
+            record = await punch()
+        except ValueError as e:
+            return status.HTTP_400_BAD_REQUEST, to_json({"detail": str(e)})
+        return status.HTTP_200_OK, to_json(record_serializer.to_dict(record))
+
+    fingerprint = payload.model_dump_json() if payload is not None else ""
+    return await idempotency_store.run(
+        (current_user.id, endpoint, idempotency_key), fingerprint, handler
+    )
+
 
 @router.post("/clock-in", response_model=AttendanceRecordResponse)
 async def clock_in(
-    raw_request: Request,
     request: ClockInRequest,
+    idempotency_key: Optional[str] = IdempotencyKey,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    attendance_service: Any = Depends(get_attendance_service)
 ):
     """出勤記録"""
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    # 生のリクエストボディを取得
-    body = await raw_request.body()
-    logger.info(f"Raw request body: {body}")
-    logger.info(f"Raw request body type: {type(body)}")
-    
-    logger.info(f"Parsed request: {request}")
-    logger.info(f"Request type: {type(request)}")
-    logger.info(f"Request dict: {request.dict()}")
-    
-    try:
-        record = AttendanceService.clock_in(db, current_user, request)
-        return record
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
+    return await run_punch(
+        "clock-in", current_user, idempotency_key, request,
+        lambda: attendance_service.clock_in(db, current_user, request)
+    )
 
 
 @router.post("/clock-out", response_model=AttendanceRecordResponse)
 async def clock_out(
     request: ClockOutRequest,
+    idempotency_key: Optional[str] = IdempotencyKey,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    attendance_service: Any = Depends(get_attendance_service)
 ):
     """退勤記録"""
-    try:
-        record = AttendanceService.clock_out(db, current_user, request)
-        return record
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
+    return await run_punch(
+        "clock-out", current_user, idempotency_key, request,
+        lambda: attendance_service.clock_out(db, current_user, request)
+    )
 
 
 @router.post("/cancel-clock-out", response_model=AttendanceRecordResponse)
 async def cancel_clock_out(
+    idempotency_key: Optional[str] = IdempotencyKey,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    attendance_service: Any = Depends(get_attendance_service)
 ):
     """退勤キャンセル"""
-    try:
-        record = AttendanceService.cancel_clock_out(db, current_user)
-        return record
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
+    return await run_punch(
+        "cancel-clock-out", current_user, idempotency_key, None,
+        lambda: attendance_service.cancel_clock_out(db, current_user)
+    )
 
 
 @router.post("/break/start", response_model=AttendanceRecordResponse)
 async def start_break(
     request: BreakStartRequest,
+    idempotency_key: Optional[str] = IdempotencyKey,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    attendance_service: Any = Depends(get_attendance_service)
 ):
     """休憩開始"""
-    try:
-        record = AttendanceService.start_break(db, current_user, request)
-        return record
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
+    return await run_punch(
+        "break-start", current_user, idempotency_key, request,
+        lambda: attendance_service.start_break(db, current_user, request)
+    )
 
 
 @router.post("/break/end", response_model=AttendanceRecordResponse)
 async def end_break(
     request: BreakEndRequest,
+    idempotency_key: Optional[str] = IdempotencyKey,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    attendance_service: Any = Depends(get_attendance_service)
 ):
     """休憩終了"""
-    try:
-        record = AttendanceService.end_break(db, current_user, request)
-        return record
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
+    return await run_punch(
+        "break-end", current_user, idempotency_key, request,
+        lambda: attendance_service.end_break(db, current_user, request)
+    )
 
 
 @router.get("/today", response_model=AttendanceRecordResponse)
 async def get_today_record(
+    request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    attendance_service: Any = Depends(get_attendance_service)
 ):
-    """今日の勤怠記録を取得"""
-    record = AttendanceService.get_today_record(db, current_user)
+    """今日の勤怠記録を取得（If-None-Match が一致すれば本文なしの304を返す）"""
+    record = await attendance_service.get_today_record(db, current_user.id)
     if not record:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="今日の勤怠記録が見つかりません"
         )
-    return record
+    return conditional_response(request, record_serializer.to_dict(record))
 
 
-@router.get("/history", response_model=List[AttendanceRecordResponse])
+@router.get(
+    "/history",
+    response_model=Union[List[AttendanceRecordResponse], List[AttendanceRecordBriefResponse]]
+)
 async def get_attendance_history(
+    request: Request,
     year: Optional[int] = Query(None, description="年"),
     month: Optional[int] = Query(None, description="月"),
+    include_breaks: bool = Query(True, description="休憩記録（break_records / total_break_minutes）を含めるか"),
+    cursor: Optional[str] = Query(None, description="前ページの X-Next-Cursor"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=settings.history_page_max_size,
+        description="1ページの件数（未指定時は年月指定で上限件数、それ以外は直近30件）"
+    ),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    attendance_service: Any = Depends(get_attendance_service)
 ):
-    """勤怠履歴を取得"""
-    if year and month:
-        records = AttendanceService.get_monthly_records(db, current_user, year, month)
-    else:
-        records = AttendanceService.get_recent_records(db, current_user)
+    """勤怠履歴を (date, id) の降順で取得（次ページがある場合は X-Next-Cursor / Link ヘッダーを返す）"""
+    after = None
+    if cursor:
+        try:
+            cursor_date, cursor_id = decode_cursor(cursor, 2)
+            after = (date.fromisoformat(cursor_date), int(cursor_id))
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="カーソルが不正です"
+            ) from None
+
+    if limit is None:
+        limit = settings.history_page_max_size if year and month else AttendanceService.RECENT_RECORDS_LIMIT
+    records, has_more = await attendance_service.get_history_page(
+        db, current_user.id, limit, after, year, month, include_breaks
+    )
     
-    return records
+    serializer = record_serializer if include_breaks else brief_record_serializer
+    response = serializer.response(records)
+    if has_more:
+        set_next_cursor(request, response, encode_cursor(records[-1].date.isoformat(), records[-1].id))
+    return response
 
 
 @router.get("/summary", response_model=List[AttendanceSummary])
@@ -153,34 +243,150 @@ async def get_attendance_summary(
     year: Optional[int] = Query(None, description="年"),
     month: Optional[int] = Query(None, description="月"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    attendance_service: Any = Depends(get_attendance_service)
 ):
     """勤怠サマリーを取得"""
+    # サマリーは休憩記録を返さないため読み込まない
     if year and month:
-        summary = AttendanceService.get_monthly_summary(db, current_user, year, month)
+        records = await attendance_service.get_monthly_records(db, current_user.id, year, month, False)
     else:
-        summary = AttendanceService.get_recent_summary(db, current_user)
+        records = await attendance_service.get_recent_records(db, current_user.id, False)
     
-    return summary
+    return records
 
 
 @router.get("/summary/monthly", response_model=MonthlyAttendanceSummary)
 async def get_monthly_summary(
     year: int = Query(..., description="年"),
     month: int = Query(..., description="月"),
+    include_records: bool = Query(False, description="日別の勤怠記録を含めるか"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    attendance_service: Any = Depends(get_attendance_service)
 ):
     """月次勤怠サマリーを取得"""
-    summary = AttendanceService.get_monthly_summary(db, current_user, year, month)
+    summary = await attendance_service.get_monthly_summary(
+        db, current_user.id, year, month, include_records
+    )
     return summary
 
 
 @router.get("/status", response_model=dict)
 async def get_attendance_status(
+    request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    attendance_service: Any = Depends(get_attendance_service)
 ):
-    """勤怠状態を取得"""
-    status = AttendanceService.get_attendance_status(db, current_user)
-    return status 
\ No newline at end of file
+    """勤怠状態を取得（If-None-Match が一致すれば本文なしの304を返す）"""
+    record = await attendance_service.get_today_record(db, current_user.id)
+    return conditional_response(request, AttendanceService.build_status(record))
+
+
+@router.get("/events")
+async def subscribe_attendance_events(
+    user_id: Optional[int] = Query(None, description="対象ユーザーID（管理者のみ他ユーザーを指定可能）"),
+    department: Optional[str] = Query(None, description="対象部署（管理者のみ）"),
+    current_user: User = Depends(get_current_active_user),
+    db: DBSession = Depends(get_session)
+):
+    """
+    打刻・休憩による勤怠状態の変更を Server-Sent Events で受け取る
+
+    一般ユーザーは自分の変更のみ、管理者はユーザー・部署で絞り込むか全件を購読できる。
+    各イベントの data は /attendance/status の内容に種類・ユーザー・部署・時刻を加えたJSON。
+    """
+    if current_user.role != UserRole.ADMIN:
+        if department is not None or user_id not in (None, current_user.id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="他のユーザー・部署の勤怠状態を購読するには管理者権限が必要です"
+            )
+        user_id = current_user.id
+
+    # 接続中にデータベース接続を保持し続けないよう、認証後にセッションを閉じる
+    await release_session(db)
+
+    return StreamingResponse(
+        stream_events(attendance_events, settings.events_heartbeat_seconds, user_id, department),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/admin/presence",
+    response_model=PresenceBoard,
+    dependencies=[Depends(get_current_admin_user)]
+)
+async def get_presence_board(
+    department: Optional[str] = Query(None, description="対象部署（未指定時は全部署）"),
+    db: DBSession = Depends(get_session),
+    presence_service: Any = Depends(get_presence_service)
+):
+    """今日の部署別の在席状況（勤務中・休憩中・退勤済みの人数とメンバー）を取得（管理者のみ）"""
+    # 複数ワーカー構成では他ワーカーの打刻を取り込むため一定間隔で作り直す
+    interval = settings.presence_rebuild_interval_seconds
+    stats = presence_index.stats()
+    if interval > 0 and (stats["seconds_since_rebuild"] is None or stats["seconds_since_rebuild"] >= interval):
+        await presence_service.rebuild(db)
+
+    # プロセス内のインデックスから作成した値のため response_model の再検証は行わない
+    board = presence_index.snapshot(department, all_departments=department is None)
+    return Response(content=to_json(board), media_type="application/json")
+
+
+@router.get(
+    "/admin/departments",
+    response_model=DepartmentDashboard,
+    dependencies=[Depends(get_current_admin_user)]
+)
+async def get_department_dashboard(
+    start_date: date = Query(..., description="開始日"),
+    end_date: date = Query(..., description="終了日"),
+    department: Optional[str] = Query(None, description="部署（未指定時は全部署）"),
+    db: DBSession = Depends(get_session),
+    attendance_service: Any = Depends(get_attendance_service)
+):
+    """部署別・従業員別の勤怠集計を取得（管理者のみ）"""
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="開始日は終了日以前の日付を指定してください"
+        )
+    if (end_date - start_date).days + 1 > settings.dashboard_max_days:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"集計期間は{settings.dashboard_max_days}日以内で指定してください"
+        )
+
+    cache_key = (start_date, end_date, department)
+    dashboard = dashboard_cache.get(cache_key)
+    if dashboard is None:
+        dashboard = await attendance_service.get_department_dashboard(db, start_date, end_date, department)
+        dashboard_cache.set(cache_key, dashboard)
+    return dashboard
+
+
+@router.get("/admin/export", dependencies=[Depends(get_current_admin_user)])
+async def export_attendance_records(
+    start_date: date = Query(..., description="開始日"),
+    end_date: date = Query(..., description="終了日"),
+    user_ids: Optional[List[int]] = Query(None, description="対象ユーザーID（未指定時は全ユーザー）"),
+    export_format: str = Query("csv", alias="format", pattern="^(csv|jsonl)$", description="csv または jsonl"),
+    export_service: Any = Depends(get_export_service)
+):
+    """勤怠記録（休憩時間の合計を含む）をCSV/JSON Linesでストリーミング出力（管理者のみ）"""
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="開始日は終了日以前の日付を指定してください"
+        )
+
+    filename = f"attendance_{start_date.isoformat()}_{end_date.isoformat()}.{export_format}"
+    return StreamingResponse(
+        export_service.iter_export(start_date, end_date, user_ids, export_format, settings.export_chunk_size),
+        media_type=export_service.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,16 +1,29 @@
 """認証関連のAPIルーター"""
+import math
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from typing import List
-from app.database.database import get_db
-from app.models.user import User
-from app.schemas.auth import UserCreate, UserLogin, UserResponse, Token
-from app.core.security import verify_password, get_password_hash, create_access_token, add_to_blacklist
+from starlette.concurrency import run_in_threadpool
+
 from app.core.config import settings
-from app.dependencies.auth import get_current_admin_user, get_current_active_user, get_token_from_request
-from app.services.auth_service import AuthService
+from app.core.rate_limit import login_rate_limiter
+from app.core.security import (
+    add_to_blacklist,
+    create_access_token,
+    verify_password_async,
+)
+from app.database.database import release_session
+from app.dependencies.auth import (
+    get_current_active_user,
+    get_current_admin_user,
+    get_token_from_request,
+    principal_cache,
+)
+from app.dependencies.database import DBSession, get_auth_service, get_session
+from app.models.user import User
+from app.schemas.auth import Token, UserCreate, UserLogin, UserResponse
 
 router = APIRouter(prefix="/auth", tags=["認証"])
 
@@ -23,14 +36,49 @@ def check_login_restriction(email: str) -> bool:
     return email in settings.allowed_users
 
 
+def get_client_ip(request: Request) -> Optional[str]:
+    """クライアントIPを取得（login_rate_limit_trust_forwarded_for が有効な場合は X-Forwarded-For の先頭）"""
+    if settings.login_rate_limit_trust_forwarded_for:
+        forwarded_for = request.headers.get("X-Forwarded-For")
+        if forwarded_for:
+            return forwarded_for.split(",")[0].strip()
+    return request.client.host if request.client else None
+
+
+async def check_login_rate_limit(request: Request, email: str) -> None:
+    """ログイン試行のレート制限をチェック（ユーザー検索・パスワード検証の前に呼び出す）"""
+    if not settings.login_rate_limit_enabled:
+        return
+    
+    # sqliteバックエンドは他ワーカーのロックを待つことがあるため、イベントループの外で実行する
+    retry_after = await run_in_threadpool(login_rate_limiter.check, email, get_client_ip(request))
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="ログインの試行回数が多すぎます。しばらくしてから再度お試しください",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+async def record_login_failure(request: Request) -> None:
+    """認証に失敗したログイン試行をクライアントIPのレート制限に記録"""
+    if settings.login_rate_limit_enabled:
+        await run_in_threadpool(login_rate_limiter.record_failure, get_client_ip(request))
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)) -> UserResponse:
+async def register(
+    user_data: UserCreate,
+    db: DBSession = Depends(get_session),
+    auth_service: Any = Depends(get_auth_service)
+) -> UserResponse:
     """
     ユーザー登録
     
     Args:
         user_data: ユーザー作成データ
         db: データベースセッション
+        auth_service: 認証サービス
         
     Returns:
         作成されたユーザー情報
@@ -39,14 +87,22 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)) -> User
         HTTPException: バリデーションエラーまたは重複エラー
     """
     # サービス層でユーザー作成処理を実行
-    created_user = await AuthService.create_user(user_data, db)
+    created_user = await auth_service.create_user(user_data, db)
     
     return created_user
 
 
 @router.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(
+    request: Request,
+    user_credentials: UserLogin,
+    db: DBSession = Depends(get_session),
+    auth_service: Any = Depends(get_auth_service)
+):
     """ユーザーログイン"""
+    # レート制限チェック
+    await check_login_rate_limit(request, user_credentials.email)
+    
     # ログイン制限チェック
     if not check_login_restriction(user_credentials.email):
         raise HTTPException(
@@ -56,16 +112,19 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
         )
     
     # ユーザー検索
-    user = db.query(User).filter(User.email == user_credentials.email).first()
+    user = await auth_service.get_user_by_email(user_credentials.email, db)
     if not user:
+        await record_login_failure(request)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="メールアドレスまたはパスワードが正しくありません",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # パスワード検証
-    if not verify_password(user_credentials.password, user.hashed_password):
+    # パスワード検証（bcryptの間コネクションを保持しないよう、先にセッションを閉じる）
+    await release_session(db)
+    if not await verify_password_async(user_credentials.password, user.hashed_password):
+        await record_login_failure(request)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="メールアドレスまたはパスワードが正しくありません",
@@ -94,8 +153,16 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/login/form", response_model=Token)
-async def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_form(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: DBSession = Depends(get_session),
+    auth_service: Any = Depends(get_auth_service)
+):
     """フォームベースのログイン（OAuth2互換）"""
+    # レート制限チェック
+    await check_login_rate_limit(request, form_data.username)
+    
     # ログイン制限チェック
     if not check_login_restriction(form_data.username):
         raise HTTPException(
@@ -105,16 +172,19 @@ async def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: Sessi
         )
     
     # ユーザー検索
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await auth_service.get_user_by_email(form_data.username, db)
     if not user:
+        await record_login_failure(request)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="メールアドレスまたはパスワードが正しくありません",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # パスワード検証
-    if not verify_password(form_data.password, user.hashed_password):
+    # パスワード検証（bcryptの間コネクションを保持しないよう、先にセッションを閉じる）
+    await release_session(db)
+    if not await verify_password_async(form_data.password, user.hashed_password):
+        await record_login_failure(request)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="メールアドレスまたはパスワードが正しくありません",
@@ -196,6 +266,7 @@ async def add_allowed_user(
     if email not in settings.allowed_users:
         settings.allowed_users.append(email)
         settings.save_allowed_users()
+        principal_cache.clear()
     return {"message": f"ユーザー {email} が許可リストに追加されました"}
 
 
@@ -208,6 +279,7 @@ async def remove_allowed_user(
     if email in settings.allowed_users:
         settings.allowed_users.remove(email)
         settings.save_allowed_users()
+        principal_cache.clear()
         return {"message": f"ユーザー {email} が許可リストから削除されました"}
     else:
         raise HTTPException(
@@ -224,5 +296,6 @@ async def toggle_login_restriction(
     """ログイン制限の有効/無効を切り替え（管理者のみ）"""
     settings.enable_login_restriction = enable
     settings.save_allowed_users()
+    principal_cache.clear()
     status_text = "有効" if enable else "無効"
     return {"message": f"ログイン制限が{status_text}になりました"} 
\ No newline at end of file
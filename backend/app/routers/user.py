@@ -1,20 +1,35 @@
 """ユーザー管理関連のAPIルーター"""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database.database import get_db
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+
+from app.core.config import settings
+from app.core.etag import conditional_response
+from app.core.pagination import decode_cursor, encode_cursor, set_next_cursor
+from app.core.serialization import FastSerializer
+from app.dependencies.auth import (
+    get_current_active_user,
+    get_current_admin_user,
+    principal_cache,
+)
+from app.dependencies.database import DBSession, get_session, get_user_service
 from app.models.user import User
 from app.schemas.auth import UserResponse
 from app.schemas.user import UserProfile, UserProfileUpdate
-from app.dependencies.auth import get_current_active_user, get_current_admin_user
 
 router = APIRouter(prefix="/users", tags=["ユーザー管理"])
 
+# ユーザー一覧は件数が多いため response_model の再検証を通さずにシリアライズする
+user_serializer = FastSerializer(UserResponse)
+
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
-    """現在のユーザー情報を取得"""
-    return current_user
+async def get_current_user_info(
+    request: Request,
+    current_user: User = Depends(get_current_active_user)
+):
+    """現在のユーザー情報を取得（If-None-Match が一致すれば本文なしの304を返す）"""
+    return conditional_response(request, user_serializer.to_dict(current_user))
 
 
 @router.get("/me/profile", response_model=UserProfile)
@@ -27,39 +42,54 @@ async def get_current_user_profile(current_user: User = Depends(get_current_acti
 async def update_current_user_profile(
     profile_data: UserProfileUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    user_service: Any = Depends(get_user_service)
 ):
     """現在のユーザープロフィールを更新"""
     # プロフィール情報を更新
-    for field, value in profile_data.dict(exclude_unset=True).items():
-        setattr(current_user, field, value)
-    
-    db.commit()
-    db.refresh(current_user)
-    
-    return current_user
+    user = await user_service.update_profile(db, current_user, profile_data)
+    principal_cache.invalidate(user.id)
+    return user
 
 
 @router.get("/", response_model=List[UserResponse])
 async def get_users(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    cursor: Optional[str] = Query(None, description="前ページの X-Next-Cursor"),
+    limit: int = Query(100, ge=1, le=settings.users_page_max_size, description="1ページの件数"),
+    skip: int = Query(0, ge=0, deprecated=True, description="OFFSET指定（cursor を使用してください）"),
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    user_service: Any = Depends(get_user_service)
 ):
-    """ユーザー一覧を取得（管理者のみ）"""
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    """ユーザー一覧をID順に取得（管理者のみ、次ページがある場合は X-Next-Cursor / Link ヘッダーを返す）"""
+    after_id = None
+    if cursor:
+        try:
+            (after_id,) = decode_cursor(cursor, 1)
+            after_id = int(after_id)
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="カーソルが不正です"
+            ) from None
+
+    users, has_more = await user_service.get_users(db, limit, after_id, skip)
+    response = user_serializer.response(users)
+    if has_more:
+        set_next_cursor(request, response, encode_cursor(users[-1].id))
+    return response
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    user_service: Any = Depends(get_user_service)
 ):
     """特定のユーザーを取得（管理者のみ）"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await user_service.get_user(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -72,19 +102,18 @@ async def get_user(
 async def activate_user(
     user_id: int,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    user_service: Any = Depends(get_user_service)
 ):
     """ユーザーを有効化（管理者のみ）"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await user_service.set_active(db, user_id, True)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="ユーザーが見つかりません"
         )
     
-    user.is_active = True
-    db.commit()
-    
+    principal_cache.invalidate(user_id)
     return {"message": "ユーザーが有効化されました"}
 
 
@@ -92,17 +121,16 @@ async def activate_user(
 async def deactivate_user(
     user_id: int,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_session),
+    user_service: Any = Depends(get_user_service)
 ):
     """ユーザーを無効化（管理者のみ）"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await user_service.set_active(db, user_id, False)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="ユーザーが見つかりません"
         )
     
-    user.is_active = False
-    db.commit()
-    
+    principal_cache.invalidate(user_id)
     return {"message": "ユーザーが無効化されました"} 
\ No newline at end of file
@@ -1,7 +1,9 @@
 """勤怠管理のPydanticスキーマ"""
-from pydantic import BaseModel
-from typing import Optional, List
 from datetime import date, datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
 from app.models.attendance import AttendanceStatus, BreakStatus
 
 
@@ -53,8 +55,8 @@ class BreakEndRequest(BaseModel):
     notes: Optional[str] = None
 
 
-class AttendanceRecordResponse(AttendanceRecordBase):
-    """勤怠記録応答スキーマ"""
+class AttendanceRecordBriefResponse(AttendanceRecordBase):
+    """勤怠記録応答スキーマ（休憩記録を含まない）"""
     id: int
     user_id: int
     clock_in: Optional[datetime] = None
@@ -70,13 +72,17 @@ class AttendanceRecordResponse(AttendanceRecordBase):
     is_clocked_out: bool
     is_working: bool
     is_on_break: bool
-    total_break_minutes: int
-    break_records: List[BreakRecordResponse] = []
 
     class Config:
         from_attributes = True
 
 
+class AttendanceRecordResponse(AttendanceRecordBriefResponse):
+    """勤怠記録応答スキーマ"""
+    total_break_minutes: int
+    break_records: List[BreakRecordResponse] = []
+
+
 class ClockInRequest(BaseModel):
     """出勤リクエストスキーマ"""
     break_minutes: int = 60  # デフォルト1時間
@@ -108,4 +114,65 @@ class MonthlyAttendanceSummary(BaseModel):
     total_work_hours: float
     total_overtime_hours: float
     average_daily_hours: float
-    attendance_records: list[AttendanceSummary] 
\ No newline at end of file
+    late_count: int = 0  # 遅刻回数（半休を含む）
+    early_leave_count: int = 0  # 早退回数（半休を含む）
+    attendance_records: list[AttendanceSummary] = []  # include_records指定時のみ
+
+
+class EmployeeAttendanceTotals(BaseModel):
+    """従業員別の勤怠集計スキーマ"""
+    user_id: int
+    employee_id: Optional[str] = None
+    first_name: str
+    last_name: str
+    department: Optional[str] = None
+    work_days: int
+    total_hours: float
+    overtime_hours: float
+    late_count: int  # 遅刻回数（半休を含む）
+    absence_count: int  # 欠勤回数
+
+
+class DepartmentAttendanceTotals(BaseModel):
+    """部署別の勤怠集計スキーマ"""
+    department: Optional[str] = None  # 未所属の場合はNone
+    employee_count: int
+    work_days: int
+    total_hours: float
+    overtime_hours: float
+    late_count: int
+    absence_count: int
+
+
+class DepartmentDashboard(BaseModel):
+    """部署別勤怠ダッシュボードスキーマ"""
+    start_date: date
+    end_date: date
+    departments: List[DepartmentAttendanceTotals]
+    employees: List[EmployeeAttendanceTotals]
+
+
+class PresenceMember(BaseModel):
+    """在席状況のメンバースキーマ"""
+    user_id: int
+    employee_id: Optional[str] = None
+    first_name: str
+    last_name: str
+    department: Optional[str] = None
+    state: str  # working / on_break / clocked_out
+    since: Optional[datetime] = None  # 状態が変わった時刻
+
+
+class DepartmentPresence(BaseModel):
+    """部署別の在席状況スキーマ"""
+    department: Optional[str] = None  # 未所属の場合はNone
+    working: int
+    on_break: int
+    clocked_out: int
+    members: List[PresenceMember]
+
+
+class PresenceBoard(BaseModel):
+    """今日の在席状況スキーマ（出勤したユーザーのみ）"""
+    date: date
+    departments: List[DepartmentPresence]
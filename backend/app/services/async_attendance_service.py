@@ -0,0 +1,337 @@
+"""勤怠管理サービス（AsyncSession版）"""
+import logging
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.attendance import (
+    AttendanceRecord,
+    AttendanceStatus,
+    BreakRecord,
+    BreakStatus,
+)
+from app.models.user import User
+from app.schemas.attendance import (
+    BreakEndRequest,
+    BreakStartRequest,
+    ClockInRequest,
+    ClockOutRequest,
+)
+from app.services.async_rollup_service import AsyncRollupService
+from app.services.attendance_service import AttendanceService
+from app.services.rollup_service import RollupService
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAttendanceService:
+    """
+    勤怠管理サービスクラス（AsyncSession版）
+
+    業務ルールは AttendanceService と共通の apply_* / check_* を使用し、
+    データベースI/Oのみを非同期で行う。AsyncSessionでは遅延ロードができないため、
+    休憩記録は AttendanceService.break_loader で常に先読みする（または読み込まない）。
+    """
+
+    @staticmethod
+    def _record_query(include_breaks: bool = True, many: bool = True) -> Select:
+        """休憩記録を先読みする勤怠記録のクエリを作成"""
+        return select(AttendanceRecord).options(AttendanceService.break_loader(include_breaks, many))
+
+    @staticmethod
+    async def _reload(db: AsyncSession, record_id: int) -> AttendanceRecord:
+        """コミット後の勤怠記録を休憩記録とあわせて再読み込み"""
+        result = await db.execute(
+            AsyncAttendanceService._record_query(many=False)
+            .where(AttendanceRecord.id == record_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.unique().scalar_one()
+
+    @staticmethod
+    async def get_today_record(db: AsyncSession, user_id: int) -> Optional[AttendanceRecord]:
+        """今日の勤怠記録を取得"""
+        today = date.today()
+        result = await db.execute(
+            AsyncAttendanceService._record_query(many=False).where(
+                AttendanceRecord.user_id == user_id,
+                AttendanceRecord.date == today
+            )
+        )
+        return result.unique().scalars().first()
+
+    @staticmethod
+    async def stage_clock_in(
+        db: AsyncSession, user: User, request: ClockInRequest, current_time: datetime
+    ) -> AttendanceRecord:
+        """
+        出勤内容を書き込む（コミットは呼び出し側で行う）
+
+        Raises:
+            ValueError: 既に出勤済みの場合
+        """
+        statement = AttendanceService.build_clock_in_upsert(
+            db.get_bind().dialect.name, user.id, request, current_time
+        )
+        if statement is None:
+            # ON CONFLICT 非対応のデータベースでは取得してから作成する
+            record = await AsyncAttendanceService.get_today_record(db, user.id)
+            if not record:
+                record = AttendanceRecord(
+                    user_id=user.id,
+                    date=date.today(),
+                    break_minutes=request.break_minutes,
+                    status=AttendanceStatus.PRESENT
+                )
+                db.add(record)
+            else:
+                record.break_minutes = request.break_minutes
+            before = RollupService.contribution(record)
+            AttendanceService.apply_clock_in(record, request, current_time)
+            await db.flush()
+            await AsyncRollupService.apply_delta(db, before, record)
+            return record
+
+        # 同時打刻でも一意インデックスにより1ユーザー1日1件となる
+        result = await db.scalars(statement, execution_options={"populate_existing": True})
+        record = result.first()
+        if record is None:
+            raise ValueError("既に出勤済みです")
+
+        # 更新対象は未出勤の記録のみのため、変更前の寄与は0
+        await AsyncRollupService.apply_delta(db, RollupService.contribution(None), record)
+        return record
+
+    @staticmethod
+    async def clock_in(db: AsyncSession, user: User, request: ClockInRequest) -> AttendanceRecord:
+        """出勤処理"""
+        # UTCタイムゾーンで現在時刻を取得
+        current_time = datetime.now(timezone.utc)
+
+        try:
+            record = await AsyncAttendanceService.stage_clock_in(db, user, request, current_time)
+        except ValueError:
+            await db.rollback()
+            raise
+
+        await db.commit()
+        record = await AsyncAttendanceService._reload(db, record.id)
+        AttendanceService.notify_change(AttendanceService.EVENT_CLOCK_IN, user, record)
+        return record
+
+    @staticmethod
+    async def stage_clock_out(
+        db: AsyncSession, user: User, request: ClockOutRequest, current_time: datetime
+    ) -> AttendanceRecord:
+        """退勤内容と勤務時間を書き込む（コミットは呼び出し側で行う）"""
+        # 今日の記録を取得
+        record = await AsyncAttendanceService.get_today_record(db, user.id)
+        if not record:
+            raise ValueError("出勤記録が見つかりません")
+
+        before = RollupService.contribution(record)
+        AttendanceService.apply_clock_out(record, request, current_time)
+        await AsyncRollupService.apply_delta(db, before, record)
+        return record
+
+    @staticmethod
+    async def clock_out(db: AsyncSession, user: User, request: ClockOutRequest) -> AttendanceRecord:
+        """退勤処理"""
+        current_time = AttendanceService.parse_clock_out_time(request.clock_out)
+        record = await AsyncAttendanceService.stage_clock_out(db, user, request, current_time)
+
+        await db.commit()
+        record = await AsyncAttendanceService._reload(db, record.id)
+        AttendanceService.notify_change(AttendanceService.EVENT_CLOCK_OUT, user, record)
+        return record
+
+    @staticmethod
+    async def stage_cancel_clock_out(db: AsyncSession, user: User) -> AttendanceRecord:
+        """退勤キャンセル内容を書き込む（コミットは呼び出し側で行う）"""
+        # 今日の記録を取得
+        record = await AsyncAttendanceService.get_today_record(db, user.id)
+        if not record:
+            raise ValueError("出勤記録が見つかりません")
+
+        before = RollupService.contribution(record)
+        AttendanceService.apply_cancel_clock_out(record)
+        await AsyncRollupService.apply_delta(db, before, record)
+        return record
+
+    @staticmethod
+    async def cancel_clock_out(db: AsyncSession, user: User) -> AttendanceRecord:
+        """退勤キャンセル処理"""
+        record = await AsyncAttendanceService.stage_cancel_clock_out(db, user)
+
+        await db.commit()
+        record = await AsyncAttendanceService._reload(db, record.id)
+        AttendanceService.notify_change(AttendanceService.EVENT_CANCEL_CLOCK_OUT, user, record)
+        return record
+
+    @staticmethod
+    async def stage_start_break(
+        db: AsyncSession, user: User, request: BreakStartRequest, current_time: datetime
+    ) -> AttendanceRecord:
+        """休憩記録を作成し、勤怠記録を休憩中にする（コミットは呼び出し側で行う）"""
+        # 今日の記録を取得
+        record = await AsyncAttendanceService.get_today_record(db, user.id)
+        if not record:
+            raise ValueError("出勤記録が見つかりません")
+
+        AttendanceService.check_can_start_break(record)
+
+        # 休憩記録を作成
+        break_record = BreakRecord(
+            attendance_record_id=record.id,
+            break_start=current_time,
+            notes=request.notes
+        )
+        # 同じセッションで続けて休憩終了する場合（グループコミット）に備え、読み込み済みの休憩記録にも追加する
+        record.break_records.append(break_record)
+
+        # 勤怠記録のステータスを休憩中に変更
+        record.break_status = BreakStatus.ON_BREAK
+        await db.flush()
+        return record
+
+    @staticmethod
+    async def start_break(db: AsyncSession, user: User, request: BreakStartRequest) -> AttendanceRecord:
+        """休憩開始処理"""
+        try:
+            record = await AsyncAttendanceService.stage_start_break(
+                db, user, request, datetime.now(timezone.utc)
+            )
+
+            await db.commit()
+            record = await AsyncAttendanceService._reload(db, record.id)
+            AttendanceService.notify_change(AttendanceService.EVENT_BREAK_START, user, record)
+            return record
+
+        except Exception as e:
+            logger.error(f"Error in start_break: {str(e)}")
+            await db.rollback()
+            raise
+
+    @staticmethod
+    async def stage_end_break(
+        db: AsyncSession, user: User, request: BreakEndRequest, current_time: datetime
+    ) -> AttendanceRecord:
+        """進行中の休憩記録を終了し、勤怠記録を勤務中に戻す（コミットは呼び出し側で行う）"""
+        # 今日の記録を取得
+        record = await AsyncAttendanceService.get_today_record(db, user.id)
+        if not record:
+            raise ValueError("出勤記録が見つかりません")
+
+        AttendanceService.check_can_end_break(record)
+
+        # アクティブな休憩記録を取得
+        active_break = next((b for b in record.break_records if b.break_end is None), None)
+        if not active_break:
+            raise ValueError("アクティブな休憩記録が見つかりません")
+
+        # 休憩終了時間を記録
+        AttendanceService.apply_break_end(active_break, request, current_time)
+
+        # 勤怠記録のステータスを勤務中に戻す
+        record.break_status = BreakStatus.WORKING
+        await db.flush()
+        return record
+
+    @staticmethod
+    async def end_break(db: AsyncSession, user: User, request: BreakEndRequest) -> AttendanceRecord:
+        """休憩終了処理"""
+        try:
+            record = await AsyncAttendanceService.stage_end_break(
+                db, user, request, datetime.now(timezone.utc)
+            )
+
+            await db.commit()
+            record = await AsyncAttendanceService._reload(db, record.id)
+            AttendanceService.notify_change(AttendanceService.EVENT_BREAK_END, user, record)
+            return record
+
+        except Exception as e:
+            logger.error(f"Error in end_break: {str(e)}")
+            await db.rollback()
+            raise
+
+    @staticmethod
+    async def get_user_records(
+        db: AsyncSession, user_id: int, start_date: date, end_date: date, include_breaks: bool = True
+    ) -> List[AttendanceRecord]:
+        """ユーザーの勤怠記録を取得（include_breaks=False の場合は休憩記録を読み込まない）"""
+        result = await db.execute(
+            AsyncAttendanceService._record_query(include_breaks).where(
+                AttendanceRecord.user_id == user_id,
+                AttendanceRecord.date >= start_date,
+                AttendanceRecord.date <= end_date
+            ).order_by(AttendanceRecord.date.desc())
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_monthly_records(
+        db: AsyncSession, user_id: int, year: int, month: int, include_breaks: bool = True
+    ) -> List[AttendanceRecord]:
+        """月の勤怠記録を取得"""
+        first_day, last_day = AttendanceService.get_month_range(year, month)
+        return await AsyncAttendanceService.get_user_records(db, user_id, first_day, last_day, include_breaks)
+
+    @staticmethod
+    async def get_recent_records(db: AsyncSession, user_id: int, include_breaks: bool = True) -> List[AttendanceRecord]:
+        """直近の勤怠記録を取得"""
+        result = await db.execute(
+            AsyncAttendanceService._record_query(include_breaks).where(
+                AttendanceRecord.user_id == user_id
+            ).order_by(AttendanceRecord.date.desc()).limit(AttendanceService.RECENT_RECORDS_LIMIT)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_history_page(
+        db: AsyncSession,
+        user_id: int,
+        limit: int,
+        after: Optional[Tuple[date, int]] = None,
+        year: Optional[int] = None,
+        month: Optional[int] = None,
+        include_breaks: bool = True,
+    ) -> Tuple[List[AttendanceRecord], bool]:
+        """勤怠履歴の1ページ分と次ページの有無を取得"""
+        result = await db.execute(
+            AttendanceService.build_history_query(user_id, limit + 1, after, year, month, include_breaks)
+        )
+        return AttendanceService.split_page(list(result.scalars().all()), limit)
+
+    @staticmethod
+    async def get_monthly_summary(
+        db: AsyncSession, user_id: int, year: int, month: int, include_records: bool = False
+    ) -> dict:
+        """月次勤怠集計を取得（集計値は月次集計テーブル、日別の行は include_records 指定時のみ取得）"""
+        result = await db.execute(RollupService.build_totals_query(user_id, year, month))
+        totals = result.first()
+
+        rows = []
+        if include_records:
+            first_day, last_day = AttendanceService.get_month_range(year, month)
+            result = await db.execute(AttendanceService.build_monthly_rows_query(user_id, first_day, last_day))
+            rows = [row._asdict() for row in result]
+        return AttendanceService.build_monthly_summary(year, month, totals, rows)
+
+    @staticmethod
+    async def get_department_dashboard(
+        db: AsyncSession, start_date: date, end_date: date, department: Optional[str] = None
+    ) -> dict:
+        """期間内の従業員別・部署別の勤怠集計を取得"""
+        result = await db.execute(
+            AttendanceService.build_department_dashboard_query(start_date, end_date, department)
+        )
+        return AttendanceService.build_department_dashboard(start_date, end_date, result.all())
+
+    @staticmethod
+    async def get_attendance_status(db: AsyncSession, user_id: int) -> dict:
+        """今日の勤怠状態を取得"""
+        record = await AsyncAttendanceService.get_today_record(db, user_id)
+        return AttendanceService.build_status(record)
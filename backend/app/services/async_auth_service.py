@@ -0,0 +1,66 @@
+"""認証関連のビジネスロジック（AsyncSession版）"""
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import get_password_hash_async
+from app.models.user import User
+from app.schemas.auth import UserCreate
+from app.services.auth_service import AuthService
+
+
+class AsyncAuthService:
+    """認証サービス（AsyncSession版）"""
+
+    @staticmethod
+    async def get_user_by_email(email: str, db: AsyncSession) -> Optional[User]:
+        """
+        メールアドレスからユーザーを取得する
+
+        Args:
+            email: メールアドレス
+            db: 非同期データベースセッション
+
+        Returns:
+            ユーザー（存在しない場合はNone）
+        """
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
+
+    @staticmethod
+    async def create_user(user_data: UserCreate, db: AsyncSession) -> User:
+        """
+        ユーザーを作成する
+
+        Args:
+            user_data: ユーザー作成データ
+            db: 非同期データベースセッション
+
+        Returns:
+            作成されたユーザー
+
+        Raises:
+            HTTPException: バリデーションエラーまたは重複エラー
+        """
+        # メールアドレスの重複チェック
+        existing_user = await AsyncAuthService.get_user_by_email(user_data.email, db)
+        if existing_user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="このメールアドレスは既に使用されています"
+            )
+
+        # パスワードのチェック
+        AuthService.validate_password(user_data.password)
+
+        # ユーザー作成（bcryptはイベントループ外で実行）
+        hashed_password = await get_password_hash_async(user_data.password)
+        db_user = AuthService.build_user(user_data, hashed_password)
+
+        db.add(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+
+        return db_user
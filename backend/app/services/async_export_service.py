@@ -0,0 +1,31 @@
+"""勤怠記録のエクスポートサービス（AsyncSession版）"""
+from datetime import date
+from typing import AsyncIterator, Optional, Sequence
+
+from app.database.database import get_async_session_factory
+from app.services.export_service import ExportService
+
+
+class AsyncExportService:
+    """勤怠記録エクスポートサービス（AsyncSession版）"""
+
+    FORMATS = ExportService.FORMATS
+    MEDIA_TYPES = ExportService.MEDIA_TYPES
+
+    @staticmethod
+    async def iter_export(
+        start_date: date,
+        end_date: date,
+        user_ids: Optional[Sequence[int]],
+        export_format: str,
+        chunk_size: int,
+    ) -> AsyncIterator[bytes]:
+        """勤怠記録をサーバーサイドカーソルからチャンクごとに変換して返す"""
+        statement = ExportService.build_export_query(start_date, end_date, user_ids)
+        async with get_async_session_factory()() as db:
+            result = await db.stream(statement, execution_options={"yield_per": chunk_size})
+            header = ExportService.format_header(export_format)
+            if header:
+                yield header
+            async for rows in result.partitions():
+                yield ExportService.format_rows(rows, export_format)
@@ -0,0 +1,19 @@
+"""在席状況サービス（AsyncSession版）"""
+from datetime import date
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.presence import presence_index
+from app.services.presence_service import PresenceService
+
+
+class AsyncPresenceService:
+    """在席状況サービス（AsyncSession版）"""
+
+    @staticmethod
+    async def rebuild(db: AsyncSession) -> int:
+        """今日の勤怠記録から在席状況を作り直し、件数を返す"""
+        today = date.today()
+        rows = (await db.execute(PresenceService.build_rebuild_query(today))).all()
+        presence_index.replace(today, PresenceService.build_members(rows))
+        return len(rows)
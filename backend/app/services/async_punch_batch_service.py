@@ -0,0 +1,61 @@
+"""打刻のバッチ書き込みサービス（AsyncSession版）"""
+from typing import Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.group_commit import BatchResult
+from app.database.database import get_async_session_factory
+from app.models.attendance import AttendanceRecord
+from app.services.attendance_service import AttendanceService
+from app.services.punch_batch_service import PunchOperation
+
+
+class AsyncPunchBatchService:
+    """打刻のバッチ書き込みサービス（AsyncSession版）"""
+
+    @staticmethod
+    async def begin(db: AsyncSession) -> None:
+        """バッチの外側のトランザクションを開始（SQLiteでは BEGIN IMMEDIATE を明示的に発行する）"""
+        connection = await db.connection()
+        if connection.dialect.name == "sqlite":
+            await connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    @staticmethod
+    async def reload(db: AsyncSession, results: List[BatchResult]) -> List[BatchResult]:
+        """コミット後の勤怠記録を休憩記録とあわせて1クエリで読み直す"""
+        record_ids = {result.id for result in results if isinstance(result, AttendanceRecord)}
+        if not record_ids:
+            return results
+        records: Dict[int, AttendanceRecord] = {
+            record.id: record
+            for record in await db.scalars(
+                select(AttendanceRecord)
+                .options(selectinload(AttendanceRecord.break_records))
+                .where(AttendanceRecord.id.in_(record_ids))
+                .execution_options(populate_existing=True)
+            )
+        }
+        return [records[result.id] if isinstance(result, AttendanceRecord) else result for result in results]
+
+    @staticmethod
+    async def execute(operations: List[PunchOperation]) -> List[BatchResult]:
+        """打刻のバッチを1トランザクションで実行（操作ごとの結果を返す）"""
+        async with get_async_session_factory()() as db:
+            await AsyncPunchBatchService.begin(db)
+            results: List[BatchResult] = []
+            for operation in operations:
+                try:
+                    async with db.begin_nested():
+                        results.append(await operation.stage(db, operation.user, *operation.args))
+                except Exception as e:
+                    results.append(e)
+
+            await db.commit()
+            results = await AsyncPunchBatchService.reload(db, results)
+
+        for operation, result in zip(operations, results, strict=True):
+            if isinstance(result, AttendanceRecord):
+                AttendanceService.notify_change(operation.event_type, operation.user, result)
+        return results
@@ -0,0 +1,41 @@
+"""月次勤怠集計（ロールアップ）サービス（AsyncSession版）"""
+from typing import Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.attendance import AttendanceRecord, MonthlyAttendanceRollup
+from app.services.rollup_service import RollupService
+
+
+class AsyncRollupService:
+    """月次勤怠集計サービス（AsyncSession版）"""
+
+    @staticmethod
+    async def apply_delta(db: AsyncSession, before: Dict[str, float], record: AttendanceRecord) -> None:
+        """
+        勤怠記録の変更差分を月次集計に反映（コミットは呼び出し側で行う）
+
+        Args:
+            db: 非同期データベースセッション
+            before: 変更前の寄与（RollupService.contribution の戻り値）
+            record: 変更後の勤怠記録
+        """
+        delta = RollupService.build_delta(before, record)
+        if delta is None:
+            return
+
+        statement = RollupService.build_delta_upsert(
+            db.get_bind().dialect.name, record.user_id, record.date, delta
+        )
+        if statement is not None:
+            await db.execute(statement)
+            return
+
+        key = (record.user_id, record.date.year, record.date.month)
+        rollup = await db.get(MonthlyAttendanceRollup, key)
+        if rollup is None:
+            rollup = MonthlyAttendanceRollup(
+                user_id=key[0], year=key[1], month=key[2], **dict.fromkeys(RollupService.FIELDS, 0)
+            )
+            db.add(rollup)
+        RollupService.add_delta(rollup, delta)
@@ -0,0 +1,49 @@
+"""ユーザー管理サービス（AsyncSession版）"""
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.schemas.user import UserProfileUpdate
+from app.services.user_service import UserService
+
+
+class AsyncUserService:
+    """ユーザー管理サービスクラス（AsyncSession版）"""
+
+    @staticmethod
+    async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
+        """ユーザーを取得"""
+        result = await db.execute(select(User).where(User.id == user_id))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_users(
+        db: AsyncSession, limit: int, after_id: Optional[int] = None, skip: int = 0
+    ) -> Tuple[List[User], bool]:
+        """ユーザー一覧の1ページ分と次ページの有無を取得"""
+        result = await db.execute(UserService.build_users_query(limit + 1, after_id, skip))
+        users = list(result.scalars().all())
+        return users[:limit], len(users) > limit
+
+    @staticmethod
+    async def update_profile(db: AsyncSession, user: User, profile_data: UserProfileUpdate) -> User:
+        """ユーザープロフィールを更新"""
+        for field, value in profile_data.dict(exclude_unset=True).items():
+            setattr(user, field, value)
+
+        await db.commit()
+        await db.refresh(user)
+        return user
+
+    @staticmethod
+    async def set_active(db: AsyncSession, user_id: int, is_active: bool) -> Optional[User]:
+        """ユーザーの有効／無効を切り替え"""
+        user = await AsyncUserService.get_user(db, user_id)
+        if user is None:
+            return None
+
+        user.is_active = is_active
+        await db.commit()
+        return user
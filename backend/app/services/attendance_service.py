@@ -1,10 +1,29 @@
 """勤怠管理サービス"""
 from datetime import date, datetime, time, timezone
-from typing import Optional, List
-from sqlalchemy.orm import Session
-from app.models.attendance import AttendanceRecord, AttendanceStatus, BreakRecord, BreakStatus
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Row, Select, and_, case, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Load, Session, joinedload, raiseload, selectinload
+from sqlalchemy.sql.dml import Insert
+
+from app.core.events import attendance_events
+from app.models.attendance import (
+    AttendanceRecord,
+    AttendanceStatus,
+    BreakRecord,
+    BreakStatus,
+)
 from app.models.user import User
-from app.schemas.attendance import ClockInRequest, ClockOutRequest, BreakStartRequest, BreakEndRequest
+from app.schemas.attendance import (
+    BreakEndRequest,
+    BreakStartRequest,
+    ClockInRequest,
+    ClockOutRequest,
+)
+from app.services.presence_service import PresenceService
+from app.services.rollup_service import RollupService
 
 
 class AttendanceService:
@@ -14,46 +33,64 @@ class AttendanceService:
     WORK_START_TIME = time(9, 0)  # 9:00
     WORK_END_TIME = time(18, 0)   # 18:00
     REGULAR_WORK_HOURS = 8.0  # 通常勤務時間（時間）
+    RECENT_RECORDS_LIMIT = 30  # 直近の勤怠記録の取得件数
+
+    # 勤怠状態の変更イベントの種類
+    EVENT_CLOCK_IN = "clock_in"
+    EVENT_CLOCK_OUT = "clock_out"
+    EVENT_CANCEL_CLOCK_OUT = "cancel_clock_out"
+    EVENT_BREAK_START = "break_start"
+    EVENT_BREAK_END = "break_end"
+
+    # INSERT ... ON CONFLICT に対応したINSERT構文（方言ごと）
+    UPSERT_INSERTS = {
+        "sqlite": sqlite_insert,
+        "postgresql": postgresql_insert,
+    }
+
+    @staticmethod
+    def break_loader(include_breaks: bool = True, many: bool = True) -> Load:
+        """
+        休憩記録の読み込み方法を取得
+
+        一覧は selectinload（IN句の1クエリで全件分）、1件は joinedload（同じクエリで結合）とし、
+        レコードごとの遅延ロード（N+1）を避ける。休憩記録を返さない場合は raiseload で
+        意図しない遅延ロードを防ぐ。
+        """
+        if not include_breaks:
+            return raiseload(AttendanceRecord.break_records)
+        if many:
+            return selectinload(AttendanceRecord.break_records)
+        return joinedload(AttendanceRecord.break_records)
 
     @staticmethod
     def get_today_record(db: Session, user_id: int) -> Optional[AttendanceRecord]:
         """今日の勤怠記録を取得"""
         today = date.today()
-        return db.query(AttendanceRecord).filter(
+        return db.query(AttendanceRecord).options(AttendanceService.break_loader(many=False)).filter(
             AttendanceRecord.user_id == user_id,
             AttendanceRecord.date == today
         ).first()
 
     @staticmethod
-    def create_today_record(db: Session, user_id: int, break_minutes: int = 60) -> AttendanceRecord:
-        """今日の勤怠記録を作成"""
-        today = date.today()
-        record = AttendanceRecord(
-            user_id=user_id,
-            date=today,
-            break_minutes=break_minutes,
-            status=AttendanceStatus.PRESENT
-        )
-        db.add(record)
-        db.commit()
-        db.refresh(record)
-        return record
+    def to_utc(value: datetime) -> datetime:
+        """datetimeをUTCタイムゾーンに統一"""
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
 
     @staticmethod
-    def clock_in(db: Session, user: User, request: ClockInRequest) -> AttendanceRecord:
-        """出勤処理"""
-        today = date.today()
-        # UTCタイムゾーンで現在時刻を取得
-        current_time = datetime.now(timezone.utc)
-
-        # 今日の記録を取得または作成
-        record = AttendanceService.get_today_record(db, user.id)
-        if not record:
-            record = AttendanceService.create_today_record(db, user.id, request.break_minutes)
+    def parse_clock_out_time(clock_out: str) -> datetime:
+        """ISO文字列の退勤時刻をUTCタイムゾーンのdatetimeに変換"""
+        if clock_out.endswith('Z'):
+            current_time = datetime.fromisoformat(clock_out.replace('Z', '+00:00'))
         else:
-            # 既存の記録の休憩時間を更新
-            record.break_minutes = request.break_minutes
+            current_time = datetime.fromisoformat(clock_out)
+        return AttendanceService.to_utc(current_time)
 
+    @staticmethod
+    def apply_clock_in(record: AttendanceRecord, request: ClockInRequest, current_time: datetime) -> None:
+        """出勤内容を勤怠記録に反映"""
         # 既に出勤済みかチェック
         if record.is_clocked_in:
             raise ValueError("既に出勤済みです")
@@ -63,33 +100,43 @@ class AttendanceService:
         record.notes = request.notes
 
         # 遅刻チェック
-        if current_time.time() > AttendanceService.WORK_START_TIME:
+        if AttendanceService.is_late(current_time):
             record.status = AttendanceStatus.LATE
 
-        db.commit()
-        db.refresh(record)
-        return record
+    @staticmethod
+    def is_late(clock_in: datetime) -> bool:
+        """出勤時刻が始業時刻より後か（遅刻か）"""
+        return AttendanceService.to_utc(clock_in).time() > AttendanceService.WORK_START_TIME
 
     @staticmethod
-    def clock_out(db: Session, user: User, request: ClockOutRequest) -> AttendanceRecord:
-        """退勤処理"""
-        # ISO文字列をUTCタイムゾーンのdatetimeに変換
-        if request.clock_out.endswith('Z'):
-            current_time = datetime.fromisoformat(request.clock_out.replace('Z', '+00:00'))
-        else:
-            current_time = datetime.fromisoformat(request.clock_out)
-        
-        # UTCタイムゾーンに統一
-        if current_time.tzinfo is None:
-            current_time = current_time.replace(tzinfo=timezone.utc)
-        else:
-            current_time = current_time.astimezone(timezone.utc)
+    def calculate_work_hours(clock_in: datetime, clock_out: datetime, break_minutes: int) -> tuple[float, float]:
+        """出勤・退勤時刻と休憩時間から総勤務時間と残業時間（時間）を計算"""
+        work_duration = AttendanceService.to_utc(clock_out) - AttendanceService.to_utc(clock_in)
+        total_hours = work_duration.total_seconds() / 3600  # 時間に変換
+
+        # 休憩時間を差し引く
+        break_hours = break_minutes / 60
+        if total_hours > break_hours:
+            total_hours -= break_hours
+
+        # 残業時間を計算
+        overtime_hours = 0.0
+        if total_hours > AttendanceService.REGULAR_WORK_HOURS:
+            overtime_hours = round(total_hours - AttendanceService.REGULAR_WORK_HOURS, 2)
+        return round(total_hours, 2), overtime_hours
 
-        # 今日の記録を取得
-        record = AttendanceService.get_today_record(db, user.id)
-        if not record:
-            raise ValueError("出勤記録が見つかりません")
+    @staticmethod
+    def get_clock_out_status(status: AttendanceStatus, clock_out: datetime) -> AttendanceStatus:
+        """退勤時刻から退勤後のステータスを取得（早退チェック）"""
+        if AttendanceService.to_utc(clock_out).time() < AttendanceService.WORK_END_TIME:
+            if status == AttendanceStatus.LATE:
+                return AttendanceStatus.HALF_DAY
+            return AttendanceStatus.EARLY_LEAVE
+        return status
 
+    @staticmethod
+    def apply_clock_out(record: AttendanceRecord, request: ClockOutRequest, current_time: datetime) -> None:
+        """退勤内容と勤務時間を勤怠記録に反映"""
         # 既に退勤済みかチェック
         if record.is_clocked_out:
             raise ValueError("既に退勤済みです")
@@ -102,46 +149,16 @@ class AttendanceService:
 
         # 勤務時間を計算
         if record.clock_in:
-            # record.clock_inもUTCタイムゾーンに統一
-            clock_in_utc = record.clock_in
-            if clock_in_utc.tzinfo is None:
-                clock_in_utc = clock_in_utc.replace(tzinfo=timezone.utc)
-            else:
-                clock_in_utc = clock_in_utc.astimezone(timezone.utc)
-            
-            work_duration = current_time - clock_in_utc
-            total_hours = work_duration.total_seconds() / 3600  # 時間に変換
-
-            # 休憩時間を差し引く
-            break_hours = record.break_minutes / 60
-            if total_hours > break_hours:
-                total_hours -= break_hours
-
-            record.total_hours = round(total_hours, 2)
-
-            # 残業時間を計算
-            if total_hours > AttendanceService.REGULAR_WORK_HOURS:
-                record.overtime_hours = round(total_hours - AttendanceService.REGULAR_WORK_HOURS, 2)
+            record.total_hours, record.overtime_hours = AttendanceService.calculate_work_hours(
+                record.clock_in, current_time, record.break_minutes
+            )
 
             # 早退チェック
-            if current_time.time() < AttendanceService.WORK_END_TIME:
-                if record.status == AttendanceStatus.LATE:
-                    record.status = AttendanceStatus.HALF_DAY
-                else:
-                    record.status = AttendanceStatus.EARLY_LEAVE
-
-        db.commit()
-        db.refresh(record)
-        return record
+            record.status = AttendanceService.get_clock_out_status(record.status, current_time)
 
     @staticmethod
-    def cancel_clock_out(db: Session, user: User) -> AttendanceRecord:
-        """退勤キャンセル処理"""
-        # 今日の記録を取得
-        record = AttendanceService.get_today_record(db, user.id)
-        if not record:
-            raise ValueError("出勤記録が見つかりません")
-
+    def apply_cancel_clock_out(record: AttendanceRecord) -> None:
+        """退勤キャンセル内容を勤怠記録に反映"""
         # 出勤していない場合
         if not record.is_clocked_in:
             raise ValueError("出勤していないため、退勤キャンセルはできません")
@@ -157,172 +174,402 @@ class AttendanceService:
 
         # ステータスを元に戻す
         if record.clock_in:
-            current_time = datetime.now(timezone.utc)
-            clock_in_utc = record.clock_in
-            if clock_in_utc.tzinfo is None:
-                clock_in_utc = clock_in_utc.replace(tzinfo=timezone.utc)
-            else:
-                clock_in_utc = clock_in_utc.astimezone(timezone.utc)
-            
             # 遅刻チェック
-            if clock_in_utc.time() > AttendanceService.WORK_START_TIME:
+            if AttendanceService.is_late(record.clock_in):
                 record.status = AttendanceStatus.LATE
             else:
                 record.status = AttendanceStatus.PRESENT
 
+    @staticmethod
+    def check_can_start_break(record: AttendanceRecord) -> None:
+        """休憩を開始できる状態かチェック"""
+        # 出勤していない場合
+        if not record.is_clocked_in:
+            raise ValueError("出勤していないため、休憩を開始できません")
+
+        # 既に退勤済みの場合
+        if record.is_clocked_out:
+            raise ValueError("退勤済みのため、休憩を開始できません")
+
+        # 既に休憩中の場合
+        if record.is_on_break:
+            raise ValueError("既に休憩中です")
+
+    @staticmethod
+    def check_can_end_break(record: AttendanceRecord) -> None:
+        """休憩を終了できる状態かチェック"""
+        # 出勤していない場合
+        if not record.is_clocked_in:
+            raise ValueError("出勤していないため、休憩を終了できません")
+
+        # 既に退勤済みの場合
+        if record.is_clocked_out:
+            raise ValueError("退勤済みのため、休憩を終了できません")
+
+        # 休憩中でない場合
+        if not record.is_on_break:
+            raise ValueError("休憩中ではありません")
+
+    @staticmethod
+    def apply_break_end(active_break: BreakRecord, request: BreakEndRequest, current_time: datetime) -> None:
+        """休憩終了時間と休憩時間を休憩記録に反映"""
+        active_break.break_end = current_time
+
+        # 休憩時間を計算（タイムゾーンを統一）
+        break_start_utc = AttendanceService.to_utc(active_break.break_start)
+        break_duration = current_time - break_start_utc
+        active_break.duration_minutes = int(break_duration.total_seconds() / 60)
+
+        if request.notes:
+            active_break.notes = request.notes
+
+    @staticmethod
+    def build_clock_in_upsert(
+        dialect_name: str, user_id: int, request: ClockInRequest, current_time: datetime
+    ) -> Optional[Insert]:
+        """
+        出勤を1文で記録する INSERT ... ON CONFLICT (user_id, date) DO UPDATE を作成
+
+        未出勤の既存記録のみ更新し、出勤済みの場合は行を返さない。
+        ON CONFLICT に対応していないデータベースではNoneを返す。
+        """
+        insert = AttendanceService.UPSERT_INSERTS.get(dialect_name)
+        if insert is None:
+            return None
+
+        is_late = AttendanceService.is_late(current_time)
+        statement = insert(AttendanceRecord).values(
+            user_id=user_id,
+            date=date.today(),
+            clock_in=current_time,
+            break_minutes=request.break_minutes,
+            notes=request.notes,
+            status=AttendanceStatus.LATE if is_late else AttendanceStatus.PRESENT,
+            break_status=BreakStatus.WORKING,
+            total_hours=0.0,
+            overtime_hours=0.0,
+        )
+        # ON CONFLICT DO UPDATE ではColumn.onupdateが適用されないため updated_at を明示する
+        update_values = {
+            "clock_in": statement.excluded.clock_in,
+            "break_minutes": statement.excluded.break_minutes,
+            "notes": statement.excluded.notes,
+            "updated_at": func.now(),
+        }
+        if is_late:
+            update_values["status"] = statement.excluded.status
+
+        return statement.on_conflict_do_update(
+            index_elements=[AttendanceRecord.user_id, AttendanceRecord.date],
+            set_=update_values,
+            where=AttendanceRecord.clock_in.is_(None),
+        ).returning(AttendanceRecord)
+
+    @staticmethod
+    def stage_clock_in(
+        db: Session, user: User, request: ClockInRequest, current_time: datetime
+    ) -> AttendanceRecord:
+        """
+        出勤内容を書き込む（コミットは呼び出し側で行う）
+
+        Raises:
+            ValueError: 既に出勤済みの場合
+        """
+        statement = AttendanceService.build_clock_in_upsert(
+            db.get_bind().dialect.name, user.id, request, current_time
+        )
+        if statement is None:
+            # ON CONFLICT 非対応のデータベースでは取得してから作成する
+            record = AttendanceService.get_today_record(db, user.id)
+            if not record:
+                record = AttendanceRecord(
+                    user_id=user.id,
+                    date=date.today(),
+                    break_minutes=request.break_minutes,
+                    status=AttendanceStatus.PRESENT
+                )
+                db.add(record)
+            else:
+                record.break_minutes = request.break_minutes
+            before = RollupService.contribution(record)
+            AttendanceService.apply_clock_in(record, request, current_time)
+            db.flush()
+            RollupService.apply_delta(db, before, record)
+            return record
+
+        # 同時打刻でも一意インデックスにより1ユーザー1日1件となる
+        record = db.scalars(statement, execution_options={"populate_existing": True}).first()
+        if record is None:
+            raise ValueError("既に出勤済みです")
+
+        # 更新対象は未出勤の記録のみのため、変更前の寄与は0
+        RollupService.apply_delta(db, RollupService.contribution(None), record)
+        return record
+
+    @staticmethod
+    def clock_in(db: Session, user: User, request: ClockInRequest) -> AttendanceRecord:
+        """出勤処理"""
+        # UTCタイムゾーンで現在時刻を取得
+        current_time = datetime.now(timezone.utc)
+
+        try:
+            record = AttendanceService.stage_clock_in(db, user, request, current_time)
+        except ValueError:
+            db.rollback()
+            raise
+
+        db.commit()
+        AttendanceService.notify_change(AttendanceService.EVENT_CLOCK_IN, user, record)
+        return record
+
+    @staticmethod
+    def stage_clock_out(
+        db: Session, user: User, request: ClockOutRequest, current_time: datetime
+    ) -> AttendanceRecord:
+        """退勤内容と勤務時間を書き込む（コミットは呼び出し側で行う）"""
+        # 今日の記録を取得
+        record = AttendanceService.get_today_record(db, user.id)
+        if not record:
+            raise ValueError("出勤記録が見つかりません")
+
+        before = RollupService.contribution(record)
+        AttendanceService.apply_clock_out(record, request, current_time)
+        RollupService.apply_delta(db, before, record)
+        return record
+
+    @staticmethod
+    def clock_out(db: Session, user: User, request: ClockOutRequest) -> AttendanceRecord:
+        """退勤処理"""
+        current_time = AttendanceService.parse_clock_out_time(request.clock_out)
+        record = AttendanceService.stage_clock_out(db, user, request, current_time)
+
         db.commit()
         db.refresh(record)
+        AttendanceService.notify_change(AttendanceService.EVENT_CLOCK_OUT, user, record)
         return record
 
     @staticmethod
-    def start_break(db: Session, user: User, request: BreakStartRequest) -> AttendanceRecord:
-        """休憩開始処理"""
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        try:
-            # 今日の記録を取得
-            record = AttendanceService.get_today_record(db, user.id)
-            if not record:
-                raise ValueError("出勤記録が見つかりません")
+    def stage_cancel_clock_out(db: Session, user: User) -> AttendanceRecord:
+        """退勤キャンセル内容を書き込む（コミットは呼び出し側で行う）"""
+        # 今日の記録を取得
+        record = AttendanceService.get_today_record(db, user.id)
+        if not record:
+            raise ValueError("出勤記録が見つかりません")
 
-            logger.info(f"Found attendance record: {record.id}")
+        before = RollupService.contribution(record)
+        AttendanceService.apply_cancel_clock_out(record)
+        RollupService.apply_delta(db, before, record)
+        return record
 
-            # 出勤していない場合
-            if not record.is_clocked_in:
-                raise ValueError("出勤していないため、休憩を開始できません")
+    @staticmethod
+    def cancel_clock_out(db: Session, user: User) -> AttendanceRecord:
+        """退勤キャンセル処理"""
+        record = AttendanceService.stage_cancel_clock_out(db, user)
+
+        db.commit()
+        db.refresh(record)
+        AttendanceService.notify_change(AttendanceService.EVENT_CANCEL_CLOCK_OUT, user, record)
+        return record
+
+    @staticmethod
+    def stage_start_break(
+        db: Session, user: User, request: BreakStartRequest, current_time: datetime
+    ) -> AttendanceRecord:
+        """休憩記録を作成し、勤怠記録を休憩中にする（コミットは呼び出し側で行う）"""
+        # 今日の記録を取得
+        record = AttendanceService.get_today_record(db, user.id)
+        if not record:
+            raise ValueError("出勤記録が見つかりません")
 
-            # 既に退勤済みの場合
-            if record.is_clocked_out:
-                raise ValueError("退勤済みのため、休憩を開始できません")
+        AttendanceService.check_can_start_break(record)
 
-            # 既に休憩中の場合
-            if record.is_on_break:
-                raise ValueError("既に休憩中です")
+        # 休憩記録を作成
+        break_record = BreakRecord(
+            attendance_record_id=record.id,
+            break_start=current_time,
+            notes=request.notes
+        )
+        # 同じセッションで続けて休憩終了する場合（グループコミット）に備え、読み込み済みの休憩記録にも追加する
+        record.break_records.append(break_record)
 
-            logger.info("Starting break...")
+        # 勤怠記録のステータスを休憩中に変更
+        record.break_status = BreakStatus.ON_BREAK
+        db.flush()
+        return record
 
-            # 休憩記録を作成
-            current_time = datetime.now(timezone.utc)
-            break_record = BreakRecord(
-                attendance_record_id=record.id,
-                break_start=current_time,
-                notes=request.notes
-            )
-            db.add(break_record)
+    @staticmethod
+    def start_break(db: Session, user: User, request: BreakStartRequest) -> AttendanceRecord:
+        """休憩開始処理"""
+        import logging
+        logger = logging.getLogger(__name__)
 
-            # 勤怠記録のステータスを休憩中に変更
-            record.break_status = BreakStatus.ON_BREAK
+        try:
+            record = AttendanceService.stage_start_break(db, user, request, datetime.now(timezone.utc))
 
             db.commit()
             db.refresh(record)
-            
-            logger.info(f"Break started successfully: {break_record.id}")
+
+            AttendanceService.notify_change(AttendanceService.EVENT_BREAK_START, user, record)
+            logger.info(f"Break started successfully: {record.id}")
             return record
-            
+
         except Exception as e:
             logger.error(f"Error in start_break: {str(e)}")
             db.rollback()
             raise
 
     @staticmethod
-    def end_break(db: Session, user: User, request: BreakEndRequest) -> AttendanceRecord:
-        """休憩終了処理"""
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        try:
-            # 今日の記録を取得
-            record = AttendanceService.get_today_record(db, user.id)
-            if not record:
-                raise ValueError("出勤記録が見つかりません")
-
-            logger.info(f"Found attendance record: {record.id}")
-
-            # 出勤していない場合
-            if not record.is_clocked_in:
-                raise ValueError("出勤していないため、休憩を終了できません")
-
-            # 既に退勤済みの場合
-            if record.is_clocked_out:
-                raise ValueError("退勤済みのため、休憩を終了できません")
-
-            # 休憩中でない場合
-            if not record.is_on_break:
-                raise ValueError("休憩中ではありません")
-
-            logger.info(f"Record is on break: {record.break_status}")
-
-            # アクティブな休憩記録を取得
-            active_break = db.query(BreakRecord).filter(
-                BreakRecord.attendance_record_id == record.id,
-                BreakRecord.break_end.is_(None)
-            ).first()
+    def stage_end_break(
+        db: Session, user: User, request: BreakEndRequest, current_time: datetime
+    ) -> AttendanceRecord:
+        """進行中の休憩記録を終了し、勤怠記録を勤務中に戻す（コミットは呼び出し側で行う）"""
+        # 今日の記録を取得
+        record = AttendanceService.get_today_record(db, user.id)
+        if not record:
+            raise ValueError("出勤記録が見つかりません")
 
-            if not active_break:
-                raise ValueError("アクティブな休憩記録が見つかりません")
+        AttendanceService.check_can_end_break(record)
 
-            logger.info(f"Found active break record: {active_break.id}")
+        # アクティブな休憩記録を取得
+        active_break = next((b for b in record.break_records if b.break_end is None), None)
+        if not active_break:
+            raise ValueError("アクティブな休憩記録が見つかりません")
 
-            # 休憩終了時間を記録
-            current_time = datetime.now(timezone.utc)
-            active_break.break_end = current_time
+        # 休憩終了時間を記録
+        AttendanceService.apply_break_end(active_break, request, current_time)
 
-            # 休憩時間を計算（タイムゾーンを統一）
-            break_start_utc = active_break.break_start
-            if break_start_utc.tzinfo is None:
-                break_start_utc = break_start_utc.replace(tzinfo=timezone.utc)
-            else:
-                break_start_utc = break_start_utc.astimezone(timezone.utc)
-            
-            break_duration = current_time - break_start_utc
-            active_break.duration_minutes = int(break_duration.total_seconds() / 60)
-
-            logger.info(f"Break duration calculated: {active_break.duration_minutes} minutes")
+        # 勤怠記録のステータスを勤務中に戻す
+        record.break_status = BreakStatus.WORKING
+        db.flush()
+        return record
 
-            if request.notes:
-                active_break.notes = request.notes
+    @staticmethod
+    def end_break(db: Session, user: User, request: BreakEndRequest) -> AttendanceRecord:
+        """休憩終了処理"""
+        import logging
+        logger = logging.getLogger(__name__)
 
-            # 勤怠記録のステータスを勤務中に戻す
-            record.break_status = BreakStatus.WORKING
+        try:
+            record = AttendanceService.stage_end_break(db, user, request, datetime.now(timezone.utc))
 
             db.commit()
             db.refresh(record)
-            
+
+            AttendanceService.notify_change(AttendanceService.EVENT_BREAK_END, user, record)
             logger.info("Break ended successfully")
             return record
-            
+
         except Exception as e:
             logger.error(f"Error in end_break: {str(e)}")
             db.rollback()
             raise
 
     @staticmethod
-    def get_user_records(db: Session, user_id: int, start_date: date, end_date: date) -> List[AttendanceRecord]:
-        """ユーザーの勤怠記録を取得"""
-        return db.query(AttendanceRecord).filter(
+    def get_user_records(
+        db: Session, user_id: int, start_date: date, end_date: date, include_breaks: bool = True
+    ) -> List[AttendanceRecord]:
+        """ユーザーの勤怠記録を取得（include_breaks=False の場合は休憩記録を読み込まない）"""
+        return db.query(AttendanceRecord).options(AttendanceService.break_loader(include_breaks)).filter(
             AttendanceRecord.user_id == user_id,
             AttendanceRecord.date >= start_date,
             AttendanceRecord.date <= end_date
         ).order_by(AttendanceRecord.date.desc()).all()
 
     @staticmethod
-    def get_monthly_summary(db: Session, user_id: int, year: int, month: int) -> dict:
-        """月次勤怠集計を取得"""
-        from datetime import datetime
+    def get_month_range(year: int, month: int) -> tuple[date, date]:
+        """月の最初と最後の日を取得"""
         import calendar
 
-        # 月の最初と最後の日を取得
         first_day = date(year, month, 1)
         last_day = date(year, month, calendar.monthrange(year, month)[1])
+        return first_day, last_day
+
+    @staticmethod
+    def get_monthly_records(
+        db: Session, user_id: int, year: int, month: int, include_breaks: bool = True
+    ) -> List[AttendanceRecord]:
+        """月の勤怠記録を取得"""
+        first_day, last_day = AttendanceService.get_month_range(year, month)
+        return AttendanceService.get_user_records(db, user_id, first_day, last_day, include_breaks)
+
+    @staticmethod
+    def get_recent_records(db: Session, user_id: int, include_breaks: bool = True) -> List[AttendanceRecord]:
+        """直近の勤怠記録を取得"""
+        return db.query(AttendanceRecord).options(AttendanceService.break_loader(include_breaks)).filter(
+            AttendanceRecord.user_id == user_id
+        ).order_by(AttendanceRecord.date.desc()).limit(AttendanceService.RECENT_RECORDS_LIMIT).all()
+
+    @staticmethod
+    def build_history_query(
+        user_id: int,
+        limit: int,
+        after: Optional[Tuple[date, int]] = None,
+        year: Optional[int] = None,
+        month: Optional[int] = None,
+        include_breaks: bool = True,
+    ) -> Select:
+        """
+        勤怠履歴の1ページ分を (date, id) の降順で取得するクエリを作成
+
+        after には前ページ最後の (date, id) を指定する。OFFSETを使わないため、
+        深いページでも (user_id, date) インデックスから直接読み出せる。
+        """
+        statement = select(AttendanceRecord).options(
+            AttendanceService.break_loader(include_breaks)
+        ).where(AttendanceRecord.user_id == user_id)
+
+        if year and month:
+            first_day, last_day = AttendanceService.get_month_range(year, month)
+            statement = statement.where(AttendanceRecord.date >= first_day, AttendanceRecord.date <= last_day)
+        if after is not None:
+            statement = statement.where(tuple_(AttendanceRecord.date, AttendanceRecord.id) < tuple_(*after))
+        return statement.order_by(AttendanceRecord.date.desc(), AttendanceRecord.id.desc()).limit(limit)
+
+    @staticmethod
+    def split_page(records: List, limit: int) -> Tuple[List, bool]:
+        """limit + 1 件取得した結果を1ページ分と次ページの有無に分ける"""
+        return records[:limit], len(records) > limit
+
+    @staticmethod
+    def get_history_page(
+        db: Session,
+        user_id: int,
+        limit: int,
+        after: Optional[Tuple[date, int]] = None,
+        year: Optional[int] = None,
+        month: Optional[int] = None,
+        include_breaks: bool = True,
+    ) -> Tuple[List[AttendanceRecord], bool]:
+        """勤怠履歴の1ページ分と次ページの有無を取得"""
+        records = db.scalars(
+            AttendanceService.build_history_query(user_id, limit + 1, after, year, month, include_breaks)
+        ).all()
+        return AttendanceService.split_page(list(records), limit)
 
-        # 月の勤怠記録を取得
-        records = AttendanceService.get_user_records(db, user_id, first_day, last_day)
+    @staticmethod
+    def build_monthly_rows_query(user_id: int, first_day: date, last_day: date) -> Select:
+        """日別の集計行（サマリーに必要な列のみ）を取得するクエリを作成"""
+        return select(
+            AttendanceRecord.date,
+            AttendanceRecord.total_hours,
+            AttendanceRecord.overtime_hours,
+            AttendanceRecord.status,
+            AttendanceRecord.clock_in,
+            AttendanceRecord.clock_out,
+        ).where(
+            AttendanceRecord.user_id == user_id,
+            AttendanceRecord.date >= first_day,
+            AttendanceRecord.date <= last_day
+        ).order_by(AttendanceRecord.date.desc())
 
-        # 集計計算
-        total_work_days = len([r for r in records if r.is_clocked_in])
-        total_work_hours = sum(r.total_hours for r in records if r.total_hours)
-        total_overtime_hours = sum(r.overtime_hours for r in records if r.overtime_hours)
+    @staticmethod
+    def build_monthly_summary(year: int, month: int, totals: Optional[Row], rows: List[dict]) -> dict:
+        """集計結果から月次集計を作成"""
+        total_work_days = totals.total_work_days if totals else 0
+        total_work_hours = totals.total_work_hours if totals else 0.0
+        total_overtime_hours = totals.total_overtime_hours if totals else 0.0
+        late_count = totals.late_count if totals else 0
+        early_leave_count = totals.early_leave_count if totals else 0
         average_daily_hours = total_work_hours / total_work_days if total_work_days > 0 else 0
 
         return {
@@ -332,5 +579,156 @@ class AttendanceService:
             "total_work_hours": round(total_work_hours, 2),
             "total_overtime_hours": round(total_overtime_hours, 2),
             "average_daily_hours": round(average_daily_hours, 2),
-            "records": records
-        } 
\ No newline at end of file
+            "late_count": late_count,
+            "early_leave_count": early_leave_count,
+            "attendance_records": rows
+        }
+
+    @staticmethod
+    def get_monthly_summary(
+        db: Session, user_id: int, year: int, month: int, include_records: bool = False
+    ) -> dict:
+        """月次勤怠集計を取得（集計値は月次集計テーブル、日別の行は include_records 指定時のみ取得）"""
+        totals = db.execute(RollupService.build_totals_query(user_id, year, month)).first()
+
+        rows = []
+        if include_records:
+            first_day, last_day = AttendanceService.get_month_range(year, month)
+            rows = [
+                row._asdict()
+                for row in db.execute(AttendanceService.build_monthly_rows_query(user_id, first_day, last_day))
+            ]
+        return AttendanceService.build_monthly_summary(year, month, totals, rows)
+
+    @staticmethod
+    def build_department_dashboard_query(
+        start_date: date, end_date: date, department: Optional[str] = None
+    ) -> Select:
+        """
+        有効な従業員ごとの勤怠集計を1回のGROUP BYで取得するクエリを作成
+
+        期間内に勤怠記録がない従業員も0件として含める。
+        """
+        statement = select(
+            User.id.label("user_id"),
+            User.employee_id,
+            User.first_name,
+            User.last_name,
+            User.department,
+            func.count(AttendanceRecord.clock_in).label("work_days"),
+            func.coalesce(func.sum(AttendanceRecord.total_hours), 0.0).label("total_hours"),
+            func.coalesce(func.sum(AttendanceRecord.overtime_hours), 0.0).label("overtime_hours"),
+            func.coalesce(func.sum(
+                case((AttendanceRecord.status.in_(RollupService.LATE_STATUSES), 1), else_=0)
+            ), 0).label("late_count"),
+            func.coalesce(func.sum(
+                case((AttendanceRecord.status == AttendanceStatus.ABSENT, 1), else_=0)
+            ), 0).label("absence_count"),
+        ).select_from(User).outerjoin(
+            AttendanceRecord,
+            and_(
+                AttendanceRecord.user_id == User.id,
+                AttendanceRecord.date >= start_date,
+                AttendanceRecord.date <= end_date,
+            )
+        ).where(User.is_active.is_(True))
+
+        if department is not None:
+            statement = statement.where(User.department == department)
+        return statement.group_by(User.id).order_by(User.department, User.id)
+
+    @staticmethod
+    def build_department_dashboard(start_date: date, end_date: date, rows: List[Row]) -> dict:
+        """従業員別の集計行から部署別の合計を含むダッシュボードを作成"""
+        employees = []
+        departments: dict = {}
+        for row in rows:
+            employee = row._asdict()
+            employee["total_hours"] = round(employee["total_hours"], 2)
+            employee["overtime_hours"] = round(employee["overtime_hours"], 2)
+            employees.append(employee)
+
+            totals = departments.get(row.department)
+            if totals is None:
+                totals = departments[row.department] = {
+                    "department": row.department,
+                    "employee_count": 0,
+                    "work_days": 0,
+                    "total_hours": 0.0,
+                    "overtime_hours": 0.0,
+                    "late_count": 0,
+                    "absence_count": 0,
+                }
+            totals["employee_count"] += 1
+            for name in ("work_days", "total_hours", "overtime_hours", "late_count", "absence_count"):
+                totals[name] += employee[name]
+
+        for totals in departments.values():
+            totals["total_hours"] = round(totals["total_hours"], 2)
+            totals["overtime_hours"] = round(totals["overtime_hours"], 2)
+
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "departments": list(departments.values()),
+            "employees": employees,
+        }
+
+    @staticmethod
+    def get_department_dashboard(
+        db: Session, start_date: date, end_date: date, department: Optional[str] = None
+    ) -> dict:
+        """期間内の従業員別・部署別の勤怠集計を取得"""
+        rows = db.execute(
+            AttendanceService.build_department_dashboard_query(start_date, end_date, department)
+        ).all()
+        return AttendanceService.build_department_dashboard(start_date, end_date, rows)
+
+    @staticmethod
+    def build_status(record: Optional[AttendanceRecord]) -> dict:
+        """勤怠記録から勤怠状態を作成"""
+        if record is None:
+            return {
+                "record_id": None,
+                "is_clocked_in": False,
+                "is_clocked_out": False,
+                "is_working": False,
+                "is_on_break": False,
+                "break_status": BreakStatus.WORKING,
+            }
+        return {
+            "record_id": record.id,
+            "is_clocked_in": record.is_clocked_in,
+            "is_clocked_out": record.is_clocked_out,
+            "is_working": record.is_working,
+            "is_on_break": record.is_on_break,
+            "break_status": record.break_status,
+        }
+
+    @staticmethod
+    def build_event(event_type: str, user: User, record: AttendanceRecord) -> dict:
+        """勤怠記録の変更イベントを作成（勤怠状態に時刻と部署を加えたもの）"""
+        return {
+            "type": event_type,
+            "user_id": user.id,
+            "department": user.department,
+            "date": record.date,
+            "clock_in": record.clock_in,
+            "clock_out": record.clock_out,
+            "status": record.status,
+            "updated_at": record.updated_at,
+            **AttendanceService.build_status(record),
+        }
+
+    @staticmethod
+    def notify_change(event_type: str, user: User, record: AttendanceRecord) -> None:
+        """コミット済みの勤怠記録の変更を在席状況に反映し、購読者へ通知（購読者がいなければ通知しない）"""
+        PresenceService.update(user, record)
+        if attendance_events.has_subscribers():
+            attendance_events.publish(AttendanceService.build_event(event_type, user, record))
+
+    @staticmethod
+    def get_attendance_status(db: Session, user_id: int) -> dict:
+        """今日の勤怠状態を取得"""
+        record = AttendanceService.get_today_record(db, user_id)
+        return AttendanceService.build_status(record)
@@ -1,18 +1,34 @@
 """認証関連のビジネスロジック"""
 from typing import Optional
-from sqlalchemy.orm import Session
+
 from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import get_password_hash
 from app.models.user import User
 from app.schemas.auth import UserCreate
-from app.core.security import get_password_hash
-from app.core.config import settings
 
 
 class AuthService:
     """認証サービス"""
     
     @staticmethod
-    async def create_user(user_data: UserCreate, db: Session) -> User:
+    def get_user_by_email(email: str, db: Session) -> Optional[User]:
+        """
+        メールアドレスからユーザーを取得する
+        
+        Args:
+            email: メールアドレス
+            db: データベースセッション
+            
+        Returns:
+            ユーザー（存在しない場合はNone）
+        """
+        return db.query(User).filter(User.email == email).first()
+    
+    @staticmethod
+    def create_user(user_data: UserCreate, db: Session) -> User:
         """
         ユーザーを作成する
         
@@ -27,30 +43,63 @@ class AuthService:
             HTTPException: バリデーションエラーまたは重複エラー
         """
         # メールアドレスの重複チェック
-        existing_user = db.query(User).filter(User.email == user_data.email).first()
+        existing_user = AuthService.get_user_by_email(user_data.email, db)
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="このメールアドレスは既に使用されています"
             )
         
+        # パスワードのチェック
+        AuthService.validate_password(user_data.password)
+        
+        # ユーザー作成
+        db_user = AuthService.build_user(user_data, get_password_hash(user_data.password))
+        
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
+        
+        return db_user
+    
+    @staticmethod
+    def validate_password(password: str) -> None:
+        """
+        パスワードの長さと強度を検証する
+        
+        Args:
+            password: 検証するパスワード
+            
+        Raises:
+            HTTPException: パスワードが要件を満たさない場合
+        """
         # パスワードの長さチェック
-        if len(user_data.password) < settings.min_password_length:
+        if len(password) < settings.min_password_length:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"パスワードは{settings.min_password_length}文字以上である必要があります"
             )
         
         # パスワードの強度チェック
-        if not AuthService._validate_password_strength(user_data.password):
+        if not AuthService._validate_password_strength(password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="パスワードは英数字を含む必要があります"
             )
+    
+    @staticmethod
+    def build_user(user_data: UserCreate, hashed_password: str) -> User:
+        """
+        ユーザー作成データからユーザーを組み立てる
         
-        # ユーザー作成
-        hashed_password = get_password_hash(user_data.password)
-        db_user = User(
+        Args:
+            user_data: ユーザー作成データ
+            hashed_password: ハッシュ化済みのパスワード
+            
+        Returns:
+            未保存のユーザー
+        """
+        return User(
             email=user_data.email,
             hashed_password=hashed_password,
             first_name=user_data.first_name,
@@ -59,12 +108,6 @@ class AuthService:
             department=user_data.department,
             employee_id=user_data.employee_id,
         )
-        
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
-        
-        return db_user
     
     @staticmethod
     def _validate_password_strength(password: str) -> bool:
@@ -0,0 +1,336 @@
+"""ベンチマーク用の合成データ生成サービス"""
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.models.attendance import (
+    AttendanceRecord,
+    AttendanceStatus,
+    BreakRecord,
+    BreakStatus,
+)
+from app.models.user import User, UserRole
+from app.services.attendance_service import AttendanceService
+from app.services.rollup_service import RollupService
+
+
+@dataclass
+class DatasetResult:
+    """生成結果"""
+    users: int = 0  # 作成したユーザー数
+    records: int = 0  # 作成した勤怠記録の件数
+    breaks: int = 0  # 作成した休憩記録の件数
+    days: int = 0  # 処理した営業日数
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """1秒あたりの挿入行数（勤怠記録＋休憩記録）"""
+        return (self.records + self.breaks) / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+@dataclass(frozen=True)
+class WorkerProfile:
+    """ユーザーごとの勤務の傾向（遅刻・早退・残業・休暇の起こりやすさ）"""
+    user_id: int
+    arrival_minutes: float  # 始業の何分前に出勤することが多いか
+    late_rate: float
+    early_leave_rate: float
+    overtime_rate: float
+    absence_rate: float
+
+
+class DatasetService:
+    """
+    合成データ生成サービスクラス
+
+    部署に振り分けたユーザーと、過去の営業日（土日を除く）の勤怠記録・休憩記録を生成する。
+    ユーザーごとに遅刻・早退・残業・休暇の傾向を持たせ、日ごとの打刻はその傾向から乱数で決める。
+    勤務時間・残業時間・ステータスは退勤打刻と同じ始業・終業時刻と計算式で求める。
+
+    ORMとSQLAlchemyの型変換による行ごとの処理を避けるためドライバーの executemany で挿入し、
+    ユーザーと勤怠記録のIDは生成時に採番して休憩記録の親IDに使い（生成中は他の書き込みがない前提）、
+    最後にPostgreSQLの連番を進める。
+    """
+
+    # (部署名, 人数の比率)
+    DEPARTMENTS = (
+        ("開発部", 30), ("営業部", 22), ("カスタマーサポート部", 12), ("マーケティング部", 8),
+        ("企画部", 7), ("情報システム部", 6), ("経理部", 5), ("人事部", 4), ("総務部", 4), ("法務部", 2),
+    )
+    LAST_NAMES = (
+        "佐藤", "鈴木", "高橋", "田中", "伊藤", "渡辺", "山本", "中村", "小林", "加藤",
+        "吉田", "山田", "佐々木", "山口", "松本", "井上", "木村", "林", "斎藤", "清水",
+    )
+    FIRST_NAMES = (
+        "翔太", "大輔", "健太", "拓也", "直樹", "陽菜", "結衣", "美咲", "愛", "さくら",
+        "蓮", "悠真", "湊", "葵", "陽翔", "芽依", "凛", "大翔", "美月", "颯太",
+    )
+    ADMIN_RATE = 0.01  # 管理者の割合
+    INACTIVE_RATE = 0.02  # 無効化されたユーザーの割合
+
+    # 始業時刻（UTC）の0時からの秒数と、始業から終業までの秒数
+    WORK_START_SECONDS = AttendanceService.WORK_START_TIME.hour * 3600 + AttendanceService.WORK_START_TIME.minute * 60
+    WORKDAY_SECONDS = (
+        AttendanceService.WORK_END_TIME.hour * 3600 + AttendanceService.WORK_END_TIME.minute * 60 - WORK_START_SECONDS
+    )
+
+    # 挿入する列（作成日時・更新日時はDBの既定値を使う）
+    RECORD_COLUMNS = (
+        "id", "user_id", "date", "clock_in", "clock_out", "break_minutes",
+        "total_hours", "overtime_hours", "status", "break_status",
+    )
+    BREAK_COLUMNS = ("attendance_record_id", "break_start", "break_end", "duration_minutes")
+
+    @staticmethod
+    def build_users(
+        rng: random.Random, count: int, first_id: int, email_prefix: str, hashed_password: str
+    ) -> Tuple[List[Dict], List[WorkerProfile]]:
+        """ユーザーの行と勤務の傾向を作成"""
+        departments = [name for name, _ in DatasetService.DEPARTMENTS]
+        weights = [weight for _, weight in DatasetService.DEPARTMENTS]
+        rows = []
+        profiles = []
+        for index in range(count):
+            user_id = first_id + index
+            rows.append({
+                "id": user_id,
+                "email": f"{email_prefix}{index}@example.com",
+                "hashed_password": hashed_password,
+                "first_name": rng.choice(DatasetService.FIRST_NAMES),
+                "last_name": rng.choice(DatasetService.LAST_NAMES),
+                "role": UserRole.ADMIN if rng.random() < DatasetService.ADMIN_RATE else UserRole.EMPLOYEE,
+                "department": rng.choices(departments, weights)[0],
+                "employee_id": f"{email_prefix.upper()}{index:07d}",
+                "is_active": rng.random() >= DatasetService.INACTIVE_RATE,
+            })
+            # 大半は遅刻・早退が少なく、一部のユーザーに偏る分布にする
+            profiles.append(WorkerProfile(
+                user_id=user_id,
+                arrival_minutes=rng.uniform(3, 40),
+                late_rate=min(0.5, rng.expovariate(1 / 0.04)),
+                early_leave_rate=min(0.3, rng.expovariate(1 / 0.03)),
+                overtime_rate=min(0.9, rng.betavariate(2, 4)),
+                absence_rate=rng.uniform(0.02, 0.08),
+            ))
+        return rows, profiles
+
+    @staticmethod
+    def work_hours(worked_seconds: int, break_minutes: int) -> Tuple[float, float]:
+        """総勤務時間と残業時間（AttendanceService.calculate_work_hours と同じ計算を秒数で行う）"""
+        total_hours = worked_seconds / 3600
+        break_hours = break_minutes / 60
+        if total_hours > break_hours:
+            total_hours -= break_hours
+        overtime_hours = 0.0
+        if total_hours > AttendanceService.REGULAR_WORK_HOURS:
+            overtime_hours = round(total_hours - AttendanceService.REGULAR_WORK_HOURS, 2)
+        return round(total_hours, 2), overtime_hours
+
+    @staticmethod
+    def build_day(
+        rng: random.Random, profile: WorkerProfile, day_value: Any, timestamp: Callable[[int], Any], record_id: int
+    ) -> Optional[Tuple[Tuple, List[Tuple]]]:
+        """
+        1ユーザー1日分の勤怠記録と休憩記録の行を作成（休暇の日はNone）
+
+        時刻は始業時刻からの秒数で決め、timestamp で列の値に変換する。
+        遅刻・早退の判定は is_late / get_clock_out_status と同じく始業・終業時刻との比較で行う。
+        """
+        if rng.random() < profile.absence_rate:
+            return None
+
+        end = DatasetService.WORKDAY_SECONDS
+        if rng.random() < profile.late_rate:
+            clock_in = int(60 + rng.expovariate(1 / 1500))
+        else:
+            clock_in = -int(max(60.0, rng.gauss(profile.arrival_minutes * 60, 360)))
+        if rng.random() < profile.early_leave_rate:
+            clock_out = end - int(rng.uniform(1800, 14400))
+        elif rng.random() < profile.overtime_rate:
+            clock_out = end + int(min(18000.0, 900 + rng.expovariate(1 / 5400)))
+        else:
+            clock_out = end + int(rng.uniform(0, 1200))
+
+        # 昼休憩に加え、午後・残業前の短い休憩を取ることがある
+        lunch_start = 10800 + int(rng.uniform(-900, 1800))
+        breaks = [(lunch_start, lunch_start + 60 * int(min(75.0, max(45.0, rng.gauss(60, 5)))))]
+        if rng.random() < 0.35:
+            afternoon = 21600 + int(rng.uniform(-1800, 1800))
+            breaks.append((afternoon, afternoon + 60 * int(rng.uniform(10, 20))))
+        if clock_out > end + 3600 and rng.random() < 0.5:
+            evening = end + int(rng.uniform(0, 900))
+            breaks.append((evening, evening + 60 * int(rng.uniform(10, 30))))
+
+        break_rows = []
+        break_minutes = 0
+        for break_start, break_end in breaks:
+            if break_end >= clock_out - 900:
+                continue
+            duration = (break_end - break_start) // 60
+            break_minutes += duration
+            break_rows.append((record_id, timestamp(break_start), timestamp(break_end), duration))
+
+        if clock_out < end:
+            status = AttendanceStatus.HALF_DAY if clock_in > 0 else AttendanceStatus.EARLY_LEAVE
+        else:
+            status = AttendanceStatus.LATE if clock_in > 0 else AttendanceStatus.PRESENT
+        total_hours, overtime_hours = DatasetService.work_hours(clock_out - clock_in, break_minutes)
+        record = (
+            record_id, profile.user_id, day_value, timestamp(clock_in), timestamp(clock_out),
+            break_minutes, total_hours, overtime_hours, status.name, BreakStatus.WORKING.name,
+        )
+        return record, break_rows
+
+    @staticmethod
+    def column_values(dialect_name: str, day: date) -> Tuple[Any, Callable[[int], Any]]:
+        """
+        日付列の値と、始業時刻からの秒数を日時列の値に変換する関数を取得
+
+        SQLite は SQLAlchemy と同じ文字列表現（YYYY-MM-DD HH:MM:SS.ffffff）を直接作り、
+        その他のDBはドライバーに date / datetime をそのまま渡す。
+        """
+        if dialect_name == "sqlite":
+            prefix = f"{day.isoformat()} "
+            base = DatasetService.WORK_START_SECONDS
+
+            def to_text(seconds: int) -> str:
+                seconds += base
+                return f"{prefix}{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}.000000"
+
+            return day.isoformat(), to_text
+
+        start = datetime.combine(day, AttendanceService.WORK_START_TIME, tzinfo=timezone.utc)
+        return day, lambda seconds: start + timedelta(seconds=seconds)
+
+    @staticmethod
+    def workdays(years: int, until: date) -> List[date]:
+        """until の前日から years 年分の営業日（土日を除く）を古い順に取得"""
+        days = (until - timedelta(days=offset) for offset in range(years * 365, 0, -1))
+        return [day for day in days if day.weekday() < 5]
+
+    @staticmethod
+    def insert_statement(db: Session, table: Table, columns: Sequence[str]) -> str:
+        """ドライバーのプレースホルダー形式に合わせたINSERT文を作成"""
+        placeholder = "?" if db.get_bind().dialect.paramstyle == "qmark" else "%s"
+        return (
+            f"INSERT INTO {table.name} ({', '.join(columns)}) "
+            f"VALUES ({', '.join([placeholder] * len(columns))})"
+        )
+
+    @staticmethod
+    def write_batch(
+        db: Session, statements: Tuple[str, str], records: List[Tuple], breaks: List[Tuple], result: DatasetResult
+    ) -> None:
+        """勤怠記録と休憩記録を1トランザクションで挿入（型変換を省くためドライバーの executemany を直接使う）"""
+        connection = db.connection()
+        record_statement, break_statement = statements
+        if records:
+            connection.exec_driver_sql(record_statement, records)
+            result.records += len(records)
+        if breaks:
+            connection.exec_driver_sql(break_statement, breaks)
+            result.breaks += len(breaks)
+        db.commit()
+
+    @staticmethod
+    def sync_sequences(db: Session) -> None:
+        """
+        IDを指定して挿入したテーブルの連番をIDの最大値まで進める（PostgreSQLのみ）
+
+        SERIAL の連番は明示したIDでは進まないため、進めないと以降の登録・打刻がIDの重複で失敗する。
+        SQLite は最大値の次を採番するため不要。
+        """
+        if db.get_bind().dialect.name != "postgresql":
+            return
+        for table in (User.__table__, AttendanceRecord.__table__, BreakRecord.__table__):
+            db.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {table.name}"
+                )
+            )
+        db.commit()
+
+    @staticmethod
+    def generate(
+        db: Session,
+        users: int,
+        years: int,
+        hashed_password: str,
+        email_prefix: str = "emp",
+        seed: int = 0,
+        batch_size: int = 20000,
+        on_progress: Optional[Callable[[DatasetResult], None]] = None,
+    ) -> DatasetResult:
+        """
+        ユーザーと勤怠履歴を生成して一括挿入し、最後に月次集計を作り直す
+
+        Args:
+            db: データベースセッション
+            users: 作成するユーザー数
+            years: 生成する勤怠履歴の年数（今日は含まない）
+            hashed_password: 全ユーザー共通のパスワードハッシュ（ユーザーごとのハッシュ計算を避ける）
+            email_prefix: メールアドレス（{prefix}{番号}@example.com）と社員番号の接頭辞
+            seed: 乱数のシード（同じ値なら同じデータを生成する）
+            batch_size: 1トランザクションで挿入する勤怠記録の件数
+            on_progress: バッチごとに呼び出すコールバック
+
+        Returns:
+            生成結果
+
+        Raises:
+            ValueError: 同じ接頭辞のユーザーが既に存在する場合
+        """
+        result = DatasetResult()
+        started = time.perf_counter()
+        rng = random.Random(seed)
+
+        if db.scalar(select(func.count()).select_from(User).where(User.email.like(f"{email_prefix}%@example.com"))):
+            raise ValueError(f"{email_prefix}*@example.com のユーザーが既に存在します（接頭辞を変更してください）")
+
+        first_user_id = (db.scalar(select(func.max(User.id))) or 0) + 1
+        user_rows, profiles = DatasetService.build_users(rng, users, first_user_id, email_prefix, hashed_password)
+        for offset in range(0, len(user_rows), batch_size):
+            db.execute(insert(User.__table__), user_rows[offset:offset + batch_size])
+        db.commit()
+        result.users = len(user_rows)
+
+        statements = (
+            DatasetService.insert_statement(db, AttendanceRecord.__table__, DatasetService.RECORD_COLUMNS),
+            DatasetService.insert_statement(db, BreakRecord.__table__, DatasetService.BREAK_COLUMNS),
+        )
+        dialect_name = db.get_bind().dialect.name
+        record_id = (db.scalar(select(func.max(AttendanceRecord.id))) or 0) + 1
+        records: List[Tuple] = []
+        breaks: List[Tuple] = []
+        for day in DatasetService.workdays(years, date.today()):
+            day_value, timestamp = DatasetService.column_values(dialect_name, day)
+            for profile in profiles:
+                generated = DatasetService.build_day(rng, profile, day_value, timestamp, record_id)
+                if generated is None:
+                    continue
+                record, break_rows = generated
+                records.append(record)
+                breaks.extend(break_rows)
+                record_id += 1
+                if len(records) >= batch_size:
+                    DatasetService.write_batch(db, statements, records, breaks, result)
+                    records.clear()
+                    breaks.clear()
+                    result.elapsed_seconds = time.perf_counter() - started
+                    if on_progress:
+                        on_progress(result)
+            result.days += 1
+        DatasetService.write_batch(db, statements, records, breaks, result)
+        DatasetService.sync_sequences(db)
+
+        # 一括挿入した記録を月次集計に反映する
+        RollupService.rebuild(db)
+        result.elapsed_seconds = time.perf_counter() - started
+        return result
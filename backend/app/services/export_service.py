@@ -0,0 +1,161 @@
+"""勤怠記録のエクスポートサービス"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Iterator, List, Optional, Sequence
+
+from sqlalchemy import Row, Select, func, select
+
+from app.database.database import SessionLocal
+from app.models.attendance import AttendanceRecord, BreakRecord
+from app.models.user import User
+
+
+class ExportService:
+    """
+    勤怠記録エクスポートサービスクラス
+
+    サーバーサイドカーソル（stream_results）で chunk_size 件ずつ取得し、
+    チャンクごとにCSVまたはJSON Linesへ変換して返すため、件数によらずメモリ使用量は一定となる。
+    リクエストのセッションとは別に、ストリームの間だけ専用のセッションを使用する。
+    """
+
+    FORMATS = ("csv", "jsonl")
+    MEDIA_TYPES = {
+        "csv": "text/csv; charset=utf-8",
+        "jsonl": "application/x-ndjson",
+    }
+    COLUMNS = (
+        "record_id",
+        "user_id",
+        "employee_id",
+        "date",
+        "clock_in",
+        "clock_out",
+        "break_minutes",
+        "total_break_minutes",
+        "total_hours",
+        "overtime_hours",
+        "status",
+        "notes",
+    )
+    # 表計算ソフトが数式として解釈する先頭文字（CSVではこれらで始まる文字列の先頭に ' を付ける）
+    CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+    @staticmethod
+    def build_export_query(start_date: date, end_date: date, user_ids: Optional[Sequence[int]] = None) -> Select:
+        """エクスポート対象の勤怠記録（休憩時間の合計を含む）を取得するクエリを作成"""
+        total_break_minutes = (
+            select(func.coalesce(func.sum(BreakRecord.duration_minutes), 0))
+            .where(BreakRecord.attendance_record_id == AttendanceRecord.id)
+            .correlate(AttendanceRecord)
+            .scalar_subquery()
+        )
+        statement = select(
+            AttendanceRecord.id.label("record_id"),
+            AttendanceRecord.user_id,
+            User.employee_id,
+            AttendanceRecord.date,
+            AttendanceRecord.clock_in,
+            AttendanceRecord.clock_out,
+            AttendanceRecord.break_minutes,
+            total_break_minutes.label("total_break_minutes"),
+            AttendanceRecord.total_hours,
+            AttendanceRecord.overtime_hours,
+            AttendanceRecord.status,
+            AttendanceRecord.notes,
+        ).join(User, User.id == AttendanceRecord.user_id).where(
+            AttendanceRecord.date >= start_date,
+            AttendanceRecord.date <= end_date
+        )
+        if user_ids:
+            statement = statement.where(AttendanceRecord.user_id.in_(user_ids))
+        # (user_id, date) の一意インデックスの順で読み出す
+        return statement.order_by(AttendanceRecord.user_id, AttendanceRecord.date)
+
+    @staticmethod
+    def to_value(value: Any) -> Any:
+        """日時・列挙型をエクスポート用の値に変換"""
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, Enum):
+            return value.value
+        return value
+
+    @staticmethod
+    def to_csv_value(value: Any) -> Any:
+        """
+        CSV用の値に変換
+
+        備考など利用者が入力した文字列が =・+・-・@ などで始まる場合は、給与計算で開いた
+        表計算ソフトで数式として実行されないよう先頭に ' を付ける。
+        """
+        if value is None:
+            return ""
+        value = ExportService.to_value(value)
+        if isinstance(value, str) and value.startswith(ExportService.CSV_FORMULA_PREFIXES):
+            return "'" + value
+        return value
+
+    @staticmethod
+    def format_header(export_format: str) -> bytes:
+        """ヘッダー行を作成（CSVのみ）"""
+        if export_format != "csv":
+            return b""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(ExportService.COLUMNS)
+        return buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    def format_rows(rows: List[Row], export_format: str) -> bytes:
+        """取得したチャンクをCSVまたはJSON Linesに変換"""
+        if export_format == "csv":
+            to_csv_value = ExportService.to_csv_value
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows([to_csv_value(value) for value in row] for row in rows)
+            return buffer.getvalue().encode("utf-8")
+
+        to_value = ExportService.to_value
+
+        return "".join(
+            json.dumps(
+                {column: to_value(value) for column, value in zip(ExportService.COLUMNS, row, strict=True)},
+                ensure_ascii=False,
+            ) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+    @staticmethod
+    def iter_export(
+        start_date: date,
+        end_date: date,
+        user_ids: Optional[Sequence[int]],
+        export_format: str,
+        chunk_size: int,
+    ) -> Iterator[bytes]:
+        """
+        勤怠記録をチャンクごとに変換して返す
+
+        Args:
+            start_date: 開始日
+            end_date: 終了日
+            user_ids: 対象ユーザーID（未指定時は全ユーザー）
+            export_format: "csv" または "jsonl"
+            chunk_size: 1回に取得・変換する件数
+
+        Yields:
+            エンコード済みのチャンク
+        """
+        statement = ExportService.build_export_query(start_date, end_date, user_ids)
+        db = SessionLocal()
+        try:
+            result = db.execute(statement, execution_options={"stream_results": True, "yield_per": chunk_size})
+            header = ExportService.format_header(export_format)
+            if header:
+                yield header
+            for rows in result.partitions():
+                yield ExportService.format_rows(rows, export_format)
+        finally:
+            db.close()
@@ -0,0 +1,256 @@
+"""過去の打刻データのインポートサービス"""
+import csv
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.attendance import (
+    AttendanceRecord,
+    AttendanceStatus,
+    BreakRecord,
+    BreakStatus,
+)
+from app.models.user import User
+from app.services.attendance_service import AttendanceService
+from app.services.rollup_service import RollupService
+
+
+@dataclass
+class ImportResult:
+    """インポート結果"""
+    processed: int = 0  # 読み込んだ行数
+    imported: int = 0  # 作成した勤怠記録の件数
+    breaks: int = 0  # 作成した休憩記録の件数
+    skipped: int = 0  # 既存の記録と重複したため取り込まなかった行数
+    errors: List[str] = field(default_factory=list)  # 検証エラー（行番号つき）
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """1秒あたりの処理行数"""
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+@dataclass
+class ImportRow:
+    """検証済みの1行（1ユーザー1日分の打刻）"""
+    user_id: int
+    record: Dict
+    breaks: List[Dict]
+
+
+class ImportService:
+    """
+    打刻データインポートサービスクラス
+
+    CSVの列: employee_id, date, clock_in, clock_out, break_minutes, breaks, notes
+    - clock_in / clock_out: ISO形式の日時、または date と組み合わせる HH:MM（UTC）
+    - breaks: "HH:MM-HH:MM" をセミコロン区切りで指定（任意）
+    - break_minutes: 未指定時は breaks の合計、breaks もない場合は60分
+
+    勤務時間・残業時間・ステータスは退勤打刻と同じ AttendanceService の計算で求め、
+    batch_size 行ごとに1トランザクションで一括挿入する。
+    """
+
+    REQUIRED_COLUMNS = ("employee_id", "date", "clock_in")
+    DEFAULT_BREAK_MINUTES = 60
+
+    @staticmethod
+    def load_user_ids(db: Session) -> Dict[str, int]:
+        """社員番号からユーザーIDへの対応表を取得"""
+        rows = db.execute(select(User.employee_id, User.id).where(User.employee_id.is_not(None)))
+        return dict(rows.all())
+
+    @staticmethod
+    def parse_time(value: str, record_date: date) -> datetime:
+        """ISO形式の日時、または HH:MM をUTCタイムゾーンのdatetimeに変換（日付をまたぐ場合はISO形式で指定）"""
+        value = value.strip()
+        if len(value) <= 5:
+            hour, minute = value.split(":")
+            return datetime(
+                record_date.year, record_date.month, record_date.day, int(hour), int(minute), tzinfo=timezone.utc
+            )
+        return AttendanceService.parse_clock_out_time(value)
+
+    @staticmethod
+    def parse_breaks(value: str, record_date: date) -> List[Tuple[datetime, datetime]]:
+        """"HH:MM-HH:MM;..." 形式の休憩を開始・終了時刻のリストに変換"""
+        breaks = []
+        for item in filter(None, (part.strip() for part in value.split(";"))):
+            start, end = item.split("-")
+            break_start = ImportService.parse_time(start, record_date)
+            break_end = ImportService.parse_time(end, record_date)
+            if break_end <= break_start:
+                raise ValueError(f"休憩の終了時刻が開始時刻以前です: {item}")
+            breaks.append((break_start, break_end))
+        return breaks
+
+    @staticmethod
+    def parse_row(row: Dict[str, str], user_ids: Dict[str, int]) -> ImportRow:
+        """
+        CSVの1行を検証し、勤怠記録・休憩記録の値に変換
+
+        Raises:
+            ValueError: 必須項目の不足、日時の形式誤り、未登録の社員番号
+        """
+        for column in ImportService.REQUIRED_COLUMNS:
+            if not (row.get(column) or "").strip():
+                raise ValueError(f"{column} がありません")
+
+        employee_id = row["employee_id"].strip()
+        user_id = user_ids.get(employee_id)
+        if user_id is None:
+            raise ValueError(f"社員番号が見つかりません: {employee_id}")
+
+        record_date = date.fromisoformat(row["date"].strip())
+        clock_in = ImportService.parse_time(row["clock_in"], record_date)
+        clock_out = None
+        if (row.get("clock_out") or "").strip():
+            clock_out = ImportService.parse_time(row["clock_out"], record_date)
+            if clock_out <= clock_in:
+                raise ValueError("退勤時刻が出勤時刻以前です")
+
+        breaks = ImportService.parse_breaks(row.get("breaks") or "", record_date)
+        break_durations = [int((end - start).total_seconds() / 60) for start, end in breaks]
+        if (row.get("break_minutes") or "").strip():
+            break_minutes = int(row["break_minutes"])
+        elif breaks:
+            break_minutes = sum(break_durations)
+        else:
+            break_minutes = ImportService.DEFAULT_BREAK_MINUTES
+
+        # 出勤・退勤打刻と同じ計算で勤務時間とステータスを求める
+        status = AttendanceStatus.LATE if AttendanceService.is_late(clock_in) else AttendanceStatus.PRESENT
+        total_hours, overtime_hours = 0.0, 0.0
+        if clock_out is not None:
+            total_hours, overtime_hours = AttendanceService.calculate_work_hours(clock_in, clock_out, break_minutes)
+            status = AttendanceService.get_clock_out_status(status, clock_out)
+
+        record = {
+            "user_id": user_id,
+            "date": record_date,
+            "clock_in": clock_in,
+            "clock_out": clock_out,
+            "break_minutes": break_minutes,
+            "total_hours": total_hours,
+            "overtime_hours": overtime_hours,
+            "status": status,
+            "break_status": BreakStatus.WORKING,
+            "notes": (row.get("notes") or "").strip() or None,
+        }
+        break_rows = [
+            {"break_start": start, "break_end": end, "duration_minutes": duration}
+            for (start, end), duration in zip(breaks, break_durations, strict=True)
+        ]
+        return ImportRow(user_id=user_id, record=record, breaks=break_rows)
+
+    @staticmethod
+    def find_record_ids(db: Session, batch: List[ImportRow]) -> Dict[Tuple[int, date], int]:
+        """バッチ内のユーザー・期間に存在する記録の (user_id, date) から勤怠記録IDへの対応表を取得"""
+        dates = [item.record["date"] for item in batch]
+        rows = db.execute(
+            select(AttendanceRecord.user_id, AttendanceRecord.date, AttendanceRecord.id).where(
+                AttendanceRecord.user_id.in_({item.user_id for item in batch}),
+                AttendanceRecord.date >= min(dates),
+                AttendanceRecord.date <= max(dates)
+            )
+        )
+        return {(user_id, record_date): record_id for user_id, record_date, record_id in rows}
+
+    @staticmethod
+    def write_batch(db: Session, batch: List[ImportRow], result: ImportResult) -> None:
+        """
+        バッチを1トランザクションで挿入（既存の (user_id, date) は取り込まない）
+
+        ORMの行ごとの処理を避けるためテーブルに対して executemany で挿入する。
+        RETURNING で挿入順にIDを受け取る方法はSQLiteでは1行ずつの実行になるため、
+        休憩記録の親IDは挿入後に (user_id, date) の一意インデックスで引き直す。
+        """
+        existing = ImportService.find_record_ids(db, batch)
+        new_rows = [item for item in batch if (item.user_id, item.record["date"]) not in existing]
+        result.skipped += len(batch) - len(new_rows)
+        if new_rows:
+            db.execute(insert(AttendanceRecord.__table__), [item.record for item in new_rows])
+            result.imported += len(new_rows)
+
+            rows_with_breaks = [item for item in new_rows if item.breaks]
+            if rows_with_breaks:
+                record_ids = ImportService.find_record_ids(db, rows_with_breaks)
+                break_rows = [
+                    {**break_row, "attendance_record_id": record_ids[(item.user_id, item.record["date"])]}
+                    for item in rows_with_breaks
+                    for break_row in item.breaks
+                ]
+                db.execute(insert(BreakRecord.__table__), break_rows)
+                result.breaks += len(break_rows)
+        db.commit()
+
+    @staticmethod
+    def read_csv(paths: Iterable[str]) -> Iterator[Tuple[str, int, Dict[str, str]]]:
+        """CSVファイルを順に読み込み、(ファイル名, 行番号, 行) を返す"""
+        for path in paths:
+            with open(path, newline="", encoding="utf-8-sig") as file:
+                # 1行目はヘッダーのため、データ行は2行目から数える
+                for line_number, row in enumerate(csv.DictReader(file), start=2):
+                    yield path, line_number, row
+
+    @staticmethod
+    def import_rows(
+        db: Session,
+        rows: Iterable[Tuple[str, int, Dict[str, str]]],
+        batch_size: int,
+        on_progress: Optional[Callable[[ImportResult], None]] = None,
+    ) -> ImportResult:
+        """
+        検証済みの行を batch_size 件ずつ挿入し、最後に月次集計を作り直す
+
+        Args:
+            db: データベースセッション
+            rows: (ファイル名, 行番号, 行) のイテラブル
+            batch_size: 1トランザクションで挿入する件数
+            on_progress: バッチごとに呼び出すコールバック
+
+        Returns:
+            インポート結果
+        """
+        result = ImportResult()
+        started = time.perf_counter()
+        user_ids = ImportService.load_user_ids(db)
+        batch: List[ImportRow] = []
+        batch_keys: Set[Tuple[int, date]] = set()  # バッチ間の重複は既存の記録として取り込まない
+
+        for source, line_number, row in rows:
+            result.processed += 1
+            try:
+                item = ImportService.parse_row(row, user_ids)
+            except (ValueError, KeyError) as e:
+                result.errors.append(f"{source}:{line_number}: {e}")
+                continue
+
+            key = (item.user_id, item.record["date"])
+            if key in batch_keys:
+                result.errors.append(f"{source}:{line_number}: 同じ社員・日付の行が重複しています")
+                continue
+            batch_keys.add(key)
+
+            batch.append(item)
+            if len(batch) >= batch_size:
+                ImportService.write_batch(db, batch, result)
+                batch.clear()
+                batch_keys.clear()
+                result.elapsed_seconds = time.perf_counter() - started
+                if on_progress:
+                    on_progress(result)
+
+        if batch:
+            ImportService.write_batch(db, batch, result)
+
+        # 一括挿入した記録を月次集計に反映する
+        if result.imported:
+            RollupService.rebuild(db)
+        result.elapsed_seconds = time.perf_counter() - started
+        return result
@@ -0,0 +1,103 @@
+"""在席状況サービス"""
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.core.presence import (
+    CLOCKED_OUT,
+    ON_BREAK,
+    WORKING,
+    PresenceMember,
+    presence_index,
+)
+from app.models.attendance import AttendanceRecord, BreakStatus
+from app.models.user import User
+
+
+class PresenceService:
+    """
+    在席状況サービスクラス
+
+    「今いるのは誰か」を今日の勤怠記録の走査なしで答えるため、打刻・休憩の処理が
+    presence_index を更新する。起動時（および複数ワーカー構成での定期的な同期）は
+    今日の勤怠記録から作り直す。
+    """
+
+    @staticmethod
+    def get_state(
+        clock_in: Optional[datetime], clock_out: Optional[datetime], break_status: BreakStatus
+    ) -> Optional[str]:
+        """出勤・退勤時刻と休憩ステータスから在席状況を取得（未出勤はNone）"""
+        if clock_in is None:
+            return None
+        if clock_out is not None:
+            return CLOCKED_OUT
+        if break_status == BreakStatus.ON_BREAK:
+            return ON_BREAK
+        return WORKING
+
+    @staticmethod
+    def build_member(user: User, record: AttendanceRecord) -> Optional[PresenceMember]:
+        """ユーザーと勤怠記録から在席状況を作成（未出勤はNone）"""
+        state = PresenceService.get_state(record.clock_in, record.clock_out, record.break_status)
+        if state is None:
+            return None
+        return PresenceMember(
+            user_id=user.id,
+            employee_id=user.employee_id,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            department=user.department,
+            state=state,
+            since=record.updated_at,
+        )
+
+    @staticmethod
+    def update(user: User, record: AttendanceRecord) -> None:
+        """コミット済みの勤怠記録の変更を在席状況に反映"""
+        member = PresenceService.build_member(user, record)
+        if member is not None:
+            presence_index.update(record.date, member)
+
+    @staticmethod
+    def build_rebuild_query(day: date) -> Select:
+        """指定日に出勤した有効なユーザーの在席状況を取得するクエリを作成"""
+        return select(
+            User.id,
+            User.employee_id,
+            User.first_name,
+            User.last_name,
+            User.department,
+            AttendanceRecord.clock_in,
+            AttendanceRecord.clock_out,
+            AttendanceRecord.break_status,
+            AttendanceRecord.updated_at,
+        ).join(AttendanceRecord, AttendanceRecord.user_id == User.id).where(
+            AttendanceRecord.date == day,
+            AttendanceRecord.clock_in.is_not(None),
+            User.is_active.is_(True),
+        )
+
+    @staticmethod
+    def build_members(rows: Iterable) -> Iterable[PresenceMember]:
+        """クエリ結果の行を在席状況に変換"""
+        for row in rows:
+            yield PresenceMember(
+                user_id=row.id,
+                employee_id=row.employee_id,
+                first_name=row.first_name,
+                last_name=row.last_name,
+                department=row.department,
+                state=PresenceService.get_state(row.clock_in, row.clock_out, row.break_status),
+                since=row.updated_at,
+            )
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """今日の勤怠記録から在席状況を作り直し、件数を返す"""
+        today = date.today()
+        rows = db.execute(PresenceService.build_rebuild_query(today)).all()
+        presence_index.replace(today, PresenceService.build_members(rows))
+        return len(rows)
@@ -0,0 +1,88 @@
+"""打刻のバッチ書き込みサービス（グループコミット）"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.group_commit import BatchResult
+from app.database.database import SessionLocal
+from app.models.attendance import AttendanceRecord
+from app.models.user import User
+from app.services.attendance_service import AttendanceService
+
+
+@dataclass
+class PunchOperation:
+    """キューに溜める打刻1件分の操作"""
+    event_type: str  # AttendanceService.EVENT_*
+    user: User
+    stage: Callable[..., Any]  # AttendanceService / AsyncAttendanceService の stage_* メソッド
+    args: Tuple[Any, ...]  # user の後に渡す引数（打刻時刻は投入時に確定させる）
+
+
+class PunchBatchService:
+    """
+    打刻のバッチ書き込みサービスクラス
+
+    バッチ内の打刻をそれぞれSAVEPOINTで実行し、検証エラーになった打刻だけを取り消して
+    残りを1回のコミットで確定する。SQLiteでは打刻ごとのコミット（fsync）がなくなる。
+    """
+
+    @staticmethod
+    def begin(db: Session) -> None:
+        """
+        バッチの外側のトランザクションを開始
+
+        pysqliteはSAVEPOINTの前にBEGINを発行しないため、そのままではSAVEPOINTのRELEASEが
+        打刻ごとのコミットになる。SQLiteでは書き込みロックを先に取る BEGIN IMMEDIATE を明示的に発行する。
+        """
+        connection = db.connection()
+        if connection.dialect.name == "sqlite":
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    @staticmethod
+    def reload(db: Session, results: List[BatchResult]) -> List[BatchResult]:
+        """コミット後の勤怠記録を休憩記録とあわせて1クエリで読み直す（セッションを閉じても参照できるように）"""
+        record_ids = {result.id for result in results if isinstance(result, AttendanceRecord)}
+        if not record_ids:
+            return results
+        records: Dict[int, AttendanceRecord] = {
+            record.id: record
+            for record in db.scalars(
+                select(AttendanceRecord)
+                .options(selectinload(AttendanceRecord.break_records))
+                .where(AttendanceRecord.id.in_(record_ids))
+                .execution_options(populate_existing=True)
+            )
+        }
+        return [records[result.id] if isinstance(result, AttendanceRecord) else result for result in results]
+
+    @staticmethod
+    def execute(operations: List[PunchOperation]) -> List[BatchResult]:
+        """
+        打刻のバッチを1トランザクションで実行
+
+        Returns:
+            操作ごとの結果（勤怠記録、または検証エラーなどの例外）
+        """
+        db = SessionLocal()
+        try:
+            PunchBatchService.begin(db)
+            results: List[BatchResult] = []
+            for operation in operations:
+                try:
+                    with db.begin_nested():
+                        results.append(operation.stage(db, operation.user, *operation.args))
+                except Exception as e:
+                    results.append(e)
+
+            db.commit()
+            results = PunchBatchService.reload(db, results)
+        finally:
+            db.close()
+
+        for operation, result in zip(operations, results, strict=True):
+            if isinstance(result, AttendanceRecord):
+                AttendanceService.notify_change(operation.event_type, operation.user, result)
+        return results
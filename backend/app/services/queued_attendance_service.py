@@ -0,0 +1,73 @@
+"""打刻を書き込みキュー経由で実行する勤怠管理サービス"""
+from datetime import datetime, timezone
+from typing import Any
+
+from app.core.group_commit import GroupCommitQueue
+from app.database.database import release_session
+from app.models.attendance import AttendanceRecord
+from app.models.user import User
+from app.schemas.attendance import (
+    BreakEndRequest,
+    BreakStartRequest,
+    ClockInRequest,
+    ClockOutRequest,
+)
+from app.services.attendance_service import AttendanceService
+from app.services.punch_batch_service import PunchOperation
+
+
+class QueuedAttendanceService:
+    """
+    打刻（出勤・退勤・退勤キャンセル・休憩開始／終了）をグループコミットの書き込みキューに
+    投入する勤怠管理サービス
+
+    打刻以外のメソッドは元のサービスへそのまま委譲する。打刻時刻は投入時に確定させるため、
+    キューで待った時間は記録に影響しない。バッチは専用のセッションで実行するため、
+    待っている間にリクエストのセッションがコネクションを保持しないよう投入前に閉じる。
+    """
+
+    def __init__(self, service: Any, stages: type, queue: "GroupCommitQueue[PunchOperation]") -> None:
+        self._service = service  # 打刻以外の処理を行うサービス
+        self._stages = stages  # stage_* メソッドを持つサービスクラス
+        self._queue = queue
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._service, name)
+
+    async def _submit(self, db: Any, event_type: str, user: User, stage: Any, *args: Any) -> AttendanceRecord:
+        await release_session(db)
+        return await self._queue.submit(PunchOperation(event_type, user, stage, args))
+
+    async def clock_in(self, db: Any, user: User, request: ClockInRequest) -> AttendanceRecord:
+        """出勤処理"""
+        return await self._submit(
+            db, AttendanceService.EVENT_CLOCK_IN, user, self._stages.stage_clock_in,
+            request, datetime.now(timezone.utc)
+        )
+
+    async def clock_out(self, db: Any, user: User, request: ClockOutRequest) -> AttendanceRecord:
+        """退勤処理"""
+        current_time = AttendanceService.parse_clock_out_time(request.clock_out)
+        return await self._submit(
+            db, AttendanceService.EVENT_CLOCK_OUT, user, self._stages.stage_clock_out, request, current_time
+        )
+
+    async def cancel_clock_out(self, db: Any, user: User) -> AttendanceRecord:
+        """退勤キャンセル処理"""
+        return await self._submit(
+            db, AttendanceService.EVENT_CANCEL_CLOCK_OUT, user, self._stages.stage_cancel_clock_out
+        )
+
+    async def start_break(self, db: Any, user: User, request: BreakStartRequest) -> AttendanceRecord:
+        """休憩開始処理"""
+        return await self._submit(
+            db, AttendanceService.EVENT_BREAK_START, user, self._stages.stage_start_break,
+            request, datetime.now(timezone.utc)
+        )
+
+    async def end_break(self, db: Any, user: User, request: BreakEndRequest) -> AttendanceRecord:
+        """休憩終了処理"""
+        return await self._submit(
+            db, AttendanceService.EVENT_BREAK_END, user, self._stages.stage_end_break,
+            request, datetime.now(timezone.utc)
+        )
@@ -0,0 +1,177 @@
+"""月次勤怠集計（ロールアップ）サービス"""
+from datetime import date
+from typing import Dict, Optional
+
+from sqlalchemy import Select, case, delete, extract, func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import Insert
+
+from app.models.attendance import (
+    AttendanceRecord,
+    AttendanceStatus,
+    MonthlyAttendanceRollup,
+)
+
+
+class RollupService:
+    """
+    月次勤怠集計サービスクラス
+
+    monthly_attendance_rollups は勤怠記録を変更する処理（出勤・退勤・退勤キャンセル）と
+    同じトランザクションで、変更前後の差分を加算して更新する。
+    集計値がずれた場合は rebuild で勤怠記録から作り直す。
+    """
+
+    # 差分で更新する集計列
+    FIELDS = ("work_days", "total_hours", "overtime_hours", "late_count", "early_leave_count")
+
+    LATE_STATUSES = (AttendanceStatus.LATE, AttendanceStatus.HALF_DAY)
+    EARLY_LEAVE_STATUSES = (AttendanceStatus.EARLY_LEAVE, AttendanceStatus.HALF_DAY)
+
+    @staticmethod
+    def contribution(record: Optional[AttendanceRecord]) -> Dict[str, float]:
+        """勤怠記録1件が月次集計に寄与する値を取得（未出勤の記録は寄与しない）"""
+        if record is None or record.clock_in is None:
+            return dict.fromkeys(RollupService.FIELDS, 0)
+        return {
+            "work_days": 1,
+            "total_hours": record.total_hours or 0.0,
+            "overtime_hours": record.overtime_hours or 0.0,
+            "late_count": int(record.status in RollupService.LATE_STATUSES),
+            "early_leave_count": int(record.status in RollupService.EARLY_LEAVE_STATUSES),
+        }
+
+    @staticmethod
+    def build_delta(before: Dict[str, float], record: AttendanceRecord) -> Optional[Dict[str, float]]:
+        """変更前の寄与と変更後の記録から差分を作成（差分がない場合はNone）"""
+        after = RollupService.contribution(record)
+        delta = {name: after[name] - before[name] for name in RollupService.FIELDS}
+        if not any(delta.values()):
+            return None
+        return delta
+
+    @staticmethod
+    def build_delta_upsert(
+        dialect_name: str, user_id: int, record_date: date, delta: Dict[str, float]
+    ) -> Optional[Insert]:
+        """
+        差分を1文で加算する INSERT ... ON CONFLICT (user_id, year, month) DO UPDATE を作成
+
+        ON CONFLICT に対応していないデータベースではNoneを返す。
+        """
+        from app.services.attendance_service import (
+            AttendanceService,  # 循環インポートを避ける
+        )
+
+        upsert_insert = AttendanceService.UPSERT_INSERTS.get(dialect_name)
+        if upsert_insert is None:
+            return None
+
+        statement = upsert_insert(MonthlyAttendanceRollup).values(
+            user_id=user_id, year=record_date.year, month=record_date.month, **delta
+        )
+        update_values = {
+            name: getattr(MonthlyAttendanceRollup, name) + statement.excluded[name]
+            for name in RollupService.FIELDS
+        }
+        update_values["updated_at"] = func.now()
+        return statement.on_conflict_do_update(
+            index_elements=[
+                MonthlyAttendanceRollup.user_id,
+                MonthlyAttendanceRollup.year,
+                MonthlyAttendanceRollup.month,
+            ],
+            set_=update_values,
+        )
+
+    @staticmethod
+    def add_delta(rollup: MonthlyAttendanceRollup, delta: Dict[str, float]) -> None:
+        """取得済みの集計行に差分を加算（ON CONFLICT 非対応のデータベース用）"""
+        for name in RollupService.FIELDS:
+            setattr(rollup, name, (getattr(rollup, name) or 0) + delta[name])
+
+    @staticmethod
+    def apply_delta(db: Session, before: Dict[str, float], record: AttendanceRecord) -> None:
+        """
+        勤怠記録の変更差分を月次集計に反映（コミットは呼び出し側で行う）
+
+        Args:
+            db: データベースセッション
+            before: 変更前の寄与（contribution の戻り値）
+            record: 変更後の勤怠記録
+        """
+        delta = RollupService.build_delta(before, record)
+        if delta is None:
+            return
+
+        statement = RollupService.build_delta_upsert(
+            db.get_bind().dialect.name, record.user_id, record.date, delta
+        )
+        if statement is not None:
+            db.execute(statement)
+            return
+
+        key = (record.user_id, record.date.year, record.date.month)
+        rollup = db.get(MonthlyAttendanceRollup, key)
+        if rollup is None:
+            rollup = MonthlyAttendanceRollup(
+                user_id=key[0], year=key[1], month=key[2], **dict.fromkeys(RollupService.FIELDS, 0)
+            )
+            db.add(rollup)
+        RollupService.add_delta(rollup, delta)
+
+    @staticmethod
+    def build_totals_query(user_id: int, year: int, month: int) -> Select:
+        """月次集計を主キーで1行取得するクエリを作成（列名は月次サマリーに合わせる）"""
+        return select(
+            MonthlyAttendanceRollup.work_days.label("total_work_days"),
+            MonthlyAttendanceRollup.total_hours.label("total_work_hours"),
+            MonthlyAttendanceRollup.overtime_hours.label("total_overtime_hours"),
+            MonthlyAttendanceRollup.late_count,
+            MonthlyAttendanceRollup.early_leave_count,
+        ).where(
+            MonthlyAttendanceRollup.user_id == user_id,
+            MonthlyAttendanceRollup.year == year,
+            MonthlyAttendanceRollup.month == month,
+        )
+
+    @staticmethod
+    def build_rebuild_query() -> Select:
+        """勤怠記録から月次集計をユーザー・年・月ごとに集計するクエリを作成"""
+        year = extract("year", AttendanceRecord.date)
+        month = extract("month", AttendanceRecord.date)
+        return select(
+            AttendanceRecord.user_id,
+            year.label("year"),
+            month.label("month"),
+            func.count().label("work_days"),
+            func.coalesce(func.sum(AttendanceRecord.total_hours), 0.0).label("total_hours"),
+            func.coalesce(func.sum(AttendanceRecord.overtime_hours), 0.0).label("overtime_hours"),
+            func.sum(case((AttendanceRecord.status.in_(RollupService.LATE_STATUSES), 1), else_=0))
+            .label("late_count"),
+            func.sum(case((AttendanceRecord.status.in_(RollupService.EARLY_LEAVE_STATUSES), 1), else_=0))
+            .label("early_leave_count"),
+        ).where(
+            AttendanceRecord.clock_in.is_not(None)
+        ).group_by(AttendanceRecord.user_id, year, month)
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """
+        月次集計を勤怠記録から作り直す
+
+        Args:
+            db: データベースセッション
+
+        Returns:
+            作成した集計行の件数
+        """
+        db.execute(delete(MonthlyAttendanceRollup))
+        db.execute(
+            insert(MonthlyAttendanceRollup).from_select(
+                ["user_id", "year", "month", *RollupService.FIELDS],
+                RollupService.build_rebuild_query(),
+            )
+        )
+        db.commit()
+        return db.scalar(select(func.count()).select_from(MonthlyAttendanceRollup))
@@ -0,0 +1,24 @@
+"""同期サービスをスレッドプールで実行するアダプター"""
+from typing import Any, Awaitable, Callable
+
+from starlette.concurrency import run_in_threadpool
+
+
+class ThreadedService:
+    """
+    同期サービスクラスの静的メソッドを await 可能にするアダプター
+
+    同期Sessionを使うサービスをイベントループ上で直接呼ぶとI/Oの間ループが止まるため、
+    各メソッドをスレッドプールで実行する。非同期サービスと同じ呼び出し方で利用できる。
+    """
+
+    def __init__(self, service: type) -> None:
+        self._service = service
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[Any]]:
+        method = getattr(self._service, name)
+
+        async def run(*args: Any, **kwargs: Any) -> Any:
+            return await run_in_threadpool(method, *args, **kwargs)
+
+        return run
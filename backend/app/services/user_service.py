@@ -0,0 +1,57 @@
+"""ユーザー管理サービス"""
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.schemas.user import UserProfileUpdate
+
+
+class UserService:
+    """ユーザー管理サービスクラス"""
+
+    @staticmethod
+    def get_user(db: Session, user_id: int) -> Optional[User]:
+        """ユーザーを取得"""
+        return db.query(User).filter(User.id == user_id).first()
+
+    @staticmethod
+    def build_users_query(limit: int, after_id: Optional[int] = None, skip: int = 0) -> Select:
+        """
+        ユーザー一覧をID順に取得するクエリを作成
+
+        after_id（前ページ最後のID）以降をキーセットで取得する。
+        skip は互換性のために残しているOFFSET指定で、after_id と併用しない。
+        """
+        statement = select(User).order_by(User.id).limit(limit)
+        if after_id is not None:
+            return statement.where(User.id > after_id)
+        return statement.offset(skip)
+
+    @staticmethod
+    def get_users(db: Session, limit: int, after_id: Optional[int] = None, skip: int = 0) -> Tuple[List[User], bool]:
+        """ユーザー一覧の1ページ分と次ページの有無を取得"""
+        users = list(db.scalars(UserService.build_users_query(limit + 1, after_id, skip)).all())
+        return users[:limit], len(users) > limit
+
+    @staticmethod
+    def update_profile(db: Session, user: User, profile_data: UserProfileUpdate) -> User:
+        """ユーザープロフィールを更新"""
+        for field, value in profile_data.dict(exclude_unset=True).items():
+            setattr(user, field, value)
+
+        db.commit()
+        db.refresh(user)
+        return user
+
+    @staticmethod
+    def set_active(db: Session, user_id: int, is_active: bool) -> Optional[User]:
+        """ユーザーの有効／無効を切り替え"""
+        user = UserService.get_user(db, user_id)
+        if user is None:
+            return None
+
+        user.is_active = is_active
+        db.commit()
+        return user
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""出勤打刻のベンチマーク（取得→作成 と INSERT ... ON CONFLICT の比較）
+
+数年分の勤怠履歴を持つ一時SQLiteデータベースを作成し、
+(user_id, date) インデックスなしの取得→作成経路と、
+一意インデックス＋アップサート経路の打刻時間を比較する。
+
+    python benchmarks/bench_clock_in.py --users 1000 --years 3
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# アプリのエンジンを一時データベースに向ける（app のインポートより前に設定する）
+_db_dir = tempfile.mkdtemp(prefix="timecard-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+from app.database.database import Base, SessionLocal, engine  # noqa: E402
+from app.models.attendance import AttendanceRecord, AttendanceStatus, BreakStatus  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.schemas.attendance import ClockInRequest  # noqa: E402
+from app.services.attendance_service import AttendanceService  # noqa: E402
+from app.services.rollup_service import RollupService  # noqa: E402
+
+# bcryptのコストを避けるための固定ハッシュ（ログインはしない）
+DUMMY_PASSWORD_HASH = "$2b$12$" + "x" * 53
+BATCH_SIZE = 10000
+
+
+def seed(users: int, years: int) -> None:
+    """ユーザーと過去の勤怠履歴を一括投入"""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(User), [
+            {
+                "email": f"bench{i}@example.com",
+                "hashed_password": DUMMY_PASSWORD_HASH,
+                "first_name": "太郎",
+                "last_name": f"社員{i}",
+                "role": UserRole.EMPLOYEE,
+                "department": f"部署{i % 20}",
+                "employee_id": f"B{i:06d}",
+                "is_active": True,
+            }
+            for i in range(users)
+        ])
+
+    today = date.today()
+    days = [today - timedelta(days=offset) for offset in range(1, years * 365 + 1)]
+    rows = []
+    with engine.begin() as connection:
+        for day in days:
+            if day.weekday() >= 5:
+                continue
+            clock_in = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc) + timedelta(hours=9)
+            for user_id in range(1, users + 1):
+                rows.append({
+                    "user_id": user_id,
+                    "date": day,
+                    "clock_in": clock_in,
+                    "clock_out": clock_in + timedelta(hours=9),
+                    "break_minutes": 60,
+                    "total_hours": 8.0,
+                    "overtime_hours": 0.0,
+                    "status": AttendanceStatus.PRESENT,
+                    "break_status": BreakStatus.WORKING,
+                })
+                if len(rows) >= BATCH_SIZE:
+                    connection.execute(insert(AttendanceRecord), rows)
+                    rows.clear()
+        if rows:
+            connection.execute(insert(AttendanceRecord), rows)
+
+
+def clock_in_select_then_insert(db, user: User, request: ClockInRequest) -> AttendanceRecord:
+    """変更前の出勤処理（今日の記録を取得し、なければ作成してコミットしてから出勤を書き込む）"""
+    record = AttendanceService.get_today_record(db, user.id)
+    if not record:
+        record = AttendanceRecord(
+            user_id=user.id,
+            date=date.today(),
+            break_minutes=request.break_minutes,
+            status=AttendanceStatus.PRESENT
+        )
+        db.add(record)
+        db.commit()
+        db.refresh(record)
+    else:
+        record.break_minutes = request.break_minutes
+
+    # 変更後の経路と同じく月次集計の更新と変更通知を含める
+    before = RollupService.contribution(record)
+    AttendanceService.apply_clock_in(record, request, datetime.now(timezone.utc))
+    RollupService.apply_delta(db, before, record)
+
+    db.commit()
+    db.refresh(record)
+    AttendanceService.notify_change(AttendanceService.EVENT_CLOCK_IN, user, record)
+    return record
+
+
+def run_punches(users: int, punches: int, clock_in) -> list[float]:
+    """各ユーザーで出勤打刻を行い、1件ごとの所要時間（秒）を返す"""
+    with engine.begin() as connection:
+        connection.execute(delete(AttendanceRecord).where(AttendanceRecord.date == date.today()))
+
+    request = ClockInRequest(break_minutes=60)
+    timings = []
+    db = SessionLocal()
+    try:
+        for user in db.query(User).limit(min(users, punches)).all():
+            started = time.perf_counter()
+            clock_in(db, user, request)
+            timings.append(time.perf_counter() - started)
+    finally:
+        db.close()
+    return timings
+
+
+def report(label: str, timings: list[float]) -> None:
+    """所要時間の統計を表示"""
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1] if ordered else 0.0
+    print(
+        f"{label:<32} n={len(timings):>6}  "
+        f"mean={statistics.mean(timings) * 1000:8.3f}ms  "
+        f"p95={p95 * 1000:8.3f}ms  "
+        f"throughput={len(timings) / sum(timings):8.1f}/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="出勤打刻のベンチマーク")
+    parser.add_argument("--users", type=int, default=500, help="ユーザー数")
+    parser.add_argument("--years", type=int, default=3, help="履歴の年数")
+    parser.add_argument("--punches", type=int, default=500, help="計測する打刻数")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    seed(args.users, args.years)
+    record_count = SessionLocal().query(AttendanceRecord).count()
+    print(f"履歴データ作成: {record_count}件 ({time.perf_counter() - started:.1f}s) {os.environ['DATABASE_URL']}")
+
+    unique_index = next(
+        index for index in AttendanceRecord.__table__.indexes
+        if index.name == "uq_attendance_records_user_id_date"
+    )
+
+    # 変更前: (user_id, date) インデックスなし + 取得→作成
+    unique_index.drop(bind=engine)
+    legacy = run_punches(args.users, args.punches, clock_in_select_then_insert)
+    report("select-then-insert (no index)", legacy)
+
+    # 変更後: 一意インデックス + INSERT ... ON CONFLICT
+    unique_index.create(bind=engine)
+    upsert = run_punches(args.users, args.punches, AttendanceService.clock_in)
+    report("upsert (unique user_id,date)", upsert)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""勤怠記録エクスポートのベンチマーク（スループットとメモリ使用量）
+
+指定件数の勤怠記録（休憩記録つき）を持つ一時SQLiteデータベースを作成し、
+CSV / JSON Lines のストリーミング出力の件数/秒と、出力中の最大RSSの増加量を計測する。
+
+    python benchmarks/bench_export.py --rows 3000000
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# アプリのエンジンを一時データベースに向ける（app のインポートより前に設定する）
+_db_dir = tempfile.mkdtemp(prefix="timecard-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.database.database import Base, engine  # noqa: E402
+from app.models.attendance import (  # noqa: E402
+    AttendanceRecord,
+    AttendanceStatus,
+    BreakRecord,
+    BreakStatus,
+)
+from app.models.user import User, UserRole  # noqa: E402
+from app.services.export_service import ExportService  # noqa: E402
+
+# bcryptのコストを避けるための固定ハッシュ（ログインはしない）
+DUMMY_PASSWORD_HASH = "$2b$12$" + "x" * 53
+BATCH_SIZE = 10000
+USERS = 1000
+
+
+def seed(rows: int) -> tuple[date, date]:
+    """ユーザーと勤怠記録・休憩記録を一括投入し、記録の期間を返す"""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(User), [
+            {
+                "email": f"bench{i}@example.com",
+                "hashed_password": DUMMY_PASSWORD_HASH,
+                "first_name": "太郎",
+                "last_name": f"社員{i}",
+                "role": UserRole.EMPLOYEE,
+                "department": f"部署{i % 20}",
+                "employee_id": f"B{i:06d}",
+                "is_active": True,
+            }
+            for i in range(USERS)
+        ])
+
+    days = -(-rows // USERS)
+    end_date = date.today() - timedelta(days=1)
+    start_date = end_date - timedelta(days=days - 1)
+    records, breaks = [], []
+    record_id = 0
+    with engine.begin() as connection:
+        for offset in range(days):
+            day = start_date + timedelta(days=offset)
+            clock_in = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc) + timedelta(hours=9)
+            for user_id in range(1, USERS + 1):
+                record_id += 1
+                if record_id > rows:
+                    break
+                records.append({
+                    "id": record_id,
+                    "user_id": user_id,
+                    "date": day,
+                    "clock_in": clock_in,
+                    "clock_out": clock_in + timedelta(hours=9),
+                    "break_minutes": 60,
+                    "total_hours": 8.0,
+                    "overtime_hours": 0.0,
+                    "status": AttendanceStatus.PRESENT,
+                    "break_status": BreakStatus.WORKING,
+                })
+                breaks.append({
+                    "attendance_record_id": record_id,
+                    "break_start": clock_in + timedelta(hours=3),
+                    "break_end": clock_in + timedelta(hours=4),
+                    "duration_minutes": 60,
+                })
+                if len(records) >= BATCH_SIZE:
+                    connection.execute(insert(AttendanceRecord), records)
+                    connection.execute(insert(BreakRecord), breaks)
+                    records.clear()
+                    breaks.clear()
+        if records:
+            connection.execute(insert(AttendanceRecord), records)
+            connection.execute(insert(BreakRecord), breaks)
+    return start_date, end_date
+
+
+def max_rss_mb() -> float:
+    """これまでの最大RSS（MB、Linuxの単位に基づく）"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_export(start_date: date, end_date: date, export_format: str, chunk_size: int, rows: int) -> None:
+    """エクスポートを /dev/null に書き出し、スループットとRSSの増加量を表示"""
+    rss_before = max_rss_mb()
+    size = 0
+    started = time.perf_counter()
+    with open(os.devnull, "wb") as output:
+        for chunk in ExportService.iter_export(start_date, end_date, None, export_format, chunk_size):
+            output.write(chunk)
+            size += len(chunk)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{export_format:<6} rows={rows:>9}  bytes={size:>12,}  "
+        f"elapsed={elapsed:7.1f}s  throughput={rows / elapsed:10.0f} rows/s  "
+        f"max_rss_growth={max_rss_mb() - rss_before:6.1f}MB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="勤怠記録エクスポートのベンチマーク")
+    parser.add_argument("--rows", type=int, default=1000000, help="勤怠記録の件数")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="1回に取得する件数")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    start_date, end_date = seed(args.rows)
+    print(f"データ作成: {args.rows}件 ({time.perf_counter() - started:.1f}s) {os.environ['DATABASE_URL']}")
+
+    for export_format in ExportService.FORMATS:
+        run_export(start_date, end_date, export_format, args.chunk_size, args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""打刻集中時のベンチマーク（打刻ごとのコミット と グループコミットの比較）
+
+一時SQLiteデータベースに指定人数のユーザーを作成し、全員が同時に出勤→退勤する集中を
+アプリ（ASGI）に対して発生させ、打刻ごとにコミットする経路と punch_group_commit を
+有効にした経路の打刻数/秒・レイテンシ・バッチサイズを比較する。
+
+    python benchmarks/bench_group_commit.py --users 500
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# アプリのエンジンを一時データベースに向ける（app のインポートより前に設定する）
+_db_dir = tempfile.mkdtemp(prefix="timecard-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+import httpx  # noqa: E402
+from sqlalchemy import delete, insert, select  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.database.database import Base, SessionLocal, engine  # noqa: E402
+from app.dependencies.database import punch_queue  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.attendance import AttendanceRecord, MonthlyAttendanceRollup  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+
+# bcryptのコストを避けるための固定ハッシュ（ログインはしない）
+DUMMY_PASSWORD_HASH = "$2b$12$" + "x" * 53
+
+
+def seed(users: int) -> List[Dict[str, str]]:
+    """ユーザーを一括投入し、各ユーザーの認証ヘッダーを返す"""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(User), [
+            {
+                "email": f"bench{i}@example.com",
+                "hashed_password": DUMMY_PASSWORD_HASH,
+                "first_name": "太郎",
+                "last_name": f"社員{i}",
+                "role": UserRole.EMPLOYEE,
+                "department": f"部署{i % 20}",
+                "employee_id": f"B{i:06d}",
+                "is_active": True,
+            }
+            for i in range(users)
+        ])
+    with SessionLocal() as db:
+        rows = db.execute(select(User.id, User.email, User.role)).all()
+    return [
+        {"Authorization": "Bearer " + create_access_token(
+            data={"sub": email, "user_id": user_id, "role": role.value}
+        )}
+        for user_id, email, role in rows
+    ]
+
+
+def reset() -> None:
+    """勤怠記録と月次集計を削除"""
+    with engine.begin() as connection:
+        connection.execute(delete(MonthlyAttendanceRollup))
+        connection.execute(delete(AttendanceRecord))
+
+
+async def burst(client: httpx.AsyncClient, path: str, body: dict, headers: List[Dict[str, str]]) -> None:
+    """全員が同時に打刻し、打刻数/秒とレイテンシを表示"""
+    latencies: List[float] = []
+
+    async def punch(header: Dict[str, str]) -> None:
+        started = time.perf_counter()
+        response = await client.post(path, json=body, headers=header)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(punch(header) for header in headers))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    print(
+        f"  {path:<22} {len(headers) / elapsed:8.0f} punches/s  "
+        f"p50={statistics.median(latencies) * 1000:7.1f}ms  "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:7.1f}ms"
+    )
+
+
+async def run(headers: List[Dict[str, str]], group_commit: bool) -> None:
+    """出勤→退勤の集中を1回発生させる"""
+    settings.punch_group_commit = group_commit
+    reset()
+    print(f"group_commit={group_commit}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        # 認証済みユーザーのキャッシュを温めておき、打刻の書き込みのみを比較する
+        await asyncio.gather(*(client.get("/users/me", headers=header) for header in headers))
+        await burst(client, "/attendance/clock-in", {"break_minutes": 60}, headers)
+        await burst(client, "/attendance/clock-out", {"clock_out": "2099-01-01T18:00:00Z"}, headers)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="打刻集中時のベンチマーク")
+    parser.add_argument("--users", type=int, default=500, help="同時に打刻するユーザー数")
+    args = parser.parse_args()
+
+    headers = seed(args.users)
+    await run(headers, group_commit=False)
+    await run(headers, group_commit=True)
+    stats = punch_queue.stats()
+    print(
+        f"  batches={stats['batches']}  average_batch_size={stats['average_batch_size']}  "
+        f"max_batch_size={stats['max_batch_size']}  average_wait_ms={stats['average_wait_ms']}"
+    )
+    await punch_queue.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""一覧系レスポンスのシリアライズのベンチマーク（1行あたりの所要時間）
+
+勤怠履歴（休憩記録つき／なし）とユーザー一覧について、
+FastAPI の response_model と同じ経路（検証 → JSON互換の辞書 → json.dumps）と、
+FastSerializer（属性を直接読み出して pydantic_core.to_json）を比較する。
+
+    python benchmarks/bench_serialization.py --rows 1000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# アプリのエンジンを一時データベースに向ける（app のインポートより前に設定する）
+_db_dir = tempfile.mkdtemp(prefix="timecard-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.core.serialization import FastSerializer  # noqa: E402
+from app.database.database import Base, SessionLocal, engine  # noqa: E402
+from app.models.attendance import (  # noqa: E402
+    AttendanceRecord,
+    AttendanceStatus,
+    BreakRecord,
+    BreakStatus,
+)
+from app.models.user import User, UserRole  # noqa: E402
+from app.schemas.attendance import (  # noqa: E402
+    AttendanceRecordBriefResponse,
+    AttendanceRecordResponse,
+)
+from app.schemas.auth import UserResponse  # noqa: E402
+from app.services.attendance_service import AttendanceService  # noqa: E402
+
+# bcryptのコストを避けるための固定ハッシュ（ログインはしない）
+DUMMY_PASSWORD_HASH = "$2b$12$" + "x" * 53
+
+
+def seed(rows: int) -> None:
+    """ユーザーと1ユーザー分の勤怠記録（休憩2件つき）を一括投入"""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(User), [
+            {
+                "email": f"bench{i}@example.com",
+                "hashed_password": DUMMY_PASSWORD_HASH,
+                "first_name": "太郎",
+                "last_name": f"社員{i}",
+                "role": UserRole.EMPLOYEE,
+                "department": f"部署{i % 20}",
+                "employee_id": f"B{i:06d}",
+                "is_active": True,
+            }
+            for i in range(rows)
+        ])
+        for offset in range(rows):
+            day = date.today() - timedelta(days=offset + 1)
+            clock_in = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc) + timedelta(hours=9)
+            record_id = connection.execute(insert(AttendanceRecord).values(
+                user_id=1,
+                date=day,
+                clock_in=clock_in,
+                clock_out=clock_in + timedelta(hours=9),
+                break_minutes=60,
+                total_hours=8.0,
+                overtime_hours=0.0,
+                status=AttendanceStatus.PRESENT,
+                break_status=BreakStatus.WORKING,
+            )).inserted_primary_key[0]
+            connection.execute(insert(BreakRecord), [
+                {
+                    "attendance_record_id": record_id,
+                    "break_start": clock_in + timedelta(hours=hours),
+                    "break_end": clock_in + timedelta(hours=hours, minutes=30),
+                    "duration_minutes": 30,
+                }
+                for hours in (3, 6)
+            ])
+
+
+def response_model_path(model: Any) -> Callable[[List[Any]], bytes]:
+    """FastAPI の response_model と同じ経路（検証 → JSON互換の辞書 → json.dumps）"""
+    adapter = TypeAdapter(List[model])
+
+    def serialize(objs: List[Any]) -> bytes:
+        validated = adapter.validate_python(objs, from_attributes=True)
+        content = adapter.dump_python(validated, mode="json")
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    return serialize
+
+
+def measure(label: str, serialize: Callable[[List[Any]], bytes], objs: List[Any], repeat: int) -> float:
+    """1行あたりの所要時間（マイクロ秒）を計測して表示"""
+    serialize(objs)  # ウォームアップ
+    started = time.perf_counter()
+    for _ in range(repeat):
+        serialize(objs)
+    per_row = (time.perf_counter() - started) / (repeat * len(objs)) * 1_000_000
+    print(f"{label:<50} {per_row:8.2f} us/row")
+    return per_row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="一覧系レスポンスのシリアライズのベンチマーク")
+    parser.add_argument("--rows", type=int, default=1000, help="1レスポンスの行数")
+    parser.add_argument("--repeat", type=int, default=20, help="計測の繰り返し回数")
+    args = parser.parse_args()
+
+    seed(args.rows)
+    db = SessionLocal()
+    try:
+        records, _ = AttendanceService.get_history_page(db, 1, args.rows)
+        brief_records, _ = AttendanceService.get_history_page(db, 1, args.rows, include_breaks=False)
+        users = list(db.scalars(select(User).order_by(User.id)).all())
+
+        cases = [
+            ("history (with breaks)", AttendanceRecordResponse, records),
+            ("history (include_breaks=false)", AttendanceRecordBriefResponse, brief_records),
+            ("users", UserResponse, users),
+        ]
+        for label, model, objs in cases:
+            # 両方の経路が同じJSONを出力することを確認する
+            assert response_model_path(model)(objs) == FastSerializer(model).dumps(objs)
+            before = measure(f"{label} / response_model", response_model_path(model), objs, args.repeat)
+            after = measure(f"{label} / FastSerializer", FastSerializer(model).dumps, objs, args.repeat)
+            print(f"{'':<50} x{before / after:.1f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
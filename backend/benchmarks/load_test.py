@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""始業・終業の打刻集中の負荷試験
+
+指定人数のユーザーが ramp 秒の間にランダムな時刻で到着し、それぞれ
+ログイン → 出勤 → 休憩開始 → 休憩終了 → 退勤 → 勤怠履歴 → 月次サマリー
+の順にAPIを呼び出す。エンドポイントごとのスループットとレイテンシ（p50/p95/p99）を表示し、
+コミットごとに比較できるようJSONに保存する。
+
+    # アプリをプロセス内（ASGI）で実行する（一時SQLiteデータベースを作成）
+    python benchmarks/load_test.py --users 2000 --ramp 60
+
+    # 起動中のサーバーに対して実行する（DATABASE_URL はサーバーと同じデータベースを指定する）
+    DATABASE_URL=sqlite:///./timecard_clone.db python benchmarks/load_test.py --url http://localhost:8000 --users 2000
+
+サーバーに対して実行する場合、ユーザーは load{i}@example.com として作成され、
+負荷試験のユーザーの勤怠記録は実行前に削除される。
+サーバー側はログイン制限（許可ユーザー）を無効にして起動する（ENABLE_LOGIN_RESTRICTION=false）。
+ログインのレート制限は有効のまま、全ユーザーが同じクライアントIPからログインする
+（NATの背後にある事務所の始業時と同じ状況）。
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="始業・終業の打刻集中の負荷試験")
+    parser.add_argument("--users", type=int, default=1000, help="ユーザー数")
+    parser.add_argument("--ramp", type=float, default=60.0, help="全員が到着するまでの秒数")
+    parser.add_argument("--concurrency", type=int, default=200, help="同時に送るリクエスト数の上限")
+    parser.add_argument("--think", type=float, default=0.0, help="ユーザーごとの操作の間隔（秒）")
+    parser.add_argument("--url", help="起動中のサーバーのURL（未指定時はプロセス内で実行）")
+    parser.add_argument("--seed", type=int, default=0, help="到着時刻の乱数のシード")
+    parser.add_argument("--output", help="結果のJSONの保存先（未指定時は benchmarks/results/ 以下）")
+    parser.add_argument("--compare", help="比較する過去の結果のJSON")
+    return parser
+
+
+ARGS = build_parser().parse_args()
+
+if not ARGS.url:
+    # アプリのエンジンを一時データベースに向ける（app のインポートより前に設定する）
+    _db_dir = tempfile.mkdtemp(prefix="timecard-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+import httpx  # noqa: E402
+from sqlalchemy import delete, insert, select  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+from app.database.database import Base, engine  # noqa: E402
+from app.models.attendance import AttendanceRecord, BreakRecord, MonthlyAttendanceRollup  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+
+LOAD_PASSWORD = "loadtest123"
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# シナリオの順序（結果の表示順）
+ENDPOINTS = ("login", "clock_in", "break_start", "break_end", "clock_out", "history", "monthly_summary")
+
+
+def seed(users: int) -> None:
+    """負荷試験のユーザーを作成し、既存の勤怠記録を削除"""
+    Base.metadata.create_all(bind=engine)
+    # 全員同じパスワードのため、ハッシュは1回だけ計算する（ログイン時の検証は実際のコストで行う）
+    hashed_password = get_password_hash(LOAD_PASSWORD)
+    with engine.begin() as connection:
+        existing = set(connection.execute(
+            select(User.email).where(User.email.like("load%@example.com"))
+        ).scalars())
+        rows = [
+            {
+                "email": f"load{i}@example.com",
+                "hashed_password": hashed_password,
+                "first_name": "負荷",
+                "last_name": f"試験{i}",
+                "role": UserRole.EMPLOYEE,
+                "department": f"部署{i % 20}",
+                "employee_id": f"L{i:07d}",
+                "is_active": True,
+            }
+            for i in range(users)
+            if f"load{i}@example.com" not in existing
+        ]
+        if rows:
+            connection.execute(insert(User), rows)
+
+        user_ids = select(User.id).where(User.email.like("load%@example.com")).scalar_subquery()
+        record_ids = select(AttendanceRecord.id).where(AttendanceRecord.user_id.in_(user_ids)).scalar_subquery()
+        connection.execute(delete(BreakRecord).where(BreakRecord.attendance_record_id.in_(record_ids)))
+        connection.execute(delete(AttendanceRecord).where(AttendanceRecord.user_id.in_(user_ids)))
+        connection.execute(delete(MonthlyAttendanceRollup).where(MonthlyAttendanceRollup.user_id.in_(user_ids)))
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """ソート済みの値のパーセンタイル（最近傍順位法）"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class Recorder:
+    """エンドポイントごとのレイテンシとステータスコードの記録"""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = {endpoint: [] for endpoint in ENDPOINTS}
+        self.statuses: Dict[str, Counter] = {endpoint: Counter() for endpoint in ENDPOINTS}
+
+    def record(self, endpoint: str, status: Any, seconds: float) -> None:
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][str(status)] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Dict[str, Any]]:
+        """エンドポイントごとの件数・スループット・レイテンシ（ミリ秒）"""
+        result = {}
+        for endpoint in ENDPOINTS:
+            latencies = sorted(self.latencies[endpoint])
+            statuses = self.statuses[endpoint]
+            errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+            result[endpoint] = {
+                "requests": len(latencies),
+                "errors": errors,
+                "statuses": dict(statuses),
+                "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+                "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+                "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+                "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+                "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+                "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            }
+        return result
+
+
+async def run_user(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    semaphore: asyncio.Semaphore,
+    index: int,
+    delay: float,
+    think: float,
+) -> None:
+    """1人分のシナリオを実行（ログインに失敗した場合は以降を実行しない）"""
+    await asyncio.sleep(delay)
+
+    async def call(endpoint: str, method: str, path: str, **kwargs: Any) -> Optional[httpx.Response]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+            except httpx.HTTPError as e:
+                recorder.record(endpoint, type(e).__name__, time.perf_counter() - started)
+                return None
+            recorder.record(endpoint, response.status_code, time.perf_counter() - started)
+        if think:
+            await asyncio.sleep(think)
+        return response
+
+    response = await call(
+        "login", "POST", "/auth/login",
+        json={"email": f"load{index}@example.com", "password": LOAD_PASSWORD},
+    )
+    if response is None or response.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    today = datetime.now(timezone.utc)
+    await call("clock_in", "POST", "/attendance/clock-in", json={"break_minutes": 60}, headers=headers)
+    await call("break_start", "POST", "/attendance/break/start", json={}, headers=headers)
+    await call("break_end", "POST", "/attendance/break/end", json={}, headers=headers)
+    await call(
+        "clock_out", "POST", "/attendance/clock-out",
+        json={"clock_out": datetime.now(timezone.utc).isoformat()}, headers=headers,
+    )
+    await call("history", "GET", "/attendance/history", headers=headers)
+    await call(
+        "monthly_summary", "GET", "/attendance/summary/monthly",
+        params={"year": today.year, "month": today.month}, headers=headers,
+    )
+
+
+async def run(client: httpx.AsyncClient) -> Dict[str, Any]:
+    """全員のシナリオを実行し、結果を集計"""
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(ARGS.concurrency)
+    rng = random.Random(ARGS.seed)
+    delays = [rng.uniform(0, ARGS.ramp) for _ in range(ARGS.users)]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run_user(client, recorder, semaphore, index, delay, ARGS.think)
+        for index, delay in enumerate(delays)
+    ))
+    elapsed = time.perf_counter() - started
+
+    endpoints = recorder.summary(elapsed)
+    total_requests = sum(stats["requests"] for stats in endpoints.values())
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "total_requests": total_requests,
+        "throughput_rps": round(total_requests / elapsed, 2),
+        "endpoints": endpoints,
+    }
+
+
+async def run_in_process() -> Dict[str, Any]:
+    """アプリをプロセス内（ASGI）で実行"""
+    from app.main import app
+
+    # 許可ユーザー以外のログインを受け付ける（レート制限は有効のまま、全ユーザーが同じクライアントIPになる）
+    settings.enable_login_restriction = False
+    async with app.router.lifespan_context(app):
+        # アプリの例外はクライアントに送出せず500として記録する
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            return await run(client)
+
+
+async def run_against_server(url: str) -> Dict[str, Any]:
+    """起動中のサーバーに対して実行"""
+    limits = httpx.Limits(max_connections=ARGS.concurrency, max_keepalive_connections=ARGS.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+        return await run(client)
+
+
+def git_commit() -> str:
+    """現在のコミット（取得できない場合は unknown）"""
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return completed.stdout.strip()
+
+
+def print_results(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    """エンドポイントごとの結果（比較対象がある場合はp95とスループットの差）を表示"""
+    print(
+        f"{results['total_requests']} requests in {results['elapsed_seconds']:.1f}s "
+        f"({results['throughput_rps']:.0f} req/s)"
+    )
+    print(f"  {'endpoint':<16}{'req/s':>9}{'p50':>12}{'p95':>12}{'p99':>12}{'errors':>8}")
+    for endpoint, stats in results["endpoints"].items():
+        line = (
+            f"  {endpoint:<16}{stats['throughput_rps']:>9.1f}{stats['p50_ms']:>10.1f}ms"
+            f"{stats['p95_ms']:>10.1f}ms{stats['p99_ms']:>10.1f}ms{stats['errors']:>8}"
+        )
+        previous = (baseline or {}).get("endpoints", {}).get(endpoint)
+        if previous and previous["p95_ms"]:
+            line += f"   p95 {(stats['p95_ms'] / previous['p95_ms'] - 1) * 100:+.1f}%"
+        print(line)
+
+
+async def main() -> None:
+    mode = "server" if ARGS.url else "asgi"
+    seed(ARGS.users)
+    print(
+        f"mode={mode} users={ARGS.users} ramp={ARGS.ramp}s concurrency={ARGS.concurrency} "
+        f"use_async_db={settings.use_async_db} punch_group_commit={settings.punch_group_commit}"
+    )
+    if ARGS.url:
+        results = await run_against_server(ARGS.url)
+    else:
+        results = await run_in_process()
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "mode": mode,
+        "parameters": {
+            "users": ARGS.users,
+            "ramp": ARGS.ramp,
+            "concurrency": ARGS.concurrency,
+            "think": ARGS.think,
+            "seed": ARGS.seed,
+            "use_async_db": settings.use_async_db,
+            "punch_group_commit": settings.punch_group_commit,
+        },
+        **results,
+    }
+
+    baseline = None
+    if ARGS.compare:
+        with open(ARGS.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"compared with {baseline.get('commit', 'unknown')} ({ARGS.compare})")
+    print_results(results, baseline)
+
+    output = ARGS.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"load_test-{commit}-{mode}-{timestamp}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"saved: {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""勤怠記録のエクスポートスクリプト（給与計算用）
+
+    python export_attendance.py --start 2024-04-01 --end 2024-04-30 --format csv --output april.csv
+    python export_attendance.py --start 2024-04-01 --end 2024-04-30 --users 1 2 3 --format jsonl
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import date
+
+from app.core.config import settings
+from app.services.export_service import ExportService
+
+
+def write_export(output, args) -> int:
+    """エクスポートしたチャンクを書き出し、書き出したバイト数を返す"""
+    size = 0
+    for chunk in ExportService.iter_export(args.start, args.end, args.users, args.format, args.chunk_size):
+        output.write(chunk)
+        size += len(chunk)
+    return size
+
+def export_attendance():
+    """指定期間の勤怠記録をファイルまたは標準出力へ書き出す"""
+    parser = argparse.ArgumentParser(description="勤怠記録をCSV/JSON Linesでエクスポート")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="開始日（YYYY-MM-DD）")
+    parser.add_argument("--end", type=date.fromisoformat, required=True, help="終了日（YYYY-MM-DD）")
+    parser.add_argument("--users", type=int, nargs="*", help="対象ユーザーID（未指定時は全ユーザー）")
+    parser.add_argument("--format", choices=ExportService.FORMATS, default="csv", help="出力形式")
+    parser.add_argument("--output", help="出力ファイル（未指定時は標準出力）")
+    parser.add_argument("--chunk-size", type=int, default=settings.export_chunk_size, help="1回に取得する件数")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.output:
+        with open(args.output, "wb") as output:
+            size = write_export(output, args)
+    else:
+        size = write_export(sys.stdout.buffer, args)
+
+    # 進捗は標準エラー出力に表示する（標準出力はデータ用）
+    print(f"✅ エクスポートしました: {size:,} bytes ({time.perf_counter() - started:.1f}s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    export_attendance()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""ベンチマーク用の合成データ生成スクリプト
+
+    python generate_dataset.py --users 100000 --years 2 --seed 42
+
+ユーザーは {prefix}{番号}@example.com（パスワードは全員共通）として作成し、
+部署に振り分けたうえで、過去の営業日の勤怠記録・休憩記録（遅刻・早退・残業・複数回の休憩を含む）を生成する。
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.security import get_password_hash
+from app.database.database import Base, SessionLocal, engine
+from app.models import attendance, user  # noqa: F401  テーブル定義を登録する
+from app.services.dataset_service import DatasetResult, DatasetService
+
+
+def print_progress(result: DatasetResult):
+    """バッチごとの進捗を表示"""
+    print(
+        f"⏳ {result.days:,}日目 / 勤怠記録 {result.records:,}件 / 休憩記録 {result.breaks:,}件 "
+        f"({result.rows_per_second:,.0f} rows/s)"
+    )
+
+def generate_dataset():
+    """ユーザーと勤怠履歴を一括生成"""
+    parser = argparse.ArgumentParser(description="ベンチマーク用の合成データを生成")
+    parser.add_argument("--users", type=int, default=1000, help="作成するユーザー数")
+    parser.add_argument("--years", type=int, default=1, help="生成する勤怠履歴の年数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数のシード（同じ値なら同じデータを生成）")
+    parser.add_argument("--email-prefix", default="emp", help="メールアドレスと社員番号の接頭辞")
+    parser.add_argument("--password", default="password123", help="全ユーザー共通のパスワード")
+    parser.add_argument("--batch-size", type=int, default=20000, help="1トランザクションで挿入する勤怠記録の件数")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    # パスワードのハッシュは1回だけ計算して全ユーザーで共有する
+    hashed_password = get_password_hash(args.password)
+
+    db = SessionLocal()
+    try:
+        print(f"🔄 {args.users:,}人 × {args.years}年分のデータを生成中...")
+        result = DatasetService.generate(
+            db,
+            users=args.users,
+            years=args.years,
+            hashed_password=hashed_password,
+            email_prefix=args.email_prefix,
+            seed=args.seed,
+            batch_size=args.batch_size,
+            on_progress=print_progress,
+        )
+    except Exception as e:
+        print(f"❌ エラーが発生しました: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print("=" * 50)
+    print(f"✅ 生成完了: {result.elapsed_seconds:.1f}s ({result.rows_per_second:,.0f} rows/s)")
+    print(f"  ユーザー: {result.users:,}人（{args.email_prefix}0@example.com 〜 / パスワード: {args.password}）")
+    print(f"  営業日: {result.days:,}日")
+    print(f"  勤怠記録: {result.records:,}件")
+    print(f"  休憩記録: {result.breaks:,}件")
+
+if __name__ == "__main__":
+    generate_dataset()
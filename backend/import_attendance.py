@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""過去の打刻データのインポートスクリプト（旧タイムレコーダーからの移行用）
+
+    python import_attendance.py punches_2022.csv punches_2023.csv --batch-size 5000
+
+CSVの列: employee_id,date,clock_in,clock_out,break_minutes,breaks,notes
+    EMP001,2024-04-01,09:00,18:30,,12:00-13:00;15:00-15:10,
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database.database import SessionLocal
+from app.services.import_service import ImportResult, ImportService
+
+MAX_ERRORS_SHOWN = 20
+
+def print_progress(result: ImportResult):
+    """バッチごとの進捗を表示"""
+    print(
+        f"⏳ {result.processed:,}行 処理 / {result.imported:,}件 作成 "
+        f"({result.rows_per_second:,.0f} rows/s)"
+    )
+
+def import_attendance():
+    """CSVファイルから勤怠記録と休憩記録を一括作成"""
+    parser = argparse.ArgumentParser(description="過去の打刻データをCSVからインポート")
+    parser.add_argument("files", nargs="+", help="インポートするCSVファイル")
+    parser.add_argument("--batch-size", type=int, default=5000, help="1トランザクションで挿入する行数")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = ImportService.import_rows(
+            db, ImportService.read_csv(args.files), args.batch_size, on_progress=print_progress
+        )
+    except Exception as e:
+        print(f"❌ エラーが発生しました: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+    for error in result.errors[:MAX_ERRORS_SHOWN]:
+        print(f"⚠️  {error}")
+    if len(result.errors) > MAX_ERRORS_SHOWN:
+        print(f"⚠️  ほか {len(result.errors) - MAX_ERRORS_SHOWN}件のエラー")
+
+    print("=" * 50)
+    print(f"✅ インポート完了: {result.elapsed_seconds:.1f}s ({result.rows_per_second:,.0f} rows/s)")
+    print(f"  処理行数: {result.processed:,}")
+    print(f"  勤怠記録: {result.imported:,}件")
+    print(f"  休憩記録: {result.breaks:,}件")
+    print(f"  重複によりスキップ: {result.skipped:,}件")
+    print(f"  エラー: {len(result.errors):,}件")
+
+if __name__ == "__main__":
+    import_attendance()
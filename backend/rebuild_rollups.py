@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""月次勤怠集計の再構築スクリプト"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database.database import Base, SessionLocal, engine
+from app.models import attendance, user  # noqa: F401  テーブル定義を登録する
+from app.services.rollup_service import RollupService
+
+
+def rebuild_rollups():
+    """勤怠記録から monthly_attendance_rollups を作り直す"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    
+    try:
+        print("🔄 月次集計を再構築中...")
+        count = RollupService.rebuild(db)
+        print(f"✅ 月次集計を再構築しました: {count}件")
+    except Exception as e:
+        print(f"❌ エラーが発生しました: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    rebuild_rollups()
@@ -1,15 +1,16 @@
 #!/usr/bin/env python3
 """ユーザーリセット・再作成スクリプト"""
 
-import sys
 import os
+import sys
+
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from sqlalchemy.orm import Session
+from app.core.security import get_password_hash
 from app.database.database import SessionLocal
+from app.models.attendance import AttendanceRecord, BreakRecord, MonthlyAttendanceRollup
 from app.models.user import User
-from app.models.attendance import AttendanceRecord, BreakRecord
-from app.core.security import get_password_hash
+
 
 def reset_and_create_users():
     """既存ユーザーを削除して新しく作成"""
@@ -37,6 +38,13 @@ def reset_and_create_users():
         for record in attendance_records:
             db.delete(record)
         
+        # 月次集計を削除
+        db.query(MonthlyAttendanceRollup).filter(
+            MonthlyAttendanceRollup.user_id.in_(
+                db.query(User.id).filter(User.email.in_(["admin@example.com", "user@example.com"]))
+            )
+        ).delete(synchronize_session=False)
+        
         # 既存のユーザーを削除
         existing_users = db.query(User).filter(
             User.email.in_(["admin@example.com", "user@example.com"])
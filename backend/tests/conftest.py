@@ -0,0 +1,114 @@
+"""テスト共通の設定とフィクスチャ（一時ディレクトリのSQLiteデータベースを使用）"""
+import os
+import tempfile
+from contextlib import AsyncExitStack
+
+# アプリケーションの設定を読み込む前にデータベースの場所を差し替える
+_TEST_DIR = tempfile.mkdtemp(prefix="timecard-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TEST_DIR, 'test.db')}"
+os.environ["TOKEN_BLACKLIST_PATH"] = os.path.join(_TEST_DIR, "token_blacklist.db")
+os.environ["LOGIN_RATE_LIMIT_PATH"] = os.path.join(_TEST_DIR, "rate_limit.db")
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+import pytest_asyncio  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.core.security import create_access_token, get_password_hash  # noqa: E402
+from app.database.database import Base, SessionLocal, engine  # noqa: E402
+from app.database.init_db import ensure_indexes  # noqa: E402
+from app.dependencies.auth import principal_cache  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.attendance import MonthlyAttendanceRollup  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services.rollup_service import RollupService  # noqa: E402
+
+# ユーザーごとのハッシュ計算を避けるため共通のハッシュを使う
+TEST_PASSWORD = "password123"
+TEST_PASSWORD_HASH = get_password_hash(TEST_PASSWORD)
+
+
+@pytest.fixture
+def db():
+    """テストごとにテーブルを作り直したセッション"""
+    Base.metadata.create_all(bind=engine)
+    ensure_indexes()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def make_user(db):
+    """テスト用のユーザーを作成する関数"""
+    def create(index: int = 0, role: UserRole = UserRole.EMPLOYEE) -> User:
+        user = User(
+            email=f"user{index}@example.com",
+            hashed_password=TEST_PASSWORD_HASH,
+            first_name="テスト",
+            last_name=f"ユーザー{index}",
+            role=role,
+            department="開発部",
+            employee_id=f"TEST{index:04d}",
+            is_active=True,
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+
+    return create
+
+
+@pytest.fixture
+def user(make_user):
+    """一般ユーザー"""
+    return make_user()
+
+
+@pytest_asyncio.fixture
+async def make_client():
+    """ユーザーとしてアプリにリクエストするクライアントを作成する関数"""
+    async with AsyncExitStack() as stack:
+        async def create(user: User) -> httpx.AsyncClient:
+            token = create_access_token({"sub": user.email, "user_id": user.id, "role": user.role.value})
+            return await stack.enter_async_context(httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app),
+                base_url="http://test",
+                headers={"Authorization": f"Bearer {token}"},
+            ))
+
+        yield create
+    # ユーザーIDはテストごとに再利用されるため、認証済みユーザーのキャッシュを残さない
+    principal_cache.clear()
+
+
+class RollupSnapshot:
+    """月次集計の行を (user_id, year, month, 集計列...) のタプルで比較するためのヘルパー"""
+
+    def __init__(self, db) -> None:
+        self.db = db
+
+    def stored(self):
+        """保存されている月次集計（差分で更新された値）"""
+        self.db.expire_all()
+        return sorted(
+            (row.user_id, row.year, row.month, *(getattr(row, name) for name in RollupService.FIELDS))
+            for row in self.db.scalars(select(MonthlyAttendanceRollup))
+        )
+
+    def rebuilt(self):
+        """勤怠記録から再集計した月次集計（RollupService.rebuild が作成する値）"""
+        return sorted(
+            (row.user_id, int(row.year), int(row.month), *(row._mapping[name] for name in RollupService.FIELDS))
+            for row in self.db.execute(RollupService.build_rebuild_query())
+        )
+
+
+@pytest.fixture
+def rollups(db):
+    """月次集計の比較用ヘルパー"""
+    return RollupSnapshot(db)
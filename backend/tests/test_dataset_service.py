@@ -0,0 +1,91 @@
+"""ベンチマーク用の合成データ生成のテスト"""
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.attendance import AttendanceRecord, AttendanceStatus, BreakRecord
+from app.models.user import User
+from app.schemas.attendance import ClockInRequest
+from app.services.attendance_service import AttendanceService
+from app.services.dataset_service import DatasetService
+
+USERS = 4
+PASSWORD_HASH = "not-a-real-hash"  # ログインしないためハッシュの計算は不要
+
+
+def generate(db, email_prefix="emp", seed=0):
+    # 複数のバッチに分かれるよう小さいバッチサイズで生成する
+    return DatasetService.generate(
+        db, users=USERS, years=1, hashed_password=PASSWORD_HASH, email_prefix=email_prefix,
+        seed=seed, batch_size=100,
+    )
+
+
+def count(db, model) -> int:
+    return db.scalar(select(func.count()).select_from(model))
+
+
+def test_generate_row_counts_and_rollups(db, rollups):
+    result = generate(db)
+
+    workdays = DatasetService.workdays(1, date.today())
+    assert (result.users, result.days) == (USERS, len(workdays))
+    assert count(db, User) == USERS
+    assert count(db, AttendanceRecord) == result.records
+    assert count(db, BreakRecord) == result.breaks
+    # 休暇の日を除き、ほぼ毎営業日の記録がある
+    assert USERS * len(workdays) * 0.85 < result.records <= USERS * len(workdays)
+    assert result.breaks >= result.records
+
+    # 1ユーザー1日1件
+    duplicates = db.execute(
+        select(AttendanceRecord.user_id, AttendanceRecord.date)
+        .group_by(AttendanceRecord.user_id, AttendanceRecord.date)
+        .having(func.count() > 1)
+    ).all()
+    assert duplicates == []
+
+    # 一括挿入した記録から月次集計が作り直されている
+    stored = rollups.stored()
+    assert stored == rollups.rebuilt()
+    assert sum(row[3] for row in stored) == result.records
+
+
+def test_generated_records_match_punch_calculations(db):
+    generate(db)
+
+    records = db.scalars(select(AttendanceRecord).order_by(AttendanceRecord.id).limit(200)).all()
+    for record in records:
+        # SQLiteに直接書き込んだ日時の文字列がORMで読み戻せ、打刻と同じ計算結果になる
+        assert (record.total_hours, record.overtime_hours) == AttendanceService.calculate_work_hours(
+            record.clock_in, record.clock_out, record.break_minutes
+        )
+        status = AttendanceStatus.LATE if AttendanceService.is_late(record.clock_in) else AttendanceStatus.PRESENT
+        assert record.status == AttendanceService.get_clock_out_status(status, record.clock_out)
+        assert record.break_minutes == sum(b.duration_minutes for b in record.break_records)
+        assert all(record.clock_in < b.break_start < b.break_end < record.clock_out for b in record.break_records)
+
+
+def test_generate_again_continues_ids(db):
+    first = generate(db, email_prefix="emp")
+    second = generate(db, email_prefix="bench")
+
+    # 同じシードなら同じデータを生成する
+    assert (second.records, second.breaks) == (first.records, first.breaks)
+    assert count(db, User) == USERS * 2
+    assert count(db, AttendanceRecord) == first.records * 2
+
+    with pytest.raises(ValueError):
+        generate(db, email_prefix="emp")
+
+    # 生成後の通常の登録・打刻がIDの重複で失敗しない
+    user = User(
+        email="new@example.com", hashed_password=PASSWORD_HASH, first_name="新規", last_name="社員",
+        employee_id="NEW0001",
+    )
+    db.add(user)
+    db.commit()
+    assert user.id == USERS * 2 + 1
+    record = AttendanceService.clock_in(db, user, ClockInRequest())
+    assert record.id == first.records * 2 + 1
@@ -0,0 +1,57 @@
+"""条件付きGET（ETag）のテスト（同じ秒の更新でも内容が変われば304を返さないこと）"""
+from datetime import timedelta
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, update
+
+from app.dependencies.auth import principal_cache
+from app.models.attendance import AttendanceRecord
+from app.models.user import User
+
+
+@pytest_asyncio.fixture
+async def client(make_client, user):
+    """user としてリクエストするクライアント"""
+    return await make_client(user)
+
+
+async def revalidate(client, path: str, etag: str) -> httpx.Response:
+    return await client.get(path, headers={"If-None-Match": etag})
+
+
+@pytest.mark.asyncio
+async def test_today_etag_changes_with_clock_in_in_the_same_second(db, client):
+    assert (await client.post("/attendance/clock-in", json={})).status_code == 200
+    first = await client.get("/attendance/today")
+    etag = first.headers["ETag"]
+    assert (await revalidate(client, "/attendance/today", etag)).status_code == 304
+
+    # updated_at を変えずに出勤時刻だけを更新する（同じ秒の書き込み）
+    record = db.scalars(select(AttendanceRecord)).one()
+    clock_in = record.clock_in - timedelta(minutes=5)
+    db.execute(update(AttendanceRecord).values(clock_in=clock_in, updated_at=record.updated_at))
+    db.commit()
+
+    second = await revalidate(client, "/attendance/today", etag)
+    assert second.status_code == 200
+    assert second.headers["ETag"] != etag
+    assert second.json()["clock_in"] != first.json()["clock_in"]
+
+
+@pytest.mark.asyncio
+async def test_me_etag_changes_with_name_in_the_same_second(db, user, client):
+    first = await client.get("/users/me")
+    etag = first.headers["ETag"]
+    assert (await revalidate(client, "/users/me", etag)).status_code == 304
+
+    # updated_at を変えずに氏名・部署だけを更新する（同じ秒の書き込み）
+    updated_at = db.scalar(select(User.updated_at).where(User.id == user.id))
+    db.execute(update(User).values(first_name="次郎", department="営業部", updated_at=updated_at))
+    db.commit()
+    principal_cache.invalidate(user.id)
+
+    second = await revalidate(client, "/users/me", etag)
+    assert second.status_code == 200
+    assert (second.json()["first_name"], second.json()["department"]) == ("次郎", "営業部")
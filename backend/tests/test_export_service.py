@@ -0,0 +1,38 @@
+"""勤怠記録のエクスポートのテスト"""
+import csv
+import io
+import json
+from datetime import date, datetime, timezone
+
+from app.models.attendance import AttendanceStatus
+from app.services.export_service import ExportService
+
+ROW = (
+    1, 2, "EMP001", date(2026, 4, 1), datetime(2026, 4, 1, 9, 0, tzinfo=timezone.utc), None,
+    60, 60, 8.0, -0.5, AttendanceStatus.PRESENT, None,
+)
+
+
+def export_csv(notes):
+    """備考だけを変えた1行をCSVにして読み戻す"""
+    content = ExportService.format_rows([ROW[:-1] + (notes,)], "csv").decode("utf-8")
+    return next(csv.reader(io.StringIO(content)))
+
+
+def test_csv_escapes_formula_prefixes():
+    for notes in ("=HYPERLINK(\"http://example.com\")", "+1", "-1+1", "@SUM(A1)", "\tTAB"):
+        assert export_csv(notes)[-1] == "'" + notes
+
+
+def test_csv_keeps_other_values():
+    row = export_csv("在宅勤務")
+    assert row[-1] == "在宅勤務"
+    assert row[3:6] == ["2026-04-01", "2026-04-01T09:00:00+00:00", ""]
+    # 数値はそのまま（負の値も数式扱いしない）
+    assert row[9] == "-0.5"
+    assert row[10] == "present"
+
+
+def test_jsonl_keeps_raw_values():
+    line = ExportService.format_rows([ROW[:-1] + ("=1+1",)], "jsonl").decode("utf-8")
+    assert json.loads(line)["notes"] == "=1+1"
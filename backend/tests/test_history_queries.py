@@ -0,0 +1,103 @@
+"""勤怠履歴のSQL実行回数のテスト（休憩記録の読み込みでN+1にならないこと）"""
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.database.database import (
+    SessionLocal,
+    get_async_engine,
+    get_async_session_factory,
+)
+from app.database.query_stats import start_tracking, stop_tracking
+from app.models.attendance import AttendanceRecord, AttendanceStatus, BreakRecord
+from app.routers.attendance import brief_record_serializer, record_serializer
+from app.services.async_attendance_service import AsyncAttendanceService
+from app.services.attendance_service import AttendanceService
+
+YEAR, MONTH = 2026, 1  # 31日ある月
+
+# 1ページ分の取得に使うSQLの回数（勤怠記録 + 休憩記録のIN句1回）
+EXPECTED_STATEMENTS = {True: 2, False: 1}
+
+
+def create_month(db, user, days: int, breaks_per_day: int) -> None:
+    """月初から days 日分の勤怠記録と休憩記録を作成"""
+    for offset in range(days):
+        day = date(YEAR, MONTH, 1) + timedelta(days=offset)
+        start = datetime.combine(day, AttendanceService.WORK_START_TIME, tzinfo=timezone.utc)
+        record = AttendanceRecord(
+            user_id=user.id,
+            date=day,
+            clock_in=start,
+            clock_out=start + timedelta(hours=9),
+            break_minutes=60,
+            total_hours=8.0,
+            status=AttendanceStatus.PRESENT,
+        )
+        for index in range(breaks_per_day):
+            break_start = start + timedelta(hours=3 + index)
+            record.break_records.append(
+                BreakRecord(break_start=break_start, break_end=break_start + timedelta(minutes=30), duration_minutes=30)
+            )
+        db.add(record)
+    db.commit()
+
+
+def count_history_statements(user_id: int, include_breaks: bool) -> int:
+    """新しいセッションで月の履歴を取得してレスポンスにするまでのSQL実行回数"""
+    serializer = record_serializer if include_breaks else brief_record_serializer
+    with SessionLocal() as session:
+        tracker, token = start_tracking()
+        try:
+            records, has_more = AttendanceService.get_history_page(
+                session, user_id, 100, year=YEAR, month=MONTH, include_breaks=include_breaks
+            )
+            serializer.response(records)
+        finally:
+            stop_tracking(token)
+    assert not has_more
+    return tracker.count
+
+
+@pytest.mark.parametrize("include_breaks", [True, False])
+@pytest.mark.parametrize("breaks_per_day", [0, 2])
+def test_month_history_uses_fixed_statement_count(db, user, include_breaks, breaks_per_day):
+    user_id = user.id
+    create_month(db, user, days=31, breaks_per_day=breaks_per_day)
+
+    assert count_history_statements(user_id, include_breaks) == EXPECTED_STATEMENTS[include_breaks]
+
+
+def test_statement_count_does_not_grow_with_days(db, make_user):
+    one_day_user, full_month_user = make_user(1), make_user(2)
+    create_month(db, one_day_user, days=1, breaks_per_day=2)
+    create_month(db, full_month_user, days=31, breaks_per_day=2)
+
+    for include_breaks in (True, False):
+        assert count_history_statements(one_day_user.id, include_breaks) == count_history_statements(
+            full_month_user.id, include_breaks
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("include_breaks", [True, False])
+async def test_month_history_uses_fixed_statement_count_async(db, user, include_breaks):
+    user_id = user.id
+    create_month(db, user, days=31, breaks_per_day=2)
+    serializer = record_serializer if include_breaks else brief_record_serializer
+    try:
+        async with get_async_session_factory()() as session:
+            tracker, token = start_tracking()
+            try:
+                records, _ = await AsyncAttendanceService.get_history_page(
+                    session, user_id, 100, year=YEAR, month=MONTH, include_breaks=include_breaks
+                )
+                serializer.response(records)
+            finally:
+                stop_tracking(token)
+    finally:
+        # 非同期エンジンのコネクションはテストごとのイベントループに紐づくため閉じておく
+        await get_async_engine().dispose()
+
+    assert len(records) == 31
+    assert tracker.count == EXPECTED_STATEMENTS[include_breaks]
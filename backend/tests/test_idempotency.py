@@ -0,0 +1,41 @@
+"""Idempotency-Key による再送のテスト"""
+import pytest
+
+from app.core.idempotency import REPLAYED_HEADER, IdempotencyStore
+
+
+@pytest.mark.asyncio
+async def test_replay_and_conflict():
+    store = IdempotencyStore(max_size=100, ttl_seconds=60)
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        return 200, b'{"id": 1}'
+
+    first = await store.run((1, "/attendance/clock-in", "key"), "body-a", handler)
+    replay = await store.run((1, "/attendance/clock-in", "key"), "body-a", handler)
+    conflict = await store.run((1, "/attendance/clock-in", "key"), "body-b", handler)
+
+    assert len(calls) == 1
+    assert (first.status_code, first.body) == (200, b'{"id": 1}')
+    assert replay.body == first.body
+    assert replay.headers[REPLAYED_HEADER] == "true"
+    assert conflict.status_code == 422
+    assert store.stats()["conflicts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_not_stored():
+    store = IdempotencyStore(max_size=100, ttl_seconds=60)
+    responses = iter([(503, b'{"detail": "busy"}'), (200, b'{"id": 1}')])
+
+    async def handler():
+        return next(responses)
+
+    first = await store.run("key", "body", handler)
+    retry = await store.run("key", "body", handler)
+
+    assert first.status_code == 503
+    assert retry.status_code == 200
+    assert REPLAYED_HEADER not in retry.headers
@@ -0,0 +1,114 @@
+"""過去の打刻データのインポートのテスト"""
+from datetime import date
+
+from sqlalchemy import select
+
+from app.models.attendance import AttendanceRecord, AttendanceStatus, BreakRecord
+from app.services.import_service import ImportService
+
+HEADER = "employee_id,date,clock_in,clock_out,break_minutes,breaks,notes\n"
+
+
+def import_csv(db, tmp_path, lines, batch_size=2):
+    path = tmp_path / "punches.csv"
+    path.write_text(HEADER + "".join(f"{line}\n" for line in lines), encoding="utf-8")
+    return ImportService.import_rows(db, ImportService.read_csv([str(path)]), batch_size)
+
+
+def records_by_date(db, user_id):
+    return {
+        record.date: record
+        for record in db.scalars(select(AttendanceRecord).where(AttendanceRecord.user_id == user_id))
+    }
+
+
+def test_import_valid_csv(db, make_user, tmp_path, rollups):
+    first, second = make_user(1), make_user(2)
+    first_id, second_id = first.id, second.id
+    result = import_csv(db, tmp_path, [
+        "TEST0001,2024-04-01,08:55,18:30,,12:00-13:00;15:00-15:10,",
+        "TEST0001,2024-04-02,09:30,15:00,45,,通院",
+        # 日付をまたぐ退勤はISO形式で指定する
+        "TEST0002,2024-04-30,22:00,2024-05-01T07:00:00Z,60,,夜勤",
+        "TEST0002,2024-05-01,08:00,,,,",
+    ])
+
+    assert (result.processed, result.imported, result.breaks, result.skipped) == (4, 4, 2, 0)
+    assert result.errors == []
+
+    records = records_by_date(db, first_id)
+    on_time = records[date(2024, 4, 1)]
+    assert on_time.status == AttendanceStatus.PRESENT
+    assert on_time.break_minutes == 70  # 休憩の合計
+    assert (on_time.total_hours, on_time.overtime_hours) == (8.42, 0.42)
+    assert sorted(b.duration_minutes for b in on_time.break_records) == [10, 60]
+    half_day = records[date(2024, 4, 2)]
+    assert half_day.status == AttendanceStatus.HALF_DAY
+    assert (half_day.break_minutes, half_day.notes) == (45, "通院")
+
+    night_shift = records_by_date(db, second_id)[date(2024, 4, 30)]
+    assert night_shift.total_hours == 8.0
+    assert db.scalars(select(BreakRecord).where(BreakRecord.attendance_record_id == night_shift.id)).all() == []
+
+    # 一括挿入した記録から月次集計が作り直されている
+    assert rollups.stored() == rollups.rebuilt()
+    assert [row[:4] for row in rollups.stored()] == [
+        (first_id, 2024, 4, 2), (second_id, 2024, 4, 1), (second_id, 2024, 5, 1)
+    ]
+
+
+def test_malformed_rows_are_reported_and_skipped(db, user, tmp_path, rollups):
+    user_id = user.id
+    result = import_csv(db, tmp_path, [
+        "TEST0000,2024-04-01,09:00,18:00,,,",
+        "TEST0000,2024-04-02,,18:00,,,",
+        "TEST9999,2024-04-03,09:00,18:00,,,",
+        "TEST0000,2024-13-01,09:00,18:00,,,",
+        "TEST0000,2024-04-04,18:00,09:00,,,",
+        "TEST0000,2024-04-05,09:00,18:00,,13:00-12:00,",
+        "TEST0000,2024-04-06,09:00,18:00,,lunch,",
+        "TEST0000,2024-04-07,9時,18:00,,,",
+        "TEST0000,2024-04-08,09:00,18:00,1時間,,",
+    ])
+
+    assert (result.processed, result.imported) == (9, 1)
+    assert [error.split(": ", 1)[0].rsplit(":", 1)[1] for error in result.errors] == [
+        str(line) for line in range(3, 11)
+    ]
+    assert "clock_in がありません" in result.errors[0]
+    assert "社員番号が見つかりません: TEST9999" in result.errors[1]
+    assert "退勤時刻が出勤時刻以前です" in result.errors[3]
+    assert "休憩の終了時刻が開始時刻以前です" in result.errors[4]
+    assert list(records_by_date(db, user_id)) == [date(2024, 4, 1)]
+    assert rollups.stored() == rollups.rebuilt()
+
+
+def test_duplicate_rows_are_not_imported_twice(db, user, tmp_path, rollups):
+    user_id = user.id
+    db.add(AttendanceRecord(
+        user_id=user_id, date=date(2024, 4, 1), clock_in=None, status=AttendanceStatus.ABSENT, notes="既存"
+    ))
+    db.commit()
+
+    result = import_csv(db, tmp_path, [
+        # 既存の記録と重複
+        "TEST0000,2024-04-01,09:00,18:00,,,",
+        # 同じバッチ内の重複
+        "TEST0000,2024-04-02,09:00,18:00,,,",
+        "TEST0000,2024-04-02,10:00,19:00,,,",
+        # 別のバッチとの重複
+        "TEST0000,2024-04-03,09:00,18:00,,,",
+        "TEST0000,2024-04-04,09:00,18:00,,,",
+        "TEST0000,2024-04-03,10:00,19:00,,,",
+    ], batch_size=3)
+
+    assert (result.processed, result.imported, result.skipped) == (6, 3, 2)
+    assert len(result.errors) == 1 and "重複" in result.errors[0]
+
+    records = records_by_date(db, user_id)
+    assert sorted(records) == [date(2024, 4, day) for day in (1, 2, 3, 4)]
+    assert records[date(2024, 4, 1)].notes == "既存"
+    assert records[date(2024, 4, 2)].clock_in.hour == 9
+    assert records[date(2024, 4, 3)].clock_in.hour == 9
+    assert rollups.stored() == rollups.rebuilt()
+    assert rollups.stored()[0][3] == 3  # 出勤していない既存の記録は数えない
@@ -0,0 +1,78 @@
+"""データベース初期化（インデックスの追加）のテスト"""
+from datetime import date, datetime, timezone
+
+from sqlalchemy import inspect, select
+
+from app.database.database import engine
+from app.database.init_db import UNIQUE_RECORD_INDEX, ensure_indexes
+from app.models.attendance import (
+    AttendanceRecord,
+    AttendanceStatus,
+    BreakRecord,
+    BreakStatus,
+    MonthlyAttendanceRollup,
+)
+
+DAY = date(2026, 4, 1)
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    return datetime(DAY.year, DAY.month, DAY.day, hour, minute, tzinfo=timezone.utc)
+
+
+def drop_unique_index() -> None:
+    """一意インデックスを追加する前の既存データベースを再現する"""
+    for index in AttendanceRecord.__table__.indexes:
+        if index.name == UNIQUE_RECORD_INDEX:
+            index.drop(bind=engine)
+
+
+def test_ensure_indexes_merges_duplicates_before_creating_unique_index(db, user):
+    drop_unique_index()
+    # 同時の出勤打刻で2件作られ、退勤と休憩は片方の記録に書き込まれた状態
+    first = AttendanceRecord(
+        user_id=user.id, date=DAY, clock_in=at(9, 5), break_minutes=60, status=AttendanceStatus.LATE
+    )
+    second = AttendanceRecord(
+        user_id=user.id, date=DAY, clock_in=at(8, 55), clock_out=at(18, 30), break_minutes=60,
+        total_hours=8.58, overtime_hours=0.58, status=AttendanceStatus.PRESENT, notes="在宅",
+    )
+    second.break_records.append(BreakRecord(break_start=at(12), break_end=at(13), duration_minutes=60))
+    other_day = AttendanceRecord(
+        user_id=user.id, date=date(2026, 4, 2), clock_in=at(9), status=AttendanceStatus.PRESENT
+    )
+    db.add_all([first, second, other_day])
+    db.commit()
+    first_id = first.id
+
+    ensure_indexes()
+
+    db.expire_all()
+    records = db.scalars(select(AttendanceRecord).where(AttendanceRecord.date == DAY)).all()
+    assert len(records) == 1
+    merged = records[0]
+    assert merged.id == first_id
+    assert merged.clock_in.replace(tzinfo=timezone.utc) == at(8, 55)
+    assert merged.clock_out.replace(tzinfo=timezone.utc) == at(18, 30)
+    assert merged.status == AttendanceStatus.PRESENT
+    assert merged.break_status == BreakStatus.WORKING
+    assert merged.notes == "在宅"
+    assert (merged.total_hours, merged.overtime_hours) == (8.58, 0.58)
+    assert [b.duration_minutes for b in merged.break_records] == [60]
+
+    index_names = {index["name"] for index in inspect(engine).get_indexes(AttendanceRecord.__tablename__)}
+    assert UNIQUE_RECORD_INDEX in index_names
+    rollup = db.scalars(select(MonthlyAttendanceRollup).where(MonthlyAttendanceRollup.user_id == user.id)).one()
+    assert rollup.work_days == 2
+
+
+def test_ensure_indexes_without_duplicates(db, user):
+    drop_unique_index()
+    db.add(AttendanceRecord(user_id=user.id, date=DAY, clock_in=at(9), status=AttendanceStatus.PRESENT))
+    db.commit()
+
+    ensure_indexes()
+
+    index_names = {index["name"] for index in inspect(engine).get_indexes(AttendanceRecord.__tablename__)}
+    assert UNIQUE_RECORD_INDEX in index_names
+    assert len(db.scalars(select(AttendanceRecord)).all()) == 1
@@ -0,0 +1,105 @@
+"""キーセット（カーソル）ページネーションのテスト"""
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.core.pagination import encode_cursor
+from app.database.database import engine
+from app.database.init_db import UNIQUE_RECORD_INDEX
+from app.models.attendance import AttendanceRecord, AttendanceStatus
+from app.models.user import UserRole
+
+
+async def collect_pages(client, url):
+    """Link ヘッダーの次ページをたどり、ページごとの結果を返す"""
+    pages = []
+    while url:
+        response = await client.get(url)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            assert "Link" not in response.headers
+            break
+        assert f"cursor={cursor}" in response.headers["Link"]
+        assert response.headers["Link"].endswith('>; rel="next"')
+        url = response.headers["Link"][1:].split(">", 1)[0]
+    return pages
+
+
+@pytest.mark.asyncio
+async def test_users_are_paged_by_id(make_user, make_client):
+    admin = make_user(0, role=UserRole.ADMIN)
+    user_ids = [admin.id] + [make_user(index).id for index in range(1, 5)]
+    client = await make_client(admin)
+
+    pages = await collect_pages(client, "/users/?limit=2")
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [user["id"] for page in pages for user in page] == sorted(user_ids)
+
+
+@pytest.mark.asyncio
+async def test_history_pages_through_records_with_the_same_date(db, make_user, make_client):
+    # 一意インデックスを追加する前の既存データベースでは、同じ日付の記録が複数ありうる
+    for index in AttendanceRecord.__table__.indexes:
+        if index.name == UNIQUE_RECORD_INDEX:
+            index.drop(bind=engine)
+    user, other = make_user(1), make_user(2)
+    days = [date(2026, 4, 3)] * 3 + [date(2026, 4, 2)] * 2 + [date(2026, 4, 1)] + [date(2026, 3, 31)] * 2
+    for day in days:
+        for owner in (user, other):
+            db.add(AttendanceRecord(
+                user_id=owner.id,
+                date=day,
+                clock_in=datetime(day.year, day.month, day.day, 9, tzinfo=timezone.utc),
+                status=AttendanceStatus.PRESENT,
+            ))
+    db.commit()
+    expected = [
+        (record_date.isoformat(), record_id)
+        for record_date, record_id in db.execute(
+            select(AttendanceRecord.date, AttendanceRecord.id)
+            .where(AttendanceRecord.user_id == user.id)
+            .order_by(AttendanceRecord.date.desc(), AttendanceRecord.id.desc())
+        )
+    ]
+    client = await make_client(user)
+
+    # 2件ずつのため、同じ日付の記録がページの境界をまたぐ
+    pages = await collect_pages(client, "/attendance/history?limit=2&include_breaks=false")
+    assert [(record["date"], record["id"]) for page in pages for record in page] == expected
+    assert [len(page) for page in pages] == [2, 2, 2, 2]
+
+    # 年月の指定はカーソルと組み合わせても維持される
+    pages = await collect_pages(client, "/attendance/history?year=2026&month=4&limit=2")
+    assert [(record["date"], record["id"]) for page in pages for record in page] == expected[:6]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    encode_cursor("2026-04-01"),  # 値の数が違う
+    encode_cursor("2026-13-01", 1),  # 日付ではない
+    encode_cursor("2026-04-01", "id"),  # IDが整数ではない
+    encode_cursor(None, 1),
+])
+async def test_history_rejects_malformed_cursor(user, make_client, cursor):
+    client = await make_client(user)
+
+    response = await client.get("/attendance/history", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "カーソルが不正です"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cursor", ["%%%", encode_cursor(1, 2), encode_cursor("abc"), encode_cursor([1])])
+async def test_users_rejects_malformed_cursor(make_user, make_client, cursor):
+    client = await make_client(make_user(role=UserRole.ADMIN))
+
+    response = await client.get("/users/", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "カーソルが不正です"
@@ -0,0 +1,134 @@
+"""打刻のバッチ書き込み（グループコミット）のテスト"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Tuple
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.group_commit import GroupCommitQueue
+from app.database.database import engine, get_async_engine
+from app.database.query_stats import _current_tracker, start_tracking, stop_tracking
+from app.models.attendance import AttendanceRecord, BreakStatus
+from app.schemas.attendance import BreakEndRequest, BreakStartRequest, ClockInRequest
+from app.services.async_attendance_service import AsyncAttendanceService
+from app.services.async_punch_batch_service import AsyncPunchBatchService
+from app.services.attendance_service import AttendanceService
+from app.services.punch_batch_service import PunchBatchService, PunchOperation
+
+
+def build_operations(service, user):
+    """出勤・失敗する打刻・休憩開始・休憩終了を同じバッチに並べる"""
+    now = datetime.now(timezone.utc)
+    return [
+        PunchOperation(AttendanceService.EVENT_CLOCK_IN, user, service.stage_clock_in, (ClockInRequest(), now)),
+        # 出勤済みのため失敗し、SAVEPOINTで取り消される
+        PunchOperation(AttendanceService.EVENT_CLOCK_IN, user, service.stage_clock_in, (ClockInRequest(), now)),
+        PunchOperation(
+            AttendanceService.EVENT_BREAK_START, user, service.stage_start_break,
+            (BreakStartRequest(), now + timedelta(minutes=1)),
+        ),
+        PunchOperation(
+            AttendanceService.EVENT_BREAK_END, user, service.stage_end_break,
+            (BreakEndRequest(), now + timedelta(minutes=31)),
+        ),
+    ]
+
+
+@contextmanager
+def trace_sqlite(db_engine: Engine) -> Iterator[List[Tuple[str, bool]]]:
+    """新しく接続したSQLiteのコネクションで実行されたSQLを（SQL, 実行前にトランザクション中か）で記録する"""
+    statements: List[Tuple[str, bool]] = []
+
+    def on_connect(dbapi_connection, _connection_record):
+        # aiosqliteのコネクションは内側にsqlite3のコネクションを持つ
+        raw = getattr(getattr(dbapi_connection, "_connection", None), "_conn", dbapi_connection)
+        raw.set_trace_callback(lambda sql: statements.append((sql.strip().upper(), raw.in_transaction)))
+
+    event.listen(db_engine, "connect", on_connect)
+    db_engine.dispose()
+    try:
+        yield statements
+    finally:
+        event.remove(db_engine, "connect", on_connect)
+        db_engine.dispose()
+
+
+def count_commits(statements: List[Tuple[str, bool]]) -> int:
+    """コミットの回数（COMMIT と、トランザクション外で開始したSAVEPOINTのRELEASEによる暗黙のコミット）"""
+    return sum(
+        1 for sql, in_transaction in statements
+        if sql.startswith("COMMIT") or (sql.startswith("SAVEPOINT") and not in_transaction)
+    )
+
+
+def assert_break_completed(results):
+    """休憩開始・終了がどちらも成功し、終了済みの休憩記録が1件残ること"""
+    assert isinstance(results[0], AttendanceRecord)
+    assert isinstance(results[1], ValueError)
+    assert isinstance(results[2], AttendanceRecord)
+    assert isinstance(results[3], AttendanceRecord), results[3]
+
+    record = results[3]
+    assert record.break_status == BreakStatus.WORKING
+    assert len(record.break_records) == 1
+    assert record.break_records[0].break_end is not None
+    assert record.break_records[0].duration_minutes == 30
+
+
+def test_break_start_and_end_in_one_batch(db, user):
+    results = PunchBatchService.execute(build_operations(AttendanceService, user))
+
+    assert_break_completed(results)
+    stored = AttendanceService.get_today_record(db, user.id)
+    assert stored.break_status == BreakStatus.WORKING
+    assert [b.duration_minutes for b in stored.break_records] == [30]
+
+
+@pytest.mark.asyncio
+async def test_break_start_and_end_in_one_batch_async(db, user):
+    try:
+        results = await AsyncPunchBatchService.execute(build_operations(AsyncAttendanceService, user))
+    finally:
+        # 非同期エンジンのコネクションはテストごとのイベントループに紐づくため閉じておく
+        await get_async_engine().dispose()
+
+    assert_break_completed(results)
+    stored = AttendanceService.get_today_record(db, user.id)
+    assert stored.break_status == BreakStatus.WORKING
+    assert [b.duration_minutes for b in stored.break_records] == [30]
+
+
+def test_batch_commits_once(user):
+    with trace_sqlite(engine) as statements:
+        PunchBatchService.execute(build_operations(AttendanceService, user))
+
+    assert count_commits(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_commits_once_async(user):
+    async_engine = get_async_engine()
+    try:
+        with trace_sqlite(async_engine.sync_engine) as statements:
+            await AsyncPunchBatchService.execute(build_operations(AsyncAttendanceService, user))
+    finally:
+        await async_engine.dispose()
+
+    assert count_commits(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_worker_does_not_inherit_request_tracking():
+    async def execute_batch(operations):
+        return [_current_tracker.get() for _ in operations]
+
+    queue = GroupCommitQueue(execute_batch, max_batch_size=8, max_wait_seconds=0.001)
+    _, token = start_tracking()
+    try:
+        # 最初の投入でワーカーが開始される
+        assert await queue.submit("clock_in") is None
+    finally:
+        stop_tracking(token)
+        await queue.stop()
@@ -0,0 +1,65 @@
+"""ログインのレート制限のテスト"""
+import sqlite3
+import time
+
+import pytest
+
+from app.core.rate_limit import (
+    LoginRateLimiter,
+    MemoryTokenBucketStore,
+    SQLiteTokenBucketStore,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def limiter(request, tmp_path):
+    """IPごとに連続5回まで失敗できるレート制限（バックエンドごと）"""
+    if request.param == "sqlite":
+        store = SQLiteTokenBucketStore(str(tmp_path / "rate_limit.db"), max_size=1000)
+    else:
+        store = MemoryTokenBucketStore(max_size=1000)
+    return LoginRateLimiter(store, email_burst=10, email_per_minute=5.0, ip_burst=5, ip_per_minute=1.0)
+
+
+def test_successful_logins_from_one_ip_are_not_limited(limiter):
+    # NATの背後にある事務所から、IPのバケットを大きく超える人数が一斉にログインする
+    for index in range(50):
+        assert limiter.check(f"user{index}@example.com", "203.0.113.10") == 0
+
+    assert limiter.stats()["rejected_ip"] == 0
+
+
+def test_failed_logins_exhaust_the_ip_bucket(limiter):
+    for index in range(5):
+        assert limiter.check(f"guess{index}@example.com", "203.0.113.10") == 0
+        limiter.record_failure("203.0.113.10")
+
+    assert limiter.check("user@example.com", "203.0.113.10") > 0
+    assert limiter.check("user@example.com", "198.51.100.20") == 0
+    stats = limiter.stats()
+    assert stats["rejected_ip"] == 1
+    assert stats["failed"] == 5
+
+
+def test_email_bucket_counts_every_attempt(limiter):
+    for _ in range(10):
+        assert limiter.check("user@example.com", "203.0.113.10") == 0
+
+    assert limiter.check("User@Example.com ", "198.51.100.20") > 0
+    assert limiter.stats()["rejected_email"] == 1
+
+
+def test_sqlite_store_allows_attempts_while_another_worker_holds_the_lock(tmp_path):
+    path = str(tmp_path / "rate_limit.db")
+    store = SQLiteTokenBucketStore(path, max_size=1000, busy_timeout=0.05)
+    other_worker = sqlite3.connect(path, isolation_level=None)
+    other_worker.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.perf_counter()
+        assert store.take("email:user@example.com", 10, 1.0) == 0
+        assert time.perf_counter() - started < 1.0
+    finally:
+        other_worker.execute("ROLLBACK")
+        other_worker.close()
+
+    assert store.stats()["busy"] == 1
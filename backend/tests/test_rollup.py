@@ -0,0 +1,89 @@
+"""月次集計（ロールアップ）の差分更新のテスト（差分で更新した集計が再集計の結果と一致すること）"""
+from datetime import date, datetime, time, timezone
+
+import pytest
+
+from app.models.attendance import AttendanceRecord, AttendanceStatus
+from app.schemas.attendance import (
+    BreakEndRequest,
+    BreakStartRequest,
+    ClockInRequest,
+    ClockOutRequest,
+)
+from app.services.attendance_service import AttendanceService
+from app.services.rollup_service import RollupService
+
+
+def at(day: date, hour: int, minute: int = 0) -> datetime:
+    return datetime.combine(day, time(hour, minute), tzinfo=timezone.utc)
+
+
+def clock_out_request(clock_out: datetime) -> ClockOutRequest:
+    return ClockOutRequest(clock_out=clock_out.isoformat())
+
+
+@pytest.fixture(params=["upsert", "select"], autouse=True)
+def rollup_path(request, monkeypatch):
+    """ON CONFLICT の加算（upsert）と、取得してから加算する経路（select）の両方で確認する"""
+    if request.param == "select":
+        monkeypatch.setattr(AttendanceService, "UPSERT_INSERTS", {})
+    return request.param
+
+
+@pytest.mark.parametrize("clock_in_hour", [8, 10])  # 定時の出勤と遅刻
+def test_punch_sequence_keeps_rollup_consistent(db, user, rollups, clock_in_hour):
+    today = date.today()
+    steps = [
+        lambda: AttendanceService.stage_clock_in(db, user, ClockInRequest(), at(today, clock_in_hour)),
+        lambda: AttendanceService.stage_start_break(db, user, BreakStartRequest(), at(today, 12)),
+        lambda: AttendanceService.stage_end_break(db, user, BreakEndRequest(), at(today, 13)),
+        # 早退（遅刻の場合は半日）
+        lambda: AttendanceService.stage_clock_out(db, user, clock_out_request(at(today, 15)), at(today, 15)),
+        lambda: AttendanceService.stage_cancel_clock_out(db, user),
+        # 残業
+        lambda: AttendanceService.stage_clock_out(
+            db, user, clock_out_request(at(today, 20, 30)), at(today, 20, 30)
+        ),
+    ]
+    for step in steps:
+        step()
+        db.commit()
+        assert rollups.stored() == rollups.rebuilt()
+
+    record = AttendanceService.get_today_record(db, user.id)
+    assert record.overtime_hours > 0
+    expected = rollups.stored()
+    RollupService.rebuild(db)
+    assert rollups.stored() == expected
+    assert expected[0][3:] == (
+        1, record.total_hours, record.overtime_hours, int(clock_in_hour == 10), 0
+    )
+
+
+def test_cross_month_record_stays_in_the_month_of_its_date(db, user, rollups):
+    # 月末の夜勤（翌月1日に退勤）と、翌月1日の記録
+    last_day, first_day = date(2026, 3, 31), date(2026, 4, 1)
+    night_shift = AttendanceRecord(user_id=user.id, date=last_day, status=AttendanceStatus.PRESENT)
+    next_day = AttendanceRecord(user_id=user.id, date=first_day, status=AttendanceStatus.PRESENT)
+    db.add_all([night_shift, next_day])
+    db.flush()
+
+    for record, clock_in in ((night_shift, at(last_day, 22)), (next_day, at(first_day, 8, 30))):
+        before = RollupService.contribution(record)
+        AttendanceService.apply_clock_in(record, ClockInRequest(), clock_in)
+        RollupService.apply_delta(db, before, record)
+        db.commit()
+    assert rollups.stored() == rollups.rebuilt()
+
+    for record, clock_out in ((night_shift, at(first_day, 7)), (next_day, at(first_day, 18))):
+        before = RollupService.contribution(record)
+        AttendanceService.apply_clock_out(record, clock_out_request(clock_out), clock_out)
+        RollupService.apply_delta(db, before, record)
+        db.commit()
+    assert rollups.stored() == rollups.rebuilt()
+
+    months = {(year, month): work_days for _, year, month, work_days, *_ in rollups.stored()}
+    assert months == {(2026, 3): 1, (2026, 4): 1}
+    expected = rollups.stored()
+    RollupService.rebuild(db)
+    assert rollups.stored() == expected
@@ -0,0 +1,88 @@
+"""トークンブラックリストのテスト"""
+import sqlite3
+import time
+
+import pytest
+
+from app.core.token_blacklist import (
+    MemoryTokenBlacklist,
+    SQLiteTokenBlacklist,
+    get_token_digest,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def blacklist(request, tmp_path):
+    """上限2件のブラックリスト（バックエンドごと）"""
+    if request.param == "sqlite":
+        return SQLiteTokenBlacklist(str(tmp_path / "blacklist.db"), sync_interval_seconds=0.0, capacity=2)
+    return MemoryTokenBlacklist(max_size=2)
+
+
+def test_unexpired_tokens_are_kept_over_max_size(blacklist, caplog):
+    digests = [get_token_digest(f"token-{index}") for index in range(5)]
+    expires_at = time.time() + 1800
+    for digest in digests:
+        blacklist.add(digest, expires_at)
+    blacklist.purge_expired()
+
+    assert all(blacklist.contains(digest) for digest in digests)
+    stats = blacklist.stats()
+    assert stats["size"] == 5
+    assert stats["max_size_exceeded"] == 1
+    assert "TOKEN_BLACKLIST_MAX_SIZE" in caplog.text
+
+
+def test_expired_tokens_are_purged(blacklist):
+    expired, active = get_token_digest("expired"), get_token_digest("active")
+    blacklist.add(expired, time.time() - 1)
+    blacklist.add(active, time.time() + 1800)
+    blacklist.purge_expired()
+
+    assert not blacklist.contains(expired)
+    assert blacklist.contains(active)
+    assert blacklist.stats()["size"] == 1
+
+
+def test_other_worker_tokens_are_synced_incrementally(tmp_path, monkeypatch):
+    path = str(tmp_path / "blacklist.db")
+    worker = SQLiteTokenBlacklist(path, sync_interval_seconds=0.0, capacity=100)
+    other_worker = SQLiteTokenBlacklist(path, sync_interval_seconds=0.0, capacity=100)
+    # 参照時には全件の読み込み（再構築）を行わない
+    monkeypatch.setattr(worker, "_rebuild", lambda: pytest.fail("contains() rebuilt the filter"))
+
+    digest = get_token_digest("logged-out-elsewhere")
+    assert not worker.contains(digest)
+    other_worker.add(digest, time.time() + 1800)
+
+    assert worker.contains(digest)
+    assert worker.rebuilds == 1  # 作成時の1回のみ
+
+
+def test_purge_rebuilds_the_filter_from_the_shared_store(tmp_path):
+    path = str(tmp_path / "blacklist.db")
+    worker = SQLiteTokenBlacklist(path, sync_interval_seconds=3600.0, capacity=100)
+    other_worker = SQLiteTokenBlacklist(path, sync_interval_seconds=3600.0, capacity=100)
+    expired, active = get_token_digest("expired"), get_token_digest("active")
+    other_worker.add(expired, time.time() - 1)
+    other_worker.add(active, time.time() + 1800)
+
+    worker.purge_expired()
+
+    assert worker.contains(active)
+    assert not worker.contains(expired)
+    assert worker.stats()["size"] == 1
+
+
+def test_legacy_table_is_migrated(tmp_path):
+    path = str(tmp_path / "blacklist.db")
+    digest = get_token_digest("legacy")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE token_blacklist (digest TEXT PRIMARY KEY, expires_at REAL NOT NULL)")
+    connection.execute("INSERT INTO token_blacklist VALUES (?, ?)", (digest, time.time() + 1800))
+    connection.commit()
+    connection.close()
+
+    blacklist = SQLiteTokenBlacklist(path, sync_interval_seconds=0.0, capacity=100)
+
+    assert blacklist.contains(digest)